@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+
+@register(Tags.compatibility)
+def check_single_webhook_worker(app_configs, **kwargs) -> list[Error]:
+    """
+    Обновления вебхука обрабатываются в фоне веб-процесса (bot/webhook.py): очередь чата и повтор принятых,
+    но не обработанных обновлений после перезапуска рассчитаны на один процесс. В нескольких процессах
+    сообщения одного чата обрабатывались бы одновременно и не по порядку, а незавершённые — повторно.
+    """
+    if not settings.BOT_WEBHOOK_SECRET or settings.WEB_CONCURRENCY <= 1:
+        return []
+    return [Error(
+        "Вебхук бота включён, а веб-процессов несколько",
+        hint="Запустите один веб-процесс (WEB_CONCURRENCY=1) или уберите BOT_WEBHOOK_SECRET и используйте runbot",
+        id="bot.E001",
+    )]
@@ -0,0 +1,120 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+
+from django.db.models import Model, QuerySet
+
+from bot.models import TgUser
+from bot.tg.dc import InlineKeyboardButton, InlineKeyboardMarkup
+from goals.models import BoardParticipant, Goal
+
+# Ограничение Telegram на длину текста сообщения
+MESSAGE_LIMIT: int = 4096
+PAGE_SIZE: int = 20
+NEXT: str = "next"
+PREV: str = "prev"
+
+
+@dataclass
+class Page:
+    text: str
+    reply_markup: InlineKeyboardMarkup | None = None
+
+
+class Listing(ABC):
+    """
+    Постраничный список для бота: страница — одно сообщение не длиннее `MESSAGE_LIMIT` символов и не больше
+    `page_size` записей, кнопки «Назад» и «Далее» под ним.
+    Страницы выбираются по ключу (`id` больше или меньше, чем у крайней записи соседней страницы), так что каждая
+    стоит одного запроса на `page_size + 1` строк независимо от длины списка.
+    Подкласс задаёт `name`, `title`, `empty` и реализует `get_queryset` и `render`.
+    """
+    name: str
+    title: str
+    empty: str
+    page_size: int = PAGE_SIZE
+
+    @abstractmethod
+    def get_queryset(self, tg_user: TgUser) -> QuerySet:
+        """ Записи пользователя, отсортированные по `id` """
+
+    @abstractmethod
+    def render(self, obj: Model) -> str:
+        """ Текст одной записи на странице """
+
+    def page(self, tg_user: TgUser, direction: str = NEXT, cursor: int | None = None) -> Page:
+        """ Первая страница, либо следующая (`next`) или предыдущая (`prev`) относительно записи `cursor` """
+        queryset: QuerySet = self.get_queryset(tg_user)
+        forward: bool = direction == NEXT
+        if cursor is not None:
+            queryset = queryset.filter(id__gt=cursor) if forward else queryset.filter(id__lt=cursor).order_by("-id")
+        rows: list = list(queryset[:self.page_size + 1])
+        if not rows:
+            return self.page(tg_user) if cursor is not None else Page(self.empty)
+
+        header: str = f"{self.title}\n===================\n"
+        items: list[tuple[int, str]] = []
+        length: int = len(header)
+        for obj in rows[:self.page_size]:
+            text: str = self.render(obj)[:MESSAGE_LIMIT - len(header)]
+            if items and length + len(text) + 2 > MESSAGE_LIMIT:
+                break
+            items.append((obj.id, text))
+            length += len(text) + 2
+        more: bool = len(rows) > len(items)
+        if not forward:
+            items.reverse()
+
+        # Назад мы пришли со страницы, которая по-прежнему есть; вперёд — есть ли записи за набранными
+        has_prev: bool = cursor is not None if forward else more
+        has_next: bool = more if forward else True
+        buttons: list[InlineKeyboardButton] = []
+        if has_prev:
+            buttons.append(InlineKeyboardButton("« Назад", f"{self.name}:{PREV}:{items[0][0]}"))
+        if has_next:
+            buttons.append(InlineKeyboardButton("Далее »", f"{self.name}:{NEXT}:{items[-1][0]}"))
+        return Page(header + "\n\n".join(text for _, text in items),
+                    InlineKeyboardMarkup([buttons]) if buttons else None)
+
+
+class GoalListing(Listing):
+    name: str = "goals"
+    title: str = "🎯 Ваши цели"
+    empty: str = "Список целей пуст."
+
+    def get_queryset(self, tg_user: TgUser) -> QuerySet:
+        return Goal.objects.filter(user=tg_user.user_id).select_related("category", "user").order_by("id")
+
+    def render(self, goal: Goal) -> str:
+        return (f'Название: {goal.title},\n'
+                f'Категория: {goal.category},\n'
+                f'Статус: {goal.get_status_display()},\n'
+                f'Пользователь: {goal.user},\n'
+                f'Дедлайн {goal.due_date if goal.due_date else "Нет"}')
+
+
+class BoardListing(Listing):
+    name: str = "boards"
+    title: str = "📋 Ваши доски"
+    empty: str = "Нет у вас Board"
+
+    def get_queryset(self, tg_user: TgUser) -> QuerySet:
+        return BoardParticipant.objects.filter(
+            user=tg_user.user_id, board__is_deleted=False,
+        ).select_related("board").order_by("id")
+
+    def render(self, participant: BoardParticipant) -> str:
+        return f"Название карточек: {participant.board}"
+
+
+LISTINGS: dict[str, Listing] = {listing.name: listing for listing in (GoalListing(), BoardListing())}
+
+
+def parse_callback(data: str | None) -> tuple[Listing, str, int] | None:
+    """ Разбирает `callback_data` кнопки списка: `<список>:<next|prev>:<id>`; чужие и битые данные — None """
+    try:
+        name, direction, cursor = (data or "").split(":")
+        if direction not in (NEXT, PREV):
+            return None
+        return LISTINGS[name], direction, int(cursor)
+    except (KeyError, ValueError):
+        return None
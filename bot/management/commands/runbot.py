@@ -1,20 +1,23 @@
+import asyncio
 import logging
-from django.conf import settings
+from django.core.cache import cache
 from django.core.management import BaseCommand
+from bot.listings import BoardListing, GoalListing, Page, parse_callback
 from bot.models import TgUser
-from bot.tg.client import TgClient
-from bot.tg.dc import Message
-from goals.models import Goal, GoalCategory, BoardParticipant, Board
+from bot.outbox import Outbox, Priority
+from bot.runner import MAX_PENDING, WORKERS, BotRunner
+from bot.tg.client import get_client
+from bot.tg.dc import CallbackQuery, Message, UpdateObj
+from bot.tg.transport import TgError
+from goals.models import Goal, GoalCategory
 
-# =============== Enable logging  ==============================
-logging.basicConfig(format="%(asctime)s - %(name)s - %(levelname)s - %(message)s", level=logging.INFO)
 logger = logging.getLogger(__name__)
-logger.info("start bot")
 
-user_states = {'state': {}}
-cat_id = []
-logger.info(user_states)
-logger.info(cat_id)
+# Состояние диалога создания цели хранится в общем кэше, а не в памяти процесса: вебхук может принять следующее
+# сообщение чата в другом процессе или после перезапуска
+DIALOG_KEY: str = "bot:create:{chat_id}"
+# Брошенный диалог забывается через сутки
+DIALOG_TIMEOUT: int = 24 * 60 * 60
 
 
 class Command(BaseCommand):
@@ -22,22 +25,49 @@ class Command(BaseCommand):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.tg_client = TgClient(settings.BOT_TOKEN)
-
-    def handle(self, *args, **kwargs):
-        offset = 0
-        while True:
-            res = self.tg_client.get_updates(offset=offset)
-            for item in res.result:
-                offset = item.update_id + 1
-                self.handle_message(item.message)
+        self.tg_client = get_client()
+        self.outbox = Outbox(self.tg_client)
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--workers", type=int, default=WORKERS, help="Сколько сообщений обрабатывать одновременно")
+        parser.add_argument("--max-pending", type=int, default=MAX_PENDING,
+                            help="Сколько необработанных сообщений копить, прежде чем притормозить опрос")
+
+    def handle(self, *args, **options):
+        # =============== Enable logging  ==============================
+        # Только при запуске команды: обработчики импортирует и веб-процесс (вебхук)
+        logging.basicConfig(format="%(asctime)s - %(name)s - %(levelname)s - %(message)s", level=logging.INFO)
+        logger.info("start bot")
+        self.outbox.start()
+        runner = BotRunner(self.tg_client, self.handle_update, options["workers"], options["max_pending"])
+        asyncio.run(runner.run())
+
+    def handle_update(self, update: UpdateObj):
+        if update.message:
+            self.handle_message(update.message)
+        elif update.callback_query:
+            self.handle_callback(update.callback_query)
+
+    def handle_callback(self, query: CallbackQuery):
+        """ Кнопки «Назад»/«Далее» под списком: сообщение со списком заменяется соседней страницей """
+        try:
+            self.tg_client.answer_callback_query(query.id)
+        except TgError:
+            logger.exception("bot: не удалось ответить на нажатие кнопки")
+        parsed = parse_callback(query.data)
+        tg_user = TgUser.objects.filter(user_ud=query.from_.id, user__isnull=False).first()
+        if parsed is None or tg_user is None or query.message is None:
+            return
+        listing, direction, cursor = parsed
+        page = listing.page(tg_user, direction, cursor)
+        self.outbox.edit_message_text(query.message.chat.id, query.message.message_id, page.text, page.reply_markup)
 
     def handle_message(self, msg: Message):
         # logger.info(f'{msg}')
         tg_user, created = TgUser.objects.get_or_create(user_ud=msg.from_.id, defaults={"chat_id": msg.chat.id,
                                                                                         "username": msg.from_.username})
         if "/start" in msg.text:
-            self.tg_client.send_message(
+            self.outbox.send_message(
                 msg.chat.id, "Приветствую!\n"
                              'BOT Принимает и обрабатывает следующие команды:\n'
                              '/board -> выводит список досок задач\n'
@@ -54,7 +84,7 @@ class Command(BaseCommand):
     #
     def handle_user_without_verification(self, msg: Message, tg_user: TgUser):
         """ Проверочный код. Обрабатывать пользователя без проверки """
-        self.tg_client.send_message(
+        self.outbox.send_message(
             msg.chat.id,
             'Добро пожаловать в бот @ToDo_korp_bot\n'
             'Для продолжения работы необходимо привязать\n'
@@ -62,7 +92,7 @@ class Command(BaseCommand):
         )
         tg_user.set_verification_code()
         tg_user.save(update_fields=["verification_code"])
-        self.tg_client.send_message(msg.chat.id, f"Верификационный  код: {tg_user.verification_code}")
+        self.outbox.send_message(msg.chat.id, f"Верификационный  код: {tg_user.verification_code}")
 
     def handle_verified_user(self, msg: Message, tg_user: TgUser):
         """ Для работы с верифицированным пользователем.
@@ -75,6 +105,7 @@ class Command(BaseCommand):
         :param: /choose -> позволяет сделать выбор категории
         """
         allowed_commands = ['/goals', '/create', '/cancel']
+        state: dict = self.get_state(msg.chat.id)
 
         if not msg.text:
             return
@@ -91,43 +122,43 @@ class Command(BaseCommand):
         elif '/cancel' in msg.text:
             self.get_cancel(msg, tg_user)
 
-        elif ('user' not in user_states['state']) and (msg.text not in allowed_commands):
-            self.tg_client.send_message(tg_user.chat_id, 'Неизвестная команда')
+        elif ('user_id' not in state) and (msg.text not in allowed_commands):
+            self.outbox.send_message(tg_user.chat_id, 'Неизвестная команда')
 
-        elif (msg.text not in allowed_commands) and (user_states['state']['user']) and (
-                'category' not in user_states['state']):
+        elif (msg.text not in allowed_commands) and (state['user_id']) and ('category_id' not in state):
             category = self.handle_save_category(msg, tg_user)
             if category:
                 # Корректное значение или ID категории
-                user_states['state']['category'] = category
-                self.tg_client.send_message(tg_user.chat_id,
-                                            f'Выбрана категория:\n {category}.\nВведите заголовок цели.')
+                state['category_id'] = category.id
+                self.save_state(msg.chat.id, state)
+                self.outbox.send_message(tg_user.chat_id,
+                                         f'Выбрана категория:\n {category}.\nВведите заголовок цели.')
             else:
                 # Некорректное значение или ID категории
-                self.tg_client.send_message(tg_user.chat_id,
-                                            'Некорректная категория. Пожалуйста, укажите верное значение.')
-
-        elif (msg.text not in allowed_commands) and (user_states['state']['user']) and (
-        user_states['state']['category']) and ('goal_title' not in user_states['state']):
-            user_states['state']['goal_title'] = msg.text
-            logger.info(user_states)
-            goal = Goal.objects.create(title=user_states['state']['goal_title'], user=user_states['state']['user'],
-                                       category=user_states['state']['category'], )
-            self.tg_client.send_message(tg_user.chat_id, f'Цель: {goal} создана в БД')
-            del user_states['state']['user']
-            del user_states['state']['msg_chat_id']
-            del user_states['state']['category']
-            del user_states['state']['goal_title']
-            cat_id.clear()
+                self.outbox.send_message(tg_user.chat_id,
+                                         'Некорректная категория. Пожалуйста, укажите верное значение.')
+
+        elif (msg.text not in allowed_commands) and (state['user_id']) and (state['category_id']):
+            goal = Goal.objects.create(title=msg.text, user_id=state['user_id'], category_id=state['category_id'])
+            self.outbox.send_message(tg_user.chat_id, f'Цель: {goal} создана в БД')
+            cache.delete(DIALOG_KEY.format(chat_id=msg.chat.id))
+
+    @staticmethod
+    def get_state(chat_id: int) -> dict:
+        """ Состояние диалога создания цели: `user_id`, затем `category_id`; пустое, если диалога нет """
+        return cache.get(DIALOG_KEY.format(chat_id=chat_id), {})
+
+    @staticmethod
+    def save_state(chat_id: int, state: dict) -> None:
+        """
+        Сохраняет состояние диалога. Сообщения одного чата обрабатываются строго по очереди (ChatDispatcher),
+        поэтому чтение и запись состояния чата не перемежаются
+        """
+        cache.set(DIALOG_KEY.format(chat_id=chat_id), state, DIALOG_TIMEOUT)
 
     def fetch_board(self, msg: Message, tg_user: TgUser):
-        """ Получаем список участников Board. Если участника нет Board, то отправим ему сообщение"""
-        boards = BoardParticipant.objects.filter(user=tg_user.user)
-        # logger.info(boards)
-        if boards:
-            [self.tg_client.send_message(msg.chat.id, f"Название карточек: {item.board}\n") for item in boards]
-        else:
-            self.tg_client.send_message(msg.chat.id, "Нет у вас Board")
+        """ Первая страница досок пользователя; следующие загружаются кнопками под сообщением """
+        self.send_page(msg.chat.id, BoardListing().page(tg_user))
 
     def fetch_category(self, msg: Message, tg_user: TgUser):
         """
@@ -139,10 +170,10 @@ class Command(BaseCommand):
             for category in GoalCategory.objects.filter(
                 board__participants__user=tg_user.user_id, is_deleted=False)]
         if resp_categories:
-            self.tg_client.send_message(msg.chat.id,
-                                        "🏷 Ваши категории\n===================\n" + '\n'.join(resp_categories))
+            self.outbox.send_message(msg.chat.id,
+                                     "🏷 Ваши категории\n===================\n" + '\n'.join(resp_categories))
         else:
-            self.tg_client.send_message(msg.chat.id, 'У Вас нет ни одной категории!')
+            self.outbox.send_message(msg.chat.id, 'У Вас нет ни одной категории!')
 
     def handle_categories(self, msg: Message, tg_user: TgUser):
         """
@@ -154,34 +185,27 @@ class Command(BaseCommand):
             cat_text = ''
             for cat in categories:
                 cat_text += f'{cat.id}: {cat.title} \n'
-                cat_id.append(cat.id)
-            self.tg_client.send_message(
+            self.outbox.send_message(
                 chat_id=tg_user.chat_id,
                 text=f'Выберите номер категории для новой цели:\n========================\n{cat_text}'
                      f'Или нажмите /cancel для отмены'
             )
-            if 'user' not in user_states['state']:
-                user_states['state']['user'] = tg_user.user
-                user_states['state']['msg_chat_id'] = tg_user.chat_id
-                logger.info(user_states)
+            state: dict = self.get_state(msg.chat.id)
+            if 'user_id' not in state:
+                state['user_id'] = tg_user.user_id
+                self.save_state(msg.chat.id, state)
         else:
-            self.tg_client.send_message(msg.chat.id, 'список категорий пуст')
+            self.outbox.send_message(msg.chat.id, 'список категорий пуст')
 
     def fetch_tasks(self, msg: Message, tg_user: TgUser):
         """
-        Получение всех целей пользователя в Telegram.
+        Первая страница целей пользователя одним сообщением; следующие загружаются кнопками под сообщением.
         Если целей у пользователя нет, то отправить сообщение, что целей нет.
         """
-        goals = Goal.objects.filter(user=tg_user.user)
-        if goals.count() > 0:
-            [self.tg_client.send_message(tg_user.chat_id,
-                                         f'Название: {goal.title},\n'
-                                         f'Категория: {goal.category},\n'
-                                         f'Статус: {goal.get_status_display()},\n'
-                                         f'Пользователь: {goal.user},\n'
-                                         f'Дедлайн {goal.due_date if goal.due_date else "Нет"} \n') for goal in goals]
-        else:
-            self.tg_client.send_message(msg.chat.id, "Список целей пуст.")
+        self.send_page(msg.chat.id, GoalListing().page(tg_user))
+
+    def send_page(self, chat_id: int, page: Page):
+        self.outbox.send_message(chat_id, page.text, Priority.bulk, page.reply_markup)
 
     @staticmethod
     def handle_save_category(msg: Message, tg_user: TgUser):
@@ -197,13 +221,5 @@ class Command(BaseCommand):
             return None
 
     def get_cancel(self, msg: Message, tg_user: TgUser):
-        if 'user' in user_states['state']:
-            del user_states['state']['user']
-            del user_states['state']['msg_chat_id']
-
-            if 'category' in user_states['state']:
-                del user_states['state']['category']
-
-            if 'goal_title' in user_states['state']:
-                del user_states['state']['goal_title']
-        self.tg_client.send_message(tg_user.chat_id, 'Операция отменена')
+        cache.delete(DIALOG_KEY.format(chat_id=msg.chat.id))
+        self.outbox.send_message(tg_user.chat_id, 'Операция отменена')
@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from django.urls import reverse
+
+from bot.tg.client import get_client
+from bot.tg.dc import OkResponse
+from bot.tg.transport import TgError
+
+
+class Command(BaseCommand):
+    help = ("Регистрирует вебхук бота или, с --delete, отключает его. "
+            "Пока вебхук зарегистрирован, runbot (long polling) не получает обновлений")
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("base_url", nargs="?", help="Публичный адрес сайта, например https://example.com")
+        parser.add_argument("--delete", action="store_true", help="Отключить вебхук и вернуться к long polling")
+        parser.add_argument("--drop-pending", action="store_true",
+                            help="При отключении выбросить накопившиеся необработанные обновления")
+        parser.add_argument("--max-connections", type=int, help="Сколько запросов Telegram шлёт одновременно")
+
+    def handle(self, *args, **options) -> None:
+        try:
+            if options["delete"]:
+                response: OkResponse = get_client().delete_webhook(options["drop_pending"])
+            else:
+                if not options["base_url"]:
+                    raise CommandError("Укажите публичный адрес сайта")
+                if not settings.BOT_WEBHOOK_SECRET:
+                    raise CommandError("Задайте BOT_WEBHOOK_SECRET: без него вебхук отклоняет все обновления")
+                url: str = options["base_url"].rstrip("/") + reverse("bot:webhook")
+                response = get_client().set_webhook(url, settings.BOT_WEBHOOK_SECRET, options["max_connections"])
+        except TgError as error:
+            raise CommandError(str(error))
+        self.stdout.write(response.description or "ok")
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.1 on 2026-10-18 20:42
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Индексы строятся CONCURRENTLY, не блокируя запись в таблицы
+    atomic = False
+
+    dependencies = [
+        ('bot', '0002_alter_tguser_verification_code'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='tguser',
+            index=models.Index(fields=['verification_code'], name='tguser_verification_code_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.1 on 2026-10-18 22:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bot', '0003_tguser_verification_code_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WebhookUpdate',
+            fields=[
+                ('update_id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='update id')),
+                ('payload', models.JSONField(verbose_name='Обновление')),
+                ('received_at', models.DateTimeField(auto_now_add=True, verbose_name='Получено')),
+            ],
+            options={
+                'verbose_name': 'Обновление вебхука',
+                'verbose_name_plural': 'Обновления вебхука',
+            },
+        ),
+    ]
@@ -33,3 +33,21 @@ class TgUser(models.Model):
     class Meta:
         verbose_name: str = "Телеграм Пользователь"
         verbose_name_plural: str = "Телеграм Пользователи"
+        indexes: list = [
+            # Поиск по коду подтверждения при привязке аккаунта
+            models.Index(fields=["verification_code"], name="tguser_verification_code_idx"),
+        ]
+
+
+class WebhookUpdate(models.Model):
+    """
+    Обновление, принятое вебхуком и ещё не обработанное. Запись создаётся до ответа Telegram и удаляется после
+    обработки; оставшиеся после перезапуска процесса записи обрабатываются заново (bot/webhook.py).
+    """
+    update_id: models.BigIntegerField = models.BigIntegerField(verbose_name="update id", primary_key=True)
+    payload: models.JSONField = models.JSONField(verbose_name="Обновление")
+    received_at: models.DateTimeField = models.DateTimeField(verbose_name="Получено", auto_now_add=True)
+
+    class Meta:
+        verbose_name: str = "Обновление вебхука"
+        verbose_name_plural: str = "Обновления вебхука"
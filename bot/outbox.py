@@ -0,0 +1,229 @@
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from enum import IntEnum
+
+from bot.tg.client import TgClient
+from bot.tg.dc import InlineKeyboardMarkup
+
+logger = logging.getLogger(__name__)
+
+# Ограничения Telegram: не больше ~1 сообщения в секунду в один чат и ~30 в секунду всего
+CHAT_RATE: float = 1
+GLOBAL_RATE: float = 30
+MAX_CHAT_QUEUE: int = 50
+SENDERS: int = 4
+METRICS_INTERVAL: float = 60
+# За сколько последних секунд считается скорость отправки в `Outbox.stats`
+RATE_WINDOW: float = 60
+
+
+class Priority(IntEnum):
+    """ Приоритет исходящего сообщения: ответы на команды отправляются раньше длинных списков """
+    interactive = 0
+    bulk = 1
+
+
+class TokenBucket:
+    """ Корзина токенов: `rate` токенов в секунду, не больше `capacity` про запас. Не потокобезопасна. """
+
+    def __init__(self, rate: float, capacity: float = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens: float = capacity
+        self.updated: float = time.monotonic()
+
+    def delay(self, now: float) -> float:
+        """ Через сколько секунд появится токен; 0 — можно отправлять сейчас """
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return 0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        self.tokens -= 1
+
+
+@dataclass
+class Outgoing:
+    """ Вызов метода клиента, отправляющего сообщение в чат `chat_id` """
+    chat_id: int
+    method: str
+    kwargs: dict
+    priority: Priority
+    enqueued: float
+
+
+class ChatOutbox:
+    """ Очередь сообщений одного чата: отдельная очередь на каждый приоритет и своя корзина токенов """
+
+    def __init__(self, rate: float):
+        self.bucket: TokenBucket = TokenBucket(rate)
+        self.queues: tuple[deque[Outgoing], ...] = tuple(deque() for _ in Priority)
+        self.busy: bool = False
+
+    def __len__(self) -> int:
+        return sum(len(queue) for queue in self.queues)
+
+    def head(self) -> Outgoing:
+        return next(queue[0] for queue in self.queues if queue)
+
+    def pop(self) -> Outgoing:
+        return next(queue.popleft() for queue in self.queues if queue)
+
+
+class Outbox:
+    """
+    Планировщик исходящих сообщений бота.
+    `send_message` ставит сообщение в очередь чата и сразу возвращается; `senders` потоков отправляют сообщения,
+    соблюдая корзины токенов чата и общую. Из готовых к отправке чатов первым выбирается сообщение с более высоким
+    приоритетом, при равном — дольше ждущее. Сообщения одного приоритета в чате уходят по порядку и никогда
+    не отправляются параллельно. Если в очереди чата `max_chat_queue` сообщений, `send_message` ждёт
+    освобождения места — обработчик такого чата притормаживает, остальные чаты не страдают.
+    """
+
+    def __init__(self, client: TgClient, chat_rate: float = CHAT_RATE, global_rate: float = GLOBAL_RATE,
+                 max_chat_queue: int = MAX_CHAT_QUEUE, senders: int = SENDERS):
+        self.client = client
+        self.chat_rate = chat_rate
+        self.max_chat_queue = max_chat_queue
+        self.senders = senders
+        self.bucket: TokenBucket = TokenBucket(global_rate, capacity=global_rate)
+        self.chats: dict[int, ChatOutbox] = {}
+        self.cond: threading.Condition = threading.Condition()
+        self.threads: list[threading.Thread] = []
+        self.sent: int = 0
+        self.failed: int = 0
+        self.wait_total: float = 0
+        self.wait_max: float = 0
+        self.started: float = time.monotonic()
+        self.sent_times: deque[float] = deque()
+        self.reported: float = self.started
+
+    def start(self) -> None:
+        """ Запускает потоки отправки (повторный вызов ничего не делает) """
+        with self.cond:
+            if self.threads:
+                return
+            self.threads = [threading.Thread(target=self.run, name=f"bot-outbox-{i}", daemon=True)
+                            for i in range(self.senders)]
+        for thread in self.threads:
+            thread.start()
+
+    def send_message(self, chat_id: int, text: str, priority: Priority = Priority.interactive,
+                     reply_markup: InlineKeyboardMarkup | None = None) -> None:
+        """ Ставит сообщение в очередь; ждёт, пока в очереди чата не освободится место. """
+        kwargs: dict = {"text": text} if reply_markup is None else {"text": text, "reply_markup": reply_markup}
+        self.put(Outgoing(chat_id, "send_message", kwargs, priority, time.monotonic()))
+
+    def edit_message_text(self, chat_id: int, message_id: int, text: str,
+                          reply_markup: InlineKeyboardMarkup | None = None,
+                          priority: Priority = Priority.interactive) -> None:
+        """ Ставит в очередь замену текста сообщения: Telegram ограничивает правки так же, как отправку """
+        kwargs: dict = {"message_id": message_id, "text": text, "reply_markup": reply_markup}
+        self.put(Outgoing(chat_id, "edit_message_text", kwargs, priority, time.monotonic()))
+
+    def put(self, message: Outgoing) -> None:
+        with self.cond:
+            while True:
+                chat: ChatOutbox = self.chats.setdefault(message.chat_id, ChatOutbox(self.chat_rate))
+                if len(chat) < self.max_chat_queue:
+                    break
+                self.cond.wait()
+            chat.queues[message.priority].append(message)
+            self.cond.notify_all()
+
+    def take(self) -> tuple[ChatOutbox, Outgoing]:
+        """ Ждёт следующее сообщение, которое можно отправить, и забирает токены под него. """
+        with self.cond:
+            while True:
+                now: float = time.monotonic()
+                wait: float | None = None
+                best: tuple[ChatOutbox, Outgoing] | None = None
+                for chat_id, chat in list(self.chats.items()):
+                    if chat.busy:
+                        continue
+                    delay: float = chat.bucket.delay(now)
+                    if not chat:
+                        if not delay:
+                            # Пустая очередь с полной корзиной ничем не отличается от отсутствующей
+                            del self.chats[chat_id]
+                        continue
+                    if delay:
+                        wait = delay if wait is None else min(wait, delay)
+                        continue
+                    head: Outgoing = chat.head()
+                    if best is None or (head.priority, head.enqueued) < (best[1].priority, best[1].enqueued):
+                        best = (chat, head)
+                if best is not None:
+                    delay = self.bucket.delay(now)
+                    if not delay:
+                        chat = best[0]
+                        chat.busy = True
+                        chat.bucket.take()
+                        self.bucket.take()
+                        message: Outgoing = chat.pop()
+                        self.cond.notify_all()
+                        return chat, message
+                    wait = delay
+                self.cond.wait(wait)
+
+    def run(self) -> None:
+        """
+        Цикл потока отправки. Любая ошибка отправки только учитывается в метриках: поток не должен
+        погибнуть, а чат — навсегда остаться занятым.
+        """
+        while True:
+            chat, message = self.take()
+            waited: float = time.monotonic() - message.enqueued
+            sent: bool = False
+            try:
+                getattr(self.client, message.method)(message.chat_id, **message.kwargs)
+                sent = True
+            except Exception:
+                logger.exception("outbox: сообщение в чат %s не отправлено", message.chat_id)
+            finally:
+                with self.cond:
+                    chat.busy = False
+                    if sent:
+                        self.sent += 1
+                        self.sent_times.append(time.monotonic())
+                    else:
+                        self.failed += 1
+                    self.wait_total += waited
+                    self.wait_max = max(self.wait_max, waited)
+                    self.cond.notify_all()
+                    if time.monotonic() - self.reported >= METRICS_INTERVAL:
+                        self.reported = time.monotonic()
+                        logger.info("outbox: %s", self.stats())
+
+    def stats(self) -> dict:
+        """
+        Счётчики планировщика: глубина очередей по приоритетам и всего, число чатов с сообщениями,
+        отправленные и неотправленные сообщения, скорость отправки (сообщений в секунду за последние
+        `RATE_WINDOW` секунд) и время ожидания отправки в секундах
+        """
+        with self.cond:
+            now: float = time.monotonic()
+            while self.sent_times and now - self.sent_times[0] > RATE_WINDOW:
+                self.sent_times.popleft()
+            window: float = min(RATE_WINDOW, now - self.started)
+            depth: dict[str, int] = {priority.name: sum(len(chat.queues[priority]) for chat in self.chats.values())
+                                     for priority in Priority}
+            handled: int = self.sent + self.failed
+            return {
+                "depth": depth,
+                "queued": sum(depth.values()),
+                "chats": sum(1 for chat in self.chats.values() if chat),
+                "sent": self.sent,
+                "failed": self.failed,
+                "rate": round(len(self.sent_times) / window, 3) if window > 0 else 0,
+                "wait_avg": round(self.wait_total / handled, 3) if handled else 0,
+                "wait_max": round(self.wait_max, 3),
+            }
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """ Ждёт отправки всех сообщений из очереди; False — не дождались за `timeout` """
+        with self.cond:
+            return self.cond.wait_for(lambda: not any(chat or chat.busy for chat in self.chats.values()), timeout)
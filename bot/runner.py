@@ -0,0 +1,119 @@
+import asyncio
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from django.db import close_old_connections
+
+from bot.tg.client import TgClient
+from bot.tg.dc import UpdateObj
+
+logger = logging.getLogger(__name__)
+
+WORKERS: int = 8
+MAX_PENDING: int = 1000
+POLL_ERROR_DELAY: float = 5
+
+
+class ChatDispatcher:
+    """
+    Параллельная обработка входящих обновлений (сообщений и нажатий кнопок).
+    Разные чаты обрабатываются одновременно, но не более чем `workers` обновлений за раз; обновления одного чата —
+    строго по очереди, в порядке получения. Если необработанных обновлений больше `max_pending`,
+    `submit` ждёт, пока очередь не разгрузится, и тем самым притормаживает опрос Telegram.
+    """
+
+    def __init__(self, handler: Callable[[UpdateObj], None], workers: int = WORKERS, max_pending: int = MAX_PENDING):
+        self.handler = handler
+        self.executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bot")
+        self.slots: asyncio.Semaphore = asyncio.Semaphore(workers)
+        self.pending: asyncio.Semaphore = asyncio.Semaphore(max_pending)
+        self.queues: dict[int, deque[UpdateObj]] = {}
+        self.tasks: set[asyncio.Task] = set()
+
+    async def submit(self, update: UpdateObj) -> None:
+        """ Ставит обновление в очередь его чата; для чата без активной очереди запускает обработчик. """
+        await self.pending.acquire()
+        queue: deque[UpdateObj] | None = self.queues.get(update.chat_id)
+        if queue is not None:
+            queue.append(update)
+            return
+        self.queues[update.chat_id] = deque([update])
+        task: asyncio.Task = asyncio.create_task(self.drain(update.chat_id))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def drain(self, chat_id: int) -> None:
+        """ Обрабатывает обновления чата одно за другим, пока его очередь не опустеет. """
+        queue: deque[UpdateObj] = self.queues[chat_id]
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        try:
+            while queue:
+                update: UpdateObj = queue.popleft()
+                try:
+                    async with self.slots:
+                        await loop.run_in_executor(self.executor, self.call, update)
+                except Exception:
+                    logger.exception("bot: ошибка обработки обновления %s чата %s", update.update_id, chat_id)
+                finally:
+                    self.pending.release()
+        finally:
+            del self.queues[chat_id]
+
+    def call(self, update: UpdateObj) -> None:
+        """ Вызов обработчика в потоке пула; соединения с БД закрываются так же, как после HTTP-запроса. """
+        close_old_connections()
+        try:
+            self.handler(update)
+        finally:
+            close_old_connections()
+
+    async def join(self) -> None:
+        """ Ждёт обработки всех принятых обновлений. """
+        while self.tasks:
+            await asyncio.gather(*self.tasks)
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class BotRunner:
+    """
+    Асинхронный long polling: запрос `getUpdates` выполняется в отдельном потоке и не ждёт обработчиков,
+    полученные обновления передаются в `ChatDispatcher`.
+    """
+
+    def __init__(self, client: TgClient, handler: Callable[[UpdateObj], None], workers: int = WORKERS,
+                 max_pending: int = MAX_PENDING):
+        self.client = client
+        self.dispatcher: ChatDispatcher = ChatDispatcher(handler, workers, max_pending)
+        self.offset: int = 0
+
+    async def poll(self) -> None:
+        """
+        Один запрос `getUpdates`: обновления передаются в диспетчер, смещение сдвигается за последнее полученное,
+        включая пропущенные клиентом неразборчивые.
+        """
+        response = await asyncio.to_thread(self.client.get_updates, offset=self.offset)
+        if response.next_offset is not None:
+            self.offset = max(self.offset, response.next_offset)
+        for item in response.result:
+            self.offset = max(self.offset, item.update_id + 1)
+            if item.message or item.callback_query:
+                await self.dispatcher.submit(item)
+
+    async def run(self) -> None:
+        """
+        Опрос до остановки процесса. Любая ошибка опроса — Telegram недоступен после повторов транспорта,
+        ответ не разобран — записывается в лог и только откладывает следующий опрос.
+        """
+        try:
+            while True:
+                try:
+                    await self.poll()
+                except Exception:
+                    logger.exception("bot: getUpdates не выполнен")
+                    await asyncio.sleep(POLL_ERROR_DELAY)
+        finally:
+            self.dispatcher.close()
@@ -1,25 +1,92 @@
-import requests
+import logging
+from functools import lru_cache
 
-from bot.tg.dc import GetUpdatesResponse, SendMessageResponse
+from django.conf import settings
+from marshmallow import ValidationError
+
+from bot.tg.dc import GetUpdatesResponse, InlineKeyboardMarkup, OkResponse, SendMessageResponse, UpdateObj
+from bot.tg.transport import TgTransport
+
+logger = logging.getLogger(__name__)
+
+# Запас к таймауту long polling: Telegram держит запрос `timeout` секунд и только потом отвечает
+POLL_TIMEOUT_MARGIN: int = 10
+# Какие обновления нужны боту — одинаково для long polling и вебхука
+ALLOWED_UPDATES: list[str] = ["message", "callback_query"]
 
 
 class TgClient:
-    def __init__(self, token):
+    def __init__(self, token, transport: TgTransport | None = None):
         self.token = token
+        self.transport: TgTransport = transport or TgTransport(token)
 
     def get_url(self, method: str) -> str:
         """ URL для запроса к Telegram боту через токен """
-        return f"https://api.telegram.org/bot{self.token}/{method}"
+        return self.transport.get_url(method)
 
     def get_updates(self, offset: int = 0, timeout: int = 60) -> GetUpdatesResponse:
         """ Получение ботом исходящих сообщений от пользователя """
-        url = self.get_url("getUpdates")
-        resp = requests.get(url, params={"offset": offset, "timeout": timeout,
-                                         "allowed_updates": ["update_id", "message"]})
-        return GetUpdatesResponse.Schema().load(resp.json())
+        data: dict = self.transport.call("getUpdates", {"offset": offset, "timeout": timeout,
+                                                        "allowed_updates": ALLOWED_UPDATES},
+                                         timeout=timeout + POLL_TIMEOUT_MARGIN)
+        return self.parse_updates(data)
 
-    def send_message(self, chat_id: int, text: str) -> SendMessageResponse:
+    @staticmethod
+    def parse_updates(data: dict) -> GetUpdatesResponse:
+        """
+        Разбор ответа getUpdates по одному обновлению: неразборчивое обновление (например, от пользователя
+        без username) пропускается, но `next_offset` сдвигается и за него, иначе Telegram присылал бы его вечно.
+        """
+        updates: list[UpdateObj] = []
+        update_ids: list[int] = []
+        for item in data.get("result", []):
+            update_id = item.get("update_id") if isinstance(item, dict) else None
+            if isinstance(update_id, int):
+                update_ids.append(update_id)
+            try:
+                updates.append(UpdateObj.Schema().load(item))
+            except ValidationError as error:
+                logger.warning("bot: обновление %s пропущено: %s", update_id, error.messages)
+        return GetUpdatesResponse(ok=data.get("ok", True), result=updates,
+                                  next_offset=max(update_ids) + 1 if update_ids else None)
+
+    def send_message(self, chat_id: int, text: str,
+                     reply_markup: InlineKeyboardMarkup | None = None) -> SendMessageResponse:
         """ Получение пользователем сообщений от бота """
-        url = self.get_url("sendMessage")
-        resp = requests.post(url, params={"chat_id": chat_id, "text": text})
-        return SendMessageResponse.Schema().load(resp.json())
+        payload: dict = {"chat_id": chat_id, "text": text}
+        if reply_markup is not None:
+            payload["reply_markup"] = InlineKeyboardMarkup.Schema().dump(reply_markup)
+        data: dict = self.transport.call("sendMessage", payload)
+        return SendMessageResponse.Schema().load(data)
+
+    def edit_message_text(self, chat_id: int, message_id: int, text: str,
+                          reply_markup: InlineKeyboardMarkup | None = None) -> SendMessageResponse:
+        """ Замена текста и клавиатуры ранее отправленного ботом сообщения """
+        payload: dict = {"chat_id": chat_id, "message_id": message_id, "text": text}
+        if reply_markup is not None:
+            payload["reply_markup"] = InlineKeyboardMarkup.Schema().dump(reply_markup)
+        data: dict = self.transport.call("editMessageText", payload)
+        return SendMessageResponse.Schema().load(data)
+
+    def answer_callback_query(self, callback_query_id: str) -> OkResponse:
+        """ Подтверждение нажатия кнопки: Telegram убирает индикатор загрузки на кнопке """
+        data: dict = self.transport.call("answerCallbackQuery", {"callback_query_id": callback_query_id})
+        return OkResponse.Schema().load(data)
+
+    def set_webhook(self, url: str, secret_token: str, max_connections: int | None = None) -> OkResponse:
+        """ Регистрация вебхука: Telegram начнёт присылать обновления POST-запросами на `url`, getUpdates отключится """
+        payload: dict = {"url": url, "secret_token": secret_token, "allowed_updates": ALLOWED_UPDATES}
+        if max_connections is not None:
+            payload["max_connections"] = max_connections
+        return OkResponse.Schema().load(self.transport.call("setWebhook", payload))
+
+    def delete_webhook(self, drop_pending_updates: bool = False) -> OkResponse:
+        """ Отключение вебхука: обновления снова можно получать через getUpdates """
+        data: dict = self.transport.call("deleteWebhook", {"drop_pending_updates": drop_pending_updates})
+        return OkResponse.Schema().load(data)
+
+
+@lru_cache(maxsize=None)
+def get_client() -> TgClient:
+    """ Общий на процесс клиент: один пул соединений и один размыкатель цепи для бота и веб-приложения """
+    return TgClient(settings.BOT_TOKEN)
@@ -43,11 +43,54 @@ class Message:
         unknown = EXCLUDE
 
 
+@dataclass
+class InlineKeyboardButton:
+    """ Кнопка под сообщением; нажатие приходит боту как `callback_query` с `callback_data` """
+    text: str
+    callback_data: str
+
+    class Meta:
+        unknown = EXCLUDE
+
+
+@dataclass
+class InlineKeyboardMarkup:
+    """ Клавиатура под сообщением: ряды кнопок """
+    inline_keyboard: List[List[InlineKeyboardButton]]
+
+    Schema: ClassVar[Type[Schema]] = Schema
+
+    class Meta:
+        unknown = EXCLUDE
+
+
+@dataclass
+class CallbackQuery:
+    """ Нажатие кнопки клавиатуры под сообщением бота """
+    id: str
+    from_: MessageFrom = field(metadata={"data_key": "from"})
+    message: Optional[Message] = None
+    data: Optional[str] = None
+
+    class Meta:
+        unknown = EXCLUDE
+
+
 @dataclass
 class UpdateObj:
     """ Обновить объект """
     update_id: int
-    message: Message
+    message: Optional[Message] = None
+    callback_query: Optional[CallbackQuery] = None
+
+    @property
+    def chat_id(self) -> int:
+        """ Чат, к которому относится обновление; для кнопок под inline-сообщениями — личный чат пользователя """
+        if self.message:
+            return self.message.chat.id
+        if self.callback_query.message:
+            return self.callback_query.message.chat.id
+        return self.callback_query.from_.id
 
     class Meta:
         unknown = EXCLUDE
@@ -58,6 +101,21 @@ class GetUpdatesResponse:
     """ Получить ответ об обновлениях """
     ok: bool
     result: List[UpdateObj]
+    # Смещение для следующего getUpdates: за последним полученным обновлением, в том числе неразобранным
+    next_offset: Optional[int] = None
+
+    Schema: ClassVar[Type[Schema]] = Schema
+
+    class Meta:
+        unknown = EXCLUDE
+
+
+@dataclass
+class OkResponse:
+    """ Ответ методов, которые возвращают только признак успеха (answerCallbackQuery, setWebhook, ...) """
+    ok: bool
+    result: bool
+    description: Optional[str] = None
 
     Schema: ClassVar[Type[Schema]] = Schema
 
@@ -0,0 +1,165 @@
+import logging
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+API_URL: str = "https://api.telegram.org"
+POOL_SIZE: int = 16
+CONNECT_TIMEOUT: float = 5
+READ_TIMEOUT: float = 15
+RETRIES: int = 3
+BACKOFF_BASE: float = 0.5
+BACKOFF_MAX: float = 10
+MAX_RETRY_AFTER: float = 60
+FAILURE_THRESHOLD: int = 5
+RESET_TIMEOUT: float = 30
+# Методы, повтор которых ничего не меняет: их можно повторить, даже если первый запрос мог дойти до Telegram
+IDEMPOTENT_METHODS: frozenset = frozenset({
+    "getMe", "getUpdates", "getChat", "getWebhookInfo", "setWebhook", "deleteWebhook",
+})
+
+
+class TgError(Exception):
+    """ Запрос к Telegram Bot API не выполнен """
+
+
+class TgApiError(TgError):
+    """ Telegram ответил ошибкой (`ok: false`) """
+
+    def __init__(self, method: str, error_code: int, description: str, retry_after: float | None = None):
+        super().__init__(f"{method}: {error_code} {description}")
+        self.error_code = error_code
+        self.description = description
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(TgError):
+    """ Запросы временно не отправляются: Telegram недоступен """
+
+
+class CircuitBreaker:
+    """
+    Размыкатель цепи: после `threshold` неудач подряд запросы отклоняются сразу в течение `reset_timeout` секунд,
+    затем пропускается один пробный запрос; его успех замыкает цепь, неудача размыкает её снова.
+    """
+
+    def __init__(self, threshold: int = FAILURE_THRESHOLD, reset_timeout: float = RESET_TIMEOUT):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures: int = 0
+        self.opened_at: float | None = None
+        self.probing: bool = False
+        self.lock: threading.Lock = threading.Lock()
+
+    def before(self) -> None:
+        """ Разрешает запрос или поднимает `CircuitOpenError`. """
+        with self.lock:
+            if self.opened_at is None:
+                return
+            if self.probing or time.monotonic() - self.opened_at < self.reset_timeout:
+                raise CircuitOpenError("Telegram Bot API недоступен")
+            self.probing = True
+
+    def success(self) -> None:
+        with self.lock:
+            self.failures, self.opened_at, self.probing = 0, None, False
+
+    def failure(self) -> None:
+        with self.lock:
+            self.failures += 1
+            self.probing = False
+            if self.opened_at is not None or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+
+class TgTransport:
+    """
+    HTTP-транспорт Telegram Bot API.
+    Одна `requests.Session` с пулом keep-alive соединений на все потоки, таймауты на каждый вызов, JSON в теле POST.
+    Сетевые ошибки (любые `requests.RequestException`) и ответы 5xx повторяются с экспоненциальной задержкой
+    и случайным разбросом, на 429 выдерживается пауза `retry_after` из ответа. Методы, которые что-то меняют
+    (отправка и правка сообщений), повторяются только если запрос заведомо не дошёл до Telegram: ошибка
+    соединения или 429; после таймаута чтения или 5xx сообщение могло быть уже отправлено, и повтор
+    продублировал бы его. Неудачи считает `CircuitBreaker`.
+    """
+
+    def __init__(self, token: str, retries: int = RETRIES, breaker: CircuitBreaker | None = None,
+                 pool_size: int = POOL_SIZE):
+        self.token = token
+        self.retries = retries
+        self.breaker: CircuitBreaker = breaker or CircuitBreaker()
+        self.session: requests.Session = requests.Session()
+        adapter: HTTPAdapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get_url(self, method: str) -> str:
+        """ URL для запроса к Telegram боту через токен """
+        return f"{API_URL}/bot{self.token}/{method}"
+
+    @staticmethod
+    def backoff(attempt: int) -> float:
+        """ Задержка перед повтором: экспонента с полным случайным разбросом """
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+    def call(self, method: str, payload: dict, timeout: float = READ_TIMEOUT) -> dict:
+        """
+        Вызывает метод Bot API и возвращает разобранный ответ с `ok: true`.
+        `timeout` — время ожидания ответа; для long polling оно должно быть больше таймаута самого опроса.
+        Ошибки запроса (кроме 429 и 5xx) не повторяются и поднимаются как `TgApiError`; наружу выходят
+        только исключения `TgError`.
+        """
+        idempotent: bool = method in IDEMPOTENT_METHODS
+        attempt: int = 0
+        while True:
+            self.breaker.before()
+            try:
+                data: dict = self.send(method, payload, timeout)
+            except TgApiError as error:
+                if error.retry_after is None and error.error_code < 500:
+                    # Telegram доступен, ошибка в самом запросе: повтор не поможет
+                    self.breaker.success()
+                    raise
+                failure: TgError = error
+                # Telegram не выполнил запрос только при 429; после 5xx он мог быть выполнен
+                delivered: bool = error.retry_after is None
+            except requests.RequestException as error:
+                # Любая ошибка requests — сбой связи с Telegram; в её тексте есть URL с токеном бота
+                failure = TgError(f"{method}: {type(error).__name__}")
+                # ConnectionError (и ConnectTimeout) — Telegram не получил запрос; после таймаута чтения
+                # и прочих ошибок запрос мог дойти
+                delivered = not isinstance(error, requests.ConnectionError)
+            else:
+                self.breaker.success()
+                return data
+
+            retry_after: float | None = getattr(failure, "retry_after", None)
+            if retry_after is None:
+                self.breaker.failure()
+            else:
+                # 429 означает, что сервис доступен: цепь размыкают только сетевые ошибки и 5xx
+                self.breaker.success()
+            if attempt >= self.retries or (retry_after or 0) > MAX_RETRY_AFTER or (delivered and not idempotent):
+                raise failure
+            delay: float = self.backoff(attempt) if retry_after is None else retry_after
+            logger.warning("telegram %s, повтор через %.2f с", failure, delay)
+            time.sleep(delay)
+            attempt += 1
+
+    def send(self, method: str, payload: dict, timeout: float) -> dict:
+        """ Один HTTP-запрос без повторов """
+        resp: requests.Response = self.session.post(self.get_url(method), json=payload,
+                                                    timeout=(CONNECT_TIMEOUT, timeout))
+        try:
+            data: dict = resp.json()
+        except ValueError:
+            raise TgApiError(method, resp.status_code, resp.reason or "invalid response")
+        if not data.get("ok"):
+            raise TgApiError(method, data.get("error_code", resp.status_code), data.get("description", ""),
+                             data.get("parameters", {}).get("retry_after"))
+        return data
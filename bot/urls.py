@@ -4,4 +4,5 @@ from . import views
 
 urlpatterns = [
     path("verify", views.VerificationView.as_view(), name='verify'),
+    path("webhook", views.WebhookView.as_view(), name='webhook'),
 ]
@@ -1,11 +1,21 @@
+import hmac
+import logging
+
 from django.conf import settings
-from rest_framework import permissions
+from marshmallow import ValidationError
+from rest_framework import permissions, status
 from rest_framework.generics import GenericAPIView
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
-from bot.models import TgUser
+from bot.models import TgUser, WebhookUpdate
 from bot.serializers import TgUserSerializer
-from bot.tg.client import TgClient
+from bot.tg.client import TgClient, get_client
+from bot.tg.dc import UpdateObj
+from bot.tg.transport import TgError
+from bot.webhook import get_worker
+
+logger = logging.getLogger(__name__)
 
 
 class VerificationView(GenericAPIView):
@@ -19,7 +29,7 @@ class VerificationView(GenericAPIView):
 
         Метод получает данные из запроса и выполняет валидацию с использованием сериализатора TgUserSerializer.
         Если данные валидны, связанный объект TgUser обновляется, связывается с пользователем,
-        и отправляется сообщение в Telegram через TgClient.
+        и отправляется сообщение в Telegram через TgClient. Если Telegram недоступен, привязка всё равно сохраняется.
 
         Args:
             request (Request): HTTP-запрос.
@@ -37,7 +47,42 @@ class VerificationView(GenericAPIView):
         tg_user.user = self.request.user
         tg_user.save(update_fields=["user"])
         instance_s: TgUserSerializer = self.get_serializer(tg_user)
-        tg_client: TgClient = TgClient(settings.BOT_TOKEN)
-        tg_client.send_message(tg_user.chat_id, "[verification has been completed]")
+        tg_client: TgClient = get_client()
+        try:
+            tg_client.send_message(tg_user.chat_id, "[verification has been completed]")
+        except TgError:
+            logger.exception("bot: не удалось отправить подтверждение в чат %s", tg_user.chat_id)
 
         return Response(instance_s.data)
+
+
+class WebhookView(APIView):
+    """
+    Приём обновлений бота от Telegram (режим вебхука, регистрируется командой `set_webhook`).
+    Запрос принимается только с секретом из настройки BOT_WEBHOOK_SECRET в заголовке
+    X-Telegram-Bot-Api-Secret-Token. Обновление разбирается, сохраняется, ставится в очередь обработчиков `runbot`
+    и подтверждается сразу, не дожидаясь обработки: сохранённое обновление переживёт перезапуск процесса.
+    Повторно присланное Telegram обновление в очередь не ставится. Неразборчивые обновления тоже подтверждаются,
+    иначе Telegram будет присылать их повторно.
+    """
+    authentication_classes: list = []
+    permission_classes: list = [permissions.AllowAny]
+
+    def post(self, request, *args, **kwargs) -> Response:
+        secret: bytes = request.headers.get("X-Telegram-Bot-Api-Secret-Token", "").encode()
+        expected: bytes = settings.BOT_WEBHOOK_SECRET.encode()
+        if not expected or not hmac.compare_digest(secret, expected):
+            return Response(status=status.HTTP_403_FORBIDDEN)
+        try:
+            update: UpdateObj = UpdateObj.Schema().load(request.data)
+        except ValidationError:
+            logger.warning("bot: неразборчивое обновление вебхука: %s", request.data)
+            return Response()
+        if update.message or update.callback_query:
+            # Обработчик создаётся до сохранения: при создании он обрабатывает оставшиеся с прошлого запуска записи
+            worker = get_worker()
+            _, created = WebhookUpdate.objects.get_or_create(update_id=update.update_id,
+                                                             defaults={"payload": request.data})
+            if created:
+                worker.submit(update)
+        return Response()
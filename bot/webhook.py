@@ -0,0 +1,57 @@
+import asyncio
+import threading
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from bot.management.commands.runbot import Command
+from bot.models import WebhookUpdate
+from bot.runner import MAX_PENDING, WORKERS, ChatDispatcher
+from bot.tg.dc import UpdateObj
+
+
+class WebhookWorker:
+    """
+    Обработка обновлений, принятых вебхуком, в фоне веб-процесса.
+    Обновления обрабатывают те же обработчики, что и в `runbot`, через тот же `ChatDispatcher`: цикл asyncio
+    работает в отдельном потоке, а представление сохраняет обновление в `WebhookUpdate`, ставит его в очередь и
+    сразу отвечает Telegram. Обработанное обновление удаляется; оставшиеся после перезапуска процесса
+    обрабатываются заново при создании обработчика, то есть хотя бы один раз.
+    Порядок сообщений чата гарантируется в пределах процесса, поэтому при включённом вебхуке веб-процесс
+    должен быть один (WEB_CONCURRENCY, проверка bot.E001).
+    """
+
+    def __init__(self, workers: int = WORKERS, max_pending: int = MAX_PENDING):
+        if settings.WEB_CONCURRENCY > 1:
+            raise ImproperlyConfigured("Вебхук бота обрабатывает обновления только в одном веб-процессе")
+        self.command: Command = Command()
+        self.command.outbox.start()
+        self.dispatcher: ChatDispatcher = ChatDispatcher(self.handle_update, workers, max_pending)
+        self.loop: asyncio.AbstractEventLoop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, name="bot-webhook", daemon=True).start()
+        for payload in WebhookUpdate.objects.order_by("update_id").values_list("payload", flat=True):
+            self.submit(UpdateObj.Schema().load(payload))
+
+    def submit(self, update: UpdateObj) -> None:
+        """ Передаёт обновление в диспетчер, не дожидаясь обработки """
+        asyncio.run_coroutine_threadsafe(self.dispatcher.submit(update), self.loop)
+
+    def handle_update(self, update: UpdateObj) -> None:
+        """ Обработчик `runbot`; после него обновление удаляется, даже если обработка упала """
+        try:
+            self.command.handle_update(update)
+        finally:
+            WebhookUpdate.objects.filter(update_id=update.update_id).delete()
+
+
+_worker: WebhookWorker | None = None
+_worker_lock: threading.Lock = threading.Lock()
+
+
+def get_worker() -> WebhookWorker:
+    """ Один обработчик на процесс, создаётся при первом обновлении """
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = WebhookWorker()
+        return _worker
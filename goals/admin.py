@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from goals.models import GoalCategory, Goal, GoalComment, Board
+from goals.models import GoalCategory, Goal, GoalComment, Board, DeletionCascade, ArchivedGoal
 
 
 @admin.register(GoalCategory)
@@ -26,3 +26,17 @@ class GoalCommentAdmin(admin.ModelAdmin):
 @admin.register(Board)
 class BoardAdmin(admin.ModelAdmin):
     list_display = ["title", ]
+
+
+@admin.register(DeletionCascade)
+class DeletionCascadeAdmin(admin.ModelAdmin):
+    list_display = ["__str__", "stage", "cursor", "created", "finished"]
+    list_filter = ["stage", "finished"]
+    readonly_fields = ["board", "category", "stage", "cursor", "created", "finished"]
+
+
+@admin.register(ArchivedGoal)
+class ArchivedGoalAdmin(admin.ModelAdmin):
+    list_display = ["title", "category_title", "board_id", "user", "archived"]
+    search_fields = ["title"]
+    readonly_fields = ["board_id", "category_id", "created", "updated", "archived"]
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class GoalsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'goals'
+
+    def ready(self):
+        import goals.checks  # noqa: F401 — регистрация системных проверок
+        import goals.signals  # noqa: F401 — подключение обработчиков сигналов
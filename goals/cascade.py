@@ -0,0 +1,81 @@
+from typing import Optional
+
+from django.db import transaction
+from django.utils import timezone
+
+from goals.models import Board, DeletionCascade, Goal, GoalCategory
+
+BATCH_SIZE: int = 1000
+
+
+def delete_board(board: Board) -> DeletionCascade:
+    """
+    Помечает доску удалённой и ставит в очередь каскад для её категорий и целей.
+    Содержимое доски скрыто сразу: списки и детальные представления видят только неудалённые доски.
+    """
+    with transaction.atomic():
+        board.is_deleted = True
+        board.save()
+        return DeletionCascade.objects.create(board=board, stage=DeletionCascade.Stage.categories)
+
+
+def delete_category(category: GoalCategory) -> DeletionCascade:
+    """
+    Помечает категорию удалённой и ставит в очередь перенос её целей в архив.
+    """
+    with transaction.atomic():
+        category.is_deleted = True
+        category.save()
+        return DeletionCascade.objects.create(category=category, stage=DeletionCascade.Stage.goals)
+
+
+def process_batch(cascade_id: int, batch_size: int = BATCH_SIZE) -> bool:
+    """
+    Обрабатывает одну пачку каскада в отдельной транзакции и сохраняет продвижение курсора.
+    Строка задания блокируется `SKIP LOCKED`, поэтому несколько обработчиков не мешают друг другу.
+    Возвращает True, если задание ещё не завершено.
+    """
+    with transaction.atomic():
+        cascade: Optional[DeletionCascade] = DeletionCascade.objects.select_for_update(skip_locked=True).filter(
+            id=cascade_id, finished__isnull=True,
+        ).first()
+        if cascade is None:
+            return False
+
+        if cascade.stage == DeletionCascade.Stage.categories:
+            model, rows = GoalCategory, GoalCategory.objects.filter(board_id=cascade.board_id)
+            changes: dict = {"is_deleted": True, "updated": timezone.now()}
+        else:
+            model, rows = Goal, (
+                Goal.objects.filter(board_id=cascade.board_id) if cascade.board_id
+                else Goal.objects.filter(category_id=cascade.category_id)
+            )
+            changes = {"status": Goal.Status.archived, "updated": timezone.now()}
+
+        ids: list[int] = list(
+            rows.filter(id__gt=cascade.cursor).order_by("id").values_list("id", flat=True)[:batch_size]
+        )
+        if ids:
+            model.objects.filter(id__in=ids).update(**changes)
+            cascade.cursor = ids[-1]
+        if len(ids) < batch_size:
+            if cascade.stage == DeletionCascade.Stage.categories:
+                cascade.stage, cascade.cursor = DeletionCascade.Stage.goals, 0
+            else:
+                cascade.finished = timezone.now()
+        cascade.save(update_fields=["stage", "cursor", "finished"])
+        return cascade.finished is None
+
+
+def run_pending(batch_size: int = BATCH_SIZE) -> int:
+    """
+    Доводит до конца все незавершённые каскады, начиная с самых старых. Возвращает их число.
+    """
+    pending: list[int] = list(
+        DeletionCascade.objects.filter(finished__isnull=True).order_by("id").values_list("id", flat=True)
+    )
+    for cascade_id in pending:
+        while process_batch(cascade_id, batch_size):
+            pass
+    return len(pending)
+
@@ -0,0 +1,221 @@
+"""
+Лента изменений целей, категорий, комментариев и досок для синхронизации клиентских реплик.
+
+Курсор ленты — номер транзакции (`change_xid`, проставляется триггерами, см. миграцию 0013).
+Отдаются только строки транзакций старше `xmin` текущего снимка: все они уже завершены,
+поэтому позже не появится строка с меньшим номером и курсор не перепрыгнет незакоммиченное
+изменение. Длинная транзакция задерживает ленту, но ничего не теряется.
+
+Записи об удалениях хранятся ограниченное время (`prune_tombstones`): курсор старше горизонта очистки
+отклоняется, и реплика загружается заново с пустого курсора.
+"""
+import base64
+import binascii
+import heapq
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterator, Optional
+
+from django.db import connection, transaction
+from django.db.models import Model, Prefetch, Q, QuerySet, prefetch_related_objects
+from django.db.models.expressions import RawSQL
+
+from goals.models import Board, BoardParticipant, ChangeFeedHorizon, ChangeTombstone, Goal, GoalCategory, GoalComment
+
+# Порядок типов внутри одной транзакции: доска раньше своих категорий, категория раньше целей и т.д.
+KINDS: tuple = ("board", "category", "goal", "comment", "deleted")
+
+
+class InvalidCursor(ValueError):
+    """ Курсор ленты не удалось разобрать. """
+
+
+class CursorExpired(Exception):
+    """ Курсор старше горизонта ленты: записи об удалениях после него уже очищены. """
+
+
+@dataclass(frozen=True, order=True)
+class Position:
+    """ Позиция в ленте: транзакция, тип объекта (индекс в KINDS) и id. """
+    xid: int
+    kind: int
+    id: int
+
+    def encode(self) -> str:
+        payload: bytes = json.dumps([self.xid, self.kind, self.id], separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(payload).decode("ascii")
+
+    @classmethod
+    def decode(cls, encoded: Optional[str]) -> "Position":
+        """ Пустой курсор — начало ленты, то есть первичная загрузка реплики. """
+        if not encoded:
+            return cls(0, -1, 0)
+        try:
+            xid, kind, id_ = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")))
+            return cls(int(xid), int(kind), int(id_))
+        except (binascii.Error, UnicodeEncodeError, ValueError, TypeError):
+            raise InvalidCursor(encoded)
+
+
+@dataclass
+class Change:
+    """ Изменённый или удалённый объект ленты. """
+    position: Position
+    type: str
+    id: int
+    deleted: bool
+    obj: Optional[Model] = None
+    # Удаление — перенос в архивные таблицы: объект доступен через архив доски
+    archived: bool = False
+
+
+PRUNE_BATCH_SIZE: int = 1000
+# Верхняя граница id: строки того же типа с тем же change_xid уже пройдены
+MAX_ID: int = 2 ** 63 - 1
+
+TOMBSTONE: str = ChangeTombstone._meta.db_table
+HORIZON: str = ChangeFeedHorizon._meta.db_table
+
+# Строки каждой доски пользователя после позиции — отдельный диапазон индекса (board_id, change_xid, id);
+# внешний запрос сливает не больше `limit` строк с каждой доски
+PER_BOARD_SQL: str = """
+    SELECT r.id FROM ({boards}) b CROSS JOIN LATERAL (
+        SELECT t.id FROM {table} t
+        WHERE t.board_id = b.board_id AND (t.change_xid, t.id) > (%s, %s) AND t.change_xid < %s{condition}
+        ORDER BY t.change_xid, t.id LIMIT %s
+    ) r
+"""
+
+# Исключения самого пользователя из досок — по частичному индексу (user_id, change_xid, id)
+PARTICIPANT_TOMBSTONES_SQL: str = f"""
+    (SELECT id FROM {TOMBSTONE}
+     WHERE kind = 'participant' AND user_id = %s AND (change_xid, id) > (%s, %s) AND change_xid < %s
+     ORDER BY change_xid, id LIMIT %s)
+"""
+
+# Пачка записей об удалениях старше срока хранения удаляется, горизонт ленты сдвигается за последнюю из них
+PRUNE_TOMBSTONES_SQL: str = f"""
+    WITH pruned AS (
+        DELETE FROM {TOMBSTONE} WHERE id IN (
+            SELECT id FROM {TOMBSTONE} WHERE created < %(cutoff)s ORDER BY created LIMIT %(limit)s
+        )
+        RETURNING change_xid
+    ), horizon AS (
+        INSERT INTO {HORIZON} (id, pruned_xid, updated)
+        SELECT 1, max(change_xid), now() FROM pruned HAVING count(*) > 0
+        ON CONFLICT (id) DO UPDATE SET pruned_xid = GREATEST({HORIZON}.pruned_xid, EXCLUDED.pruned_xid),
+                                       updated = EXCLUDED.updated
+    )
+    SELECT count(*) FROM pruned
+"""
+
+
+def horizons() -> tuple[int, int]:
+    """
+    Номер самой старой незавершённой транзакции (всё, что младше, уже видно целиком) и горизонт очистки
+    записей об удалениях — одним запросом.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint, "
+                       f"COALESCE((SELECT pruned_xid FROM {HORIZON} WHERE id = 1), 0)")
+        return cursor.fetchone()
+
+
+def after(kind: int, position: Position) -> Q:
+    """ Условие «строго после позиции» для строк типа `kind`. """
+    if kind > position.kind:
+        return Q(change_xid__gte=position.xid)
+    if kind < position.kind:
+        return Q(change_xid__gt=position.xid)
+    return Q(change_xid__gt=position.xid) | Q(change_xid=position.xid, id__gt=position.id)
+
+
+def lower_bound(kind: int, position: Position) -> tuple[int, int]:
+    """ То же условие, что `after`, в виде границы `(change_xid, id) > bound` для сравнения строк в SQL. """
+    if kind > position.kind:
+        return position.xid, 0
+    if kind < position.kind:
+        return position.xid, MAX_ID
+    return position.xid, position.id
+
+
+def sources(user, since: Position, horizon: int, limit: int) -> list[tuple[str, QuerySet]]:
+    """
+    Источники ленты для пользователя: строки после `since` и до `horizon`, не больше `limit` с каждой доски.
+    Доски берутся вместе с удалёнными, чтобы реплика узнала об удалении; содержимое — только с живых досок.
+    Из записей об удалениях пользователь видит удаления на своих досках и собственное исключение из досок.
+    """
+    boards_sql, boards_params = BoardParticipant.board_ids(user).query.sql_with_params()
+
+    def per_board(kind: int, table: str, condition: str = "") -> tuple[str, list]:
+        sql: str = PER_BOARD_SQL.format(boards=boards_sql, table=table, condition=condition)
+        return sql, [*boards_params, *lower_bound(kind, since), horizon, limit]
+
+    querysets: dict[str, QuerySet] = {
+        "board": Board.objects.filter(after(KINDS.index("board"), since), change_xid__lt=horizon,
+                                      id__in=BoardParticipant.objects.filter(user=user).values("board_id")),
+    }
+    for name, model in (("category", GoalCategory), ("goal", Goal), ("comment", GoalComment)):
+        sql, params = per_board(KINDS.index(name), model._meta.db_table)
+        querysets[name] = model.objects.filter(id__in=RawSQL(sql, params)).select_related("user")
+    kind: int = KINDS.index("deleted")
+    sql, params = per_board(kind, TOMBSTONE, " AND t.kind <> 'participant'")
+    sql = f"({sql}) UNION ALL {PARTICIPANT_TOMBSTONES_SQL}"
+    params += [user.id, *lower_bound(kind, since), horizon, limit]
+    querysets["deleted"] = ChangeTombstone.objects.filter(id__in=RawSQL(sql, params))
+    return list(querysets.items())
+
+
+def read_source(kind: int, queryset: QuerySet, limit: int) -> Iterator[Change]:
+    name: str = KINDS[kind]
+    for row in queryset.order_by("change_xid", "id")[:limit]:
+        position: Position = Position(row.change_xid, kind, row.id)
+        if name == "deleted":
+            object_type: str = "board" if row.kind == ChangeTombstone.Kind.participant else row.kind
+            yield Change(position, object_type, row.object_id, True, archived=row.archived)
+        else:
+            yield Change(position, name, row.id, name == "board" and row.is_deleted, row)
+
+
+def read_changes(user, since: Position, limit: int) -> tuple[list[Change], Position, bool]:
+    """
+    Страница ленты: до `limit` изменений после `since` в порядке позиций.
+    Каждый источник читается одним запросом по индексам (board_id, change_xid, id), результаты сливаются.
+    Возвращает изменения, курсор продолжения и признак, что есть ещё. Курсор, не дошедший до горизонта
+    очистки записей об удалениях, поднимает `CursorExpired`.
+    """
+    horizon, pruned_xid = horizons()
+    if since.xid and since.xid <= pruned_xid:
+        raise CursorExpired(since.encode())
+    streams: list[Iterator[Change]] = [
+        read_source(KINDS.index(name), queryset, limit + 1)
+        for name, queryset in sources(user, since, horizon, limit + 1)
+    ]
+    merged: list[Change] = list(heapq.merge(*streams, key=lambda change: change.position))
+    page: list[Change] = merged[:limit]
+    has_more: bool = len(merged) > limit
+
+    boards: list[Board] = [change.obj for change in page if change.type == "board" and change.obj is not None]
+    prefetch_related_objects(boards, Prefetch("participants", BoardParticipant.objects.select_related("user")))
+
+    if has_more:
+        return page, page[-1].position, True
+    # Всё, что младше горизонта, отдано: следующий запрос начнётся с транзакции горизонта
+    return page, max(since, Position(horizon, -1, 0)), False
+
+
+def prune_tombstones(cutoff: datetime, batch_size: int = PRUNE_BATCH_SIZE) -> int:
+    """
+    Удаляет записи об удалениях, созданные до `cutoff`, пачками в отдельных транзакциях и сдвигает
+    горизонт ленты. Возвращает число удалённых записей.
+    """
+    params: dict = {"cutoff": cutoff, "limit": batch_size}
+    total: int = 0
+    while True:
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(PRUNE_TOMBSTONES_SQL, params)
+            pruned: int = cursor.fetchone()[0]
+        total += pruned
+        if pruned < batch_size:
+            return total
@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error, Tags, register
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs) -> list[Error]:
+    """
+    Роли участников досок кэшируются (goals/membership.py) и сбрасываются сигналами. Сброс в кэше одного
+    процесса не виден другим: API, бот и обработчики каскадов продолжили бы пускать исключённых участников.
+    Поэтому вне режима отладки кэш в памяти процесса запрещён.
+    """
+    if settings.DEBUG or not isinstance(caches["default"], LocMemCache):
+        return []
+    return [Error(
+        "Кэш ролей участников досок хранится в памяти процесса и не сбрасывается в остальных процессах",
+        hint="Укажите общий кэш, например CACHE_URL=redis://redis:6379/1",
+        id="goals.E001",
+    )]
@@ -0,0 +1,61 @@
+import hashlib
+from typing import Optional
+
+from django.db.models import QuerySet, Subquery
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from goals.models import Board, BoardParticipant
+
+
+class BoardVersionETagMixin:
+    """
+    Условный GET по версиям досок.
+    Слабый ETag считается из версий досок, видимых запросу (`Board.version` растёт триггерами при любой
+    записи в содержимое доски и при смене профиля её участников и авторов — ответы включают данные
+    пользователей), пользователя, пути и параметров запроса. Совпавший `If-None-Match`
+    возвращает 304 одним запросом версий — до основного запроса и сериализации.
+    Для детальных представлений берётся только доска запрошенного объекта.
+    """
+
+    def get(self, request, *args, **kwargs) -> Response:
+        etag: Optional[str] = self.get_etag()
+        if etag is not None and etag_matches(etag, request.META.get("HTTP_IF_NONE_MATCH")):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        response: Response = super().get(request, *args, **kwargs)
+        if etag is not None and response.status_code == status.HTTP_200_OK:
+            response["ETag"] = etag
+        return response
+
+    def get_etag_boards(self) -> Optional[QuerySet]:
+        """ Доски, от которых зависит ответ; None — ETag не вычисляется. """
+        boards: QuerySet = Board.objects.filter(id__in=BoardParticipant.board_ids(self.request.user))
+        pk: Optional[str] = self.kwargs.get(self.lookup_url_kwarg or self.lookup_field)
+        if pk is None:
+            return boards
+        if not str(pk).isdigit():
+            return None
+        board_field: str = "id" if self.model is Board else "board_id"
+        return boards.filter(id=Subquery(self.model.objects.filter(pk=pk).values(board_field)[:1]))
+
+    def get_etag(self) -> Optional[str]:
+        boards: Optional[QuerySet] = self.get_etag_boards()
+        if boards is None:
+            return None
+        versions: list = list(boards.order_by("id").values_list("id", "version"))
+        if self.kwargs and not versions:
+            return None
+        key: list = [
+            self.request.user.id, self.request.path, sorted(self.request.query_params.lists()),
+            self.request.accepted_media_type, versions,
+        ]
+        return f'W/"{hashlib.md5(repr(key).encode()).hexdigest()}"'
+
+
+def etag_matches(etag: str, header: Optional[str]) -> bool:
+    """ Слабое сравнение ETag с заголовком `If-None-Match`. """
+    if not header:
+        return False
+    candidates: list[str] = parse_etags(header)
+    return "*" in candidates or etag.removeprefix("W/") in [value.removeprefix("W/") for value in candidates]
@@ -0,0 +1,50 @@
+from django.db import connection, transaction
+
+from goals.cascade import BATCH_SIZE
+from goals.models import Board, BoardParticipant, Goal, GoalCategory
+
+OPEN_STATUSES: list = [Goal.Status.to_do.value, Goal.Status.in_progress.value]
+
+# Пересчитываются и получают новую версию только доски, чьи счётчики разошлись с данными
+RECOUNT_SQL: str = f"""
+    UPDATE {Board._meta.db_table} b SET
+        version = b.version + 1, goal_count = s.goal_count, open_goal_count = s.open_goal_count,
+        category_count = s.category_count, participant_count = s.participant_count
+    FROM (
+        SELECT id,
+            (SELECT count(*) FROM {Goal._meta.db_table} g
+             WHERE g.board_id = b.id AND g.status <> %(archived)s) AS goal_count,
+            (SELECT count(*) FROM {Goal._meta.db_table} g
+             WHERE g.board_id = b.id AND g.status = ANY(%(open)s)) AS open_goal_count,
+            (SELECT count(*) FROM {GoalCategory._meta.db_table} c
+             WHERE c.board_id = b.id AND NOT c.is_deleted) AS category_count,
+            (SELECT count(*) FROM {BoardParticipant._meta.db_table} p WHERE p.board_id = b.id) AS participant_count
+        FROM {Board._meta.db_table} b WHERE b.id = ANY(%(ids)s)
+    ) s
+    WHERE b.id = s.id AND (b.goal_count, b.open_goal_count, b.category_count, b.participant_count)
+        IS DISTINCT FROM (s.goal_count, s.open_goal_count, s.category_count, s.participant_count)
+"""
+
+
+def recount_boards(batch_size: int = BATCH_SIZE) -> int:
+    """
+    Пересчитывает счётчики всех досок пачками и возвращает число исправленных досок.
+    Доски пачки сначала блокируются, и только следующий оператор считает строки: запись, успевшая изменить
+    счётчик до блокировки, уже видна подсчёту, а остальные ждут конца транзакции и прибавляют свой вклад
+    к исправленному значению.
+    """
+    params: dict = {"archived": Goal.Status.archived.value, "open": OPEN_STATUSES}
+    fixed: int = 0
+    after: int = 0
+    while True:
+        with transaction.atomic():
+            board_ids: list[int] = list(
+                Board.objects.filter(id__gt=after).order_by("id").select_for_update().values_list(
+                    "id", flat=True)[:batch_size]
+            )
+            if not board_ids:
+                return fixed
+            with connection.cursor() as cursor:
+                cursor.execute(RECOUNT_SQL, {**params, "ids": board_ids})
+                fixed += cursor.rowcount
+        after = board_ids[-1]
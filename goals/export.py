@@ -0,0 +1,91 @@
+import csv
+import json
+from typing import Iterator
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+
+from goals.models import Board, Goal, GoalCategory, GoalComment
+
+CHUNK_SIZE: int = 2000
+
+# Поля каждого типа строк; автор выгружается именем пользователя
+EXPORT_FIELDS: dict[str, tuple] = {
+    "category": ("id", "title", "is_deleted", "user__username", "created", "updated"),
+    "goal": ("id", "category_id", "title", "description", "status", "priority", "due_date",
+             "user__username", "created", "updated"),
+    "comment": ("id", "goal_id", "text", "user__username", "created", "updated"),
+}
+
+CSV_COLUMNS: tuple = ("type", "id", "category_id", "goal_id", "title", "description", "text", "status", "priority",
+                      "due_date", "is_deleted", "user", "created", "updated")
+
+
+# Выгрузка читает все таблицы в одном снимке и ничего не пишет
+SNAPSHOT_SQL: str = "SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY"
+
+# Начало ячейки, которое табличные редакторы выполняют как формулу
+FORMULA_PREFIXES: tuple = ("=", "+", "-", "@", "\t", "\r")
+
+
+def export_rows(board: Board) -> Iterator[dict]:
+    """
+    Все категории, цели и комментарии доски по одной строке.
+    Каждая таблица читается серверным курсором пачками по CHUNK_SIZE, поэтому память не растёт с размером доски.
+    Чтение идёт в одной транзакции REPEATABLE READ READ ONLY: запись, пришедшая во время выгрузки, не даст
+    комментария без цели или цели без категории. Внутри уже открытой транзакции уровень изоляции не
+    меняется — его задаёт только первая команда транзакции.
+    """
+    if connection.in_atomic_block:
+        yield from _read_rows(board)
+        return
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(SNAPSHOT_SQL)
+        yield from _read_rows(board)
+
+
+def _read_rows(board: Board) -> Iterator[dict]:
+    yield {"type": "board", "id": board.id, "title": board.title, "created": board.created, "updated": board.updated}
+    sources: dict = {
+        "category": GoalCategory.objects.filter(board=board),
+        "goal": Goal.objects.filter(board=board),
+        "comment": GoalComment.objects.filter(board=board),
+    }
+    for kind, queryset in sources.items():
+        for row in queryset.order_by("id").values(*EXPORT_FIELDS[kind]).iterator(chunk_size=CHUNK_SIZE):
+            row["user"] = row.pop("user__username")
+            yield {"type": kind, **row}
+
+
+def to_ndjson(rows: Iterator[dict]) -> Iterator[str]:
+    encoder: DjangoJSONEncoder = DjangoJSONEncoder(ensure_ascii=False)
+    for row in rows:
+        yield encoder.encode(row) + "\n"
+
+
+class _Echo:
+    """ Псевдофайл для csv.writer: возвращает записанную строку вместо буферизации. """
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def escape_formula(value):
+    """ Текст, который табличный редактор принял бы за формулу, предваряется апострофом. """
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def to_csv(rows: Iterator[dict]) -> Iterator[str]:
+    writer = csv.DictWriter(_Echo(), fieldnames=CSV_COLUMNS, extrasaction="ignore")
+    yield writer.writeheader()
+    for row in rows:
+        yield writer.writerow({key: escape_formula(value) for key, value in row.items()})
+
+
+EXPORT_TYPES: dict[str, tuple] = {
+    "ndjson": (to_ndjson, "application/x-ndjson"),
+    "csv": (to_csv, "text/csv"),
+}
@@ -1,8 +1,15 @@
+import html
+import re
+
 import django_filters
-from django.db import models
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.db import connection, models
+from django.db.models import F, Value
+from django.db.models.functions import Cast, Coalesce, Concat
 from django_filters import rest_framework
+from rest_framework import filters
 
-from goals.models import Goal
+from goals.models import ArchivedGoal, Goal
 
 
 class GoalDateFilter(rest_framework.FilterSet):
@@ -15,6 +22,7 @@ class GoalDateFilter(rest_framework.FilterSet):
         model = Goal
         fields = {
             "due_date": ("lte", "gte"),  # Фильтрация по полю `due_date`. Доступные операторы: lte (меньше или равно), gte (больше или равно).
+            "board": ("exact",),  # Фильтрация по доске: колонки канбана догружаются списком целей с `board` и `status`.
             "category": ("exact", "in"),  # Фильтрация по полю `category`. Доступные операторы: exact (равно), in (в списке значений).
             "status": ("exact", "in"),  # Фильтрация по полю `status`. Доступные операторы: exact (равно), in (в списке значений).
             "priority": ("exact", "in"),  # Фильтрация по полю `priority`. Доступные операторы: exact (равно), in (в списке значений).
@@ -23,3 +31,77 @@ class GoalDateFilter(rest_framework.FilterSet):
     filter_overrides = {
         models.DateTimeField: {"filter_class": django_filters.IsoDateTimeFilter},  # Использование `IsoDateTimeFilter` для поля `due_date` типа DateTimeField.
     }
+
+
+class GoalSearchFilter(filters.SearchFilter):
+    """
+    Полнотекстовый поиск по целям через параметр `?search=`.
+    Вместо `ILIKE '%term%'` ищет по `Goal.search_vector` (GIN-индекс): каждое слово запроса
+    совпадает по префиксу, к целям добавляются `search_rank` для сортировки по релевантности
+    и `search_headline` — фрагмент заголовка и описания с подсвеченными совпадениями.
+    Запрос только из стоп-слов («и», «на») игнорируется, как пустой.
+    """
+
+    search_config: str = "russian"
+    # Совпадения отмечаются символами из области частного использования Unicode, а не тегами: текст целей
+    # экранируется уже после ts_headline (см. `highlight`), и только эти метки превращаются в <b>
+    start_sel: str = "\ue000"
+    stop_sel: str = "\ue001"
+    headline_options: dict = {"start_sel": start_sel, "stop_sel": stop_sel, "max_fragments": 2}
+
+    def filter_queryset(self, request, queryset, view):
+        words: list[str] = [word for term in self.get_search_terms(request) for word in re.findall(r"\w+", term)]
+        if not words:
+            return queryset
+
+        raw_query: str = " & ".join(f"{word}:*" for word in words)
+        if self.is_empty(raw_query):
+            return queryset
+
+        query = SearchQuery(raw_query, search_type="raw", config=self.search_config)
+        text = Concat("title", Value("\n"), Coalesce("description", Value("")), output_field=models.TextField())
+        return queryset.filter(search_vector=query).annotate(
+            # ts_rank возвращает real; double precision без потерь переживает курсор пагинации
+            search_rank=Cast(SearchRank(F("search_vector"), query), models.FloatField()),
+            search_headline=SearchHeadline(text, query, config=self.search_config, **self.headline_options),
+        )
+
+    def is_empty(self, raw_query: str) -> bool:
+        """
+        После удаления стоп-слов от запроса ничего не осталось. Проверяется отдельным запросом без обращения
+        к таблицам: условие в основном запросе помешало бы планировщику использовать GIN-индекс.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT numnode(to_tsquery(%s::regconfig, %s))", [self.search_config, raw_query])
+            return cursor.fetchone()[0] == 0
+
+    @classmethod
+    def highlight(cls, headline: str) -> str:
+        """ HTML-безопасный фрагмент: текст цели экранируется, совпадения обрамляются <b> """
+        return html.escape(headline).replace(cls.start_sel, "<b>").replace(cls.stop_sel, "</b>")
+
+
+class GoalOrderingFilter(filters.OrderingFilter):
+    """
+    Сортировка целей.
+    Если идёт поиск и `?ordering=` не передан, сначала сортирует по релевантности, затем по умолчанию.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        if "search_rank" in queryset.query.annotations and not request.query_params.get(self.ordering_param):
+            return ["-search_rank", *(self.get_default_ordering(view) or [])]
+        return super().get_ordering(request, queryset, view)
+
+
+class ArchivedGoalFilter(rest_framework.FilterSet):
+    """
+    Фильтр архивных целей по доске и категории.
+    В архиве доска и категория хранятся как id, поэтому фильтры объявлены явно под привычными именами.
+    """
+
+    board = django_filters.NumberFilter(field_name="board_id")
+    category = django_filters.NumberFilter(field_name="category_id")
+
+    class Meta:
+        model = ArchivedGoal
+        fields = ("board", "category")
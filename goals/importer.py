@@ -0,0 +1,161 @@
+import csv
+import io
+import json
+from typing import IO, Iterator, Optional
+
+from django.db import DatabaseError, connection, transaction
+from rest_framework.exceptions import ValidationError
+
+from goals.models import Board, Goal, GoalCategory
+from goals.serializers import GoalImportRowSerializer
+
+# Сколько ошибок возвращается в ответе; остальные только подсчитываются
+MAX_ERRORS: int = 100
+
+STAGING_TABLE: str = "goals_import_staging"
+STAGING_COLUMNS: tuple = ("line", "category_id", "title", "description", "status", "priority", "due_date")
+
+
+def parse_csv(stream: IO[str]) -> Iterator[tuple[int, dict]]:
+    """ Строки CSV с заголовком; пустые ячейки считаются незаполненными полями. """
+    reader = csv.DictReader(stream)
+    for row in reader:
+        yield reader.line_num, {key: value for key, value in row.items() if key and value not in ("", None)}
+
+
+def parse_ndjson(stream: IO[str]) -> Iterator[tuple[int, dict]]:
+    """ Объекты NDJSON по одному на строку; пустые строки пропускаются. """
+    for line, text in enumerate(stream, start=1):
+        if not text.strip():
+            continue
+        try:
+            yield line, json.loads(text)
+        except ValueError:
+            yield line, None
+
+
+IMPORT_TYPES: dict = {
+    "csv": parse_csv,
+    "ndjson": parse_ndjson,
+}
+
+
+class _CopyReader:
+    """
+    Псевдофайл для `copy_expert`: отдаёт строки в формате COPY CSV по мере чтения,
+    поэтому ни исходный файл, ни проверенные строки целиком в памяти не держатся.
+    """
+
+    def __init__(self, rows: Iterator[tuple]) -> None:
+        self.rows: Iterator[tuple] = rows
+        self.buffer: io.StringIO = io.StringIO()
+        self.writer = csv.writer(self.buffer, lineterminator="\n")
+        # psycopg2 прерывает COPY при исключении в read() и теряет его тип, поэтому оно сохраняется здесь
+        self.error: Optional[Exception] = None
+
+    def read(self, size: int = -1) -> str:
+        try:
+            for row in self.rows:
+                self.writer.writerow(row)
+                if 0 < size <= self.buffer.tell():
+                    break
+        except Exception as error:
+            self.error = error
+            raise
+        data: str = self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return data
+
+
+class GoalImport:
+    """
+    Импорт целей в доску из потока CSV или NDJSON.
+    Каждая строка проверяется по правилам создания цели, название категории превращается в id по карте
+    категорий доски, загруженной одним запросом. Проверенные строки потоково загружаются через COPY
+    во временную таблицу, откуда цели вставляются одним `INSERT ... SELECT`.
+    """
+
+    def __init__(self, board: Board, user, atomic: bool = False) -> None:
+        self.board: Board = board
+        self.user = user
+        self.atomic: bool = atomic
+        self.serializer: GoalImportRowSerializer = GoalImportRowSerializer()
+        self.categories: dict[str, Optional[int]] = {}
+        self.errors: list[dict] = []
+        self.error_count: int = 0
+
+    def load_categories(self) -> None:
+        """
+        Карта `название -> id` категорий доски; удалённые категории отмечены None.
+        При повторе названий выигрывает более старая живая категория.
+        """
+        for title, category_id, is_deleted in GoalCategory.objects.filter(board=self.board).order_by(
+                "-is_deleted", "-id").values_list("title", "id", "is_deleted"):
+            self.categories[title] = None if is_deleted else category_id
+
+    def add_error(self, line: int, errors: dict) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append({"line": line, "errors": errors})
+
+    def validate(self, rows: Iterator[tuple[int, dict]]) -> Iterator[tuple]:
+        """ Строки для COPY из прошедших проверку данных; ошибки копятся в `errors`. """
+        defaults: dict = {name: Goal._meta.get_field(name).get_default() for name in STAGING_COLUMNS[3:]}
+        for line, data in rows:
+            if not isinstance(data, dict):
+                self.add_error(line, {"non_field_errors": ["Ожидается JSON-объект"]})
+                continue
+            try:
+                item: dict = self.serializer.run_validation(data)
+            except ValidationError as error:
+                self.add_error(line, error.detail)
+                continue
+            if item["category"] not in self.categories:
+                self.add_error(line, {"category": ["Категория не найдена"]})
+                continue
+            category_id: Optional[int] = self.categories[item["category"]]
+            if category_id is None:
+                self.add_error(line, {"category": ["Не разрешено в удаленной категории"]})
+                continue
+            item = {**defaults, **item}
+            yield (line, category_id, item["title"], item["description"], item["status"], item["priority"],
+                   item["due_date"])
+
+    def run(self, stream: IO[str], import_type: str) -> dict:
+        """ Импортирует цели из потока и возвращает `{"created", "error_count", "errors"}`. """
+        self.load_categories()
+        rows: Iterator[tuple] = self.validate(IMPORT_TYPES[import_type](stream))
+        created: int = 0
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS pg_temp.{STAGING_TABLE}")
+            cursor.execute(
+                f"CREATE TEMP TABLE {STAGING_TABLE} (line integer, category_id bigint, title varchar(255), "
+                f"description text, status smallint, priority smallint, due_date date) ON COMMIT DROP"
+            )
+            reader: _CopyReader = _CopyReader(rows)
+            try:
+                with connection.wrap_database_errors:
+                    cursor.copy_expert(
+                        f"COPY {STAGING_TABLE} ({', '.join(STAGING_COLUMNS)}) FROM STDIN WITH (FORMAT csv)", reader,
+                    )
+            except DatabaseError:
+                if isinstance(reader.error, UnicodeDecodeError):
+                    raise ValidationError({"file": ["Файл должен быть в кодировке UTF-8"]})
+                if reader.error is not None:
+                    raise reader.error
+                raise
+            if not (self.error_count and self.atomic):
+                # Соединение с категориями повторяет проверку на случай удаления категории во время импорта
+                cursor.execute(
+                    f"INSERT INTO {Goal._meta.db_table} (category_id, board_id, user_id, title, description, status, "
+                    f"priority, due_date, created, updated, change_xid) "
+                    f"SELECT s.category_id, c.board_id, %s, s.title, s.description, s.status, s.priority, s.due_date, "
+                    f"now(), now(), 0 FROM {STAGING_TABLE} s "
+                    f"JOIN {GoalCategory._meta.db_table} c ON c.id = s.category_id AND NOT c.is_deleted "
+                    f"AND c.board_id = %s ORDER BY s.line",
+                    [self.user.id, self.board.id],
+                )
+                created = cursor.rowcount
+            cursor.execute(f"DROP TABLE {STAGING_TABLE}")
+        return {"created": created, "error_count": self.error_count, "errors": self.errors}
@@ -0,0 +1,47 @@
+import sys
+
+from django.core.management import BaseCommand, CommandError
+from rest_framework.exceptions import ValidationError
+
+from core.models import User
+from goals.importer import IMPORT_TYPES, GoalImport
+from goals.membership import can_write
+from goals.models import Board
+
+
+class Command(BaseCommand):
+    help = "Импортирует цели в доску из файла CSV или NDJSON через COPY"
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("path", help="Путь к файлу или «-» для стандартного ввода")
+        parser.add_argument("--board", type=int, required=True, help="id доски")
+        parser.add_argument("--user", required=True, help="Имя пользователя — автора целей")
+        parser.add_argument("--type", choices=list(IMPORT_TYPES), help="Формат; по умолчанию по расширению файла")
+        parser.add_argument("--atomic", action="store_true", help="Ничего не создавать, если есть ошибки")
+
+    def handle(self, *args, **options) -> None:
+        board: Board = Board.objects.filter(id=options["board"], is_deleted=False).first()
+        if board is None:
+            raise CommandError(f"Доска {options['board']} не найдена")
+        user: User = User.objects.filter(username=options["user"]).first()
+        if user is None:
+            raise CommandError(f"Пользователь {options['user']} не найден")
+        if not can_write(user, board.id):
+            raise CommandError("Пользователь не может создавать цели на этой доске")
+        import_type: str = options["type"] or options["path"].rpartition(".")[2].lower()
+        if import_type not in IMPORT_TYPES:
+            raise CommandError(f"Укажите --type: {', '.join(IMPORT_TYPES)}")
+
+        goal_import: GoalImport = GoalImport(board, user, atomic=options["atomic"])
+        try:
+            if options["path"] == "-":
+                result: dict = goal_import.run(sys.stdin, import_type)
+            else:
+                with open(options["path"], encoding="utf-8-sig", newline="") as stream:
+                    result = goal_import.run(stream, import_type)
+        except ValidationError as error:
+            raise CommandError(error.detail)
+
+        for error in result["errors"]:
+            self.stderr.write(f"Строка {error['line']}: {error['errors']}")
+        self.stdout.write(f"Создано целей: {result['created']}, ошибок: {result['error_count']}")
@@ -0,0 +1,15 @@
+from django.core.management import BaseCommand
+
+from goals.cascade import BATCH_SIZE
+from goals.counters import recount_boards
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает счётчики целей, категорий и участников досок и исправляет расхождения"
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Досок в одной транзакции")
+
+    def handle(self, *args, **options) -> None:
+        fixed: int = recount_boards(options["batch_size"])
+        self.stdout.write(f"Исправлено досок: {fixed}")
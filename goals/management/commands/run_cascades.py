@@ -0,0 +1,27 @@
+import logging
+import time
+
+from django.core.management import BaseCommand
+
+from goals.cascade import BATCH_SIZE, run_pending
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Обрабатывает пачками каскады удаления досок и категорий"
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Строк в одной транзакции")
+        parser.add_argument("--loop", action="store_true", help="Работать постоянно, опрашивая очередь")
+        parser.add_argument("--interval", type=float, default=5, help="Пауза между опросами в секундах")
+
+    def handle(self, *args, **options) -> None:
+        while True:
+            processed: int = run_pending(options["batch_size"])
+            if processed:
+                logger.info("processed %s deletion cascades", processed)
+            if not options["loop"]:
+                self.stdout.write(f"Обработано каскадов: {processed}")
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,35 @@
+import logging
+import time
+
+from django.core.management import BaseCommand
+
+from goals.cascade import BATCH_SIZE
+from goals.retention import ARCHIVE_AFTER_DAYS, PURGE_AFTER_DAYS, TOMBSTONE_DAYS, run_retention
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = ("Переносит давно архивированные цели в архивные таблицы, очищает давно удалённые доски и категории "
+            "и старые записи ленты изменений об удалениях")
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--archive-days", type=int, default=ARCHIVE_AFTER_DAYS,
+                            help="Через сколько дней архивная цель переносится в архивные таблицы")
+        parser.add_argument("--purge-days", type=int, default=PURGE_AFTER_DAYS,
+                            help="Через сколько дней удалённые доски и категории удаляются окончательно")
+        parser.add_argument("--tombstone-days", type=int, default=TOMBSTONE_DAYS,
+                            help="Сколько дней хранятся записи ленты изменений об удалениях")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Строк в одной транзакции")
+        parser.add_argument("--loop", action="store_true", help="Работать постоянно")
+        parser.add_argument("--interval", type=float, default=60 * 60, help="Пауза между запусками в секундах")
+
+    def handle(self, *args, **options) -> None:
+        while True:
+            result: dict = run_retention(options["archive_days"], options["purge_days"], options["batch_size"],
+                                         options["tombstone_days"])
+            logger.info("retention: %s", result)
+            if not options["loop"]:
+                self.stdout.write(", ".join(f"{key}: {value}" for key, value in result.items()))
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,50 @@
+from typing import Iterable, Optional
+
+from django.core.cache import cache
+from django.db import transaction
+
+from goals.models import BoardParticipant
+
+CACHE_KEY: str = "goals:board_roles:{user_id}"
+# Страховка на случай потерянного сброса: дольше этого устаревшая роль не проживёт
+CACHE_TIMEOUT: int = 30
+
+WRITE_ROLES: tuple = (BoardParticipant.Role.owner, BoardParticipant.Role.writer)
+
+
+def get_board_roles(user) -> dict[int, int]:
+    """
+    Роли пользователя на досках в виде `{board_id: role}`.
+    Удалённые доски не попадают в карту. Значение хранится в общем кэше Django и сбрасывается
+    сигналами при изменении участников, удалении или восстановлении доски (см. goals/signals.py).
+    """
+    key: str = CACHE_KEY.format(user_id=user.id)
+    roles: Optional[dict[int, int]] = cache.get(key)
+    if roles is None:
+        roles = dict(
+            BoardParticipant.objects.filter(user=user, board__is_deleted=False).values_list("board_id", "role")
+        )
+        cache.set(key, roles, CACHE_TIMEOUT)
+    return roles
+
+
+def get_board_role(user, board_id: int) -> Optional[int]:
+    """ Роль пользователя на доске или None, если он не участник. """
+    return get_board_roles(user).get(board_id)
+
+
+def can_write(user, board_id: int) -> bool:
+    """ Пользователь — владелец или редактор доски. """
+    return get_board_role(user, board_id) in WRITE_ROLES
+
+
+def invalidate_board_roles(user_ids: Iterable[int]) -> None:
+    """
+    Сбрасывает закэшированные роли пользователей.
+    Внутри транзакции сброс повторяется после коммита: параллельный запрос мог успеть
+    положить в кэш ещё не изменённые данные.
+    """
+    keys: list[str] = [CACHE_KEY.format(user_id=user_id) for user_id in set(user_ids)]
+    if keys:
+        cache.delete_many(keys)
+        transaction.on_commit(lambda: cache.delete_many(keys))
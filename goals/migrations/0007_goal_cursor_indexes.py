@@ -0,0 +1,29 @@
+# Generated by Django 4.2.1 on 2026-10-18 20:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0006_alter_goalcategory_board'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='goal',
+            index=models.Index(fields=['priority', 'due_date', 'id'], name='goal_priority_due_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='goal',
+            index=models.Index(fields=['priority', '-due_date', '-id'], name='goal_priority_due_desc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='goal',
+            index=models.Index(fields=['due_date', 'priority', 'id'], name='goal_due_date_priority_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='goal',
+            index=models.Index(fields=['due_date', '-priority', '-id'], name='goal_due_priority_desc_idx'),
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 4.2.1 on 2026-10-18 20:19
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+# Вектор цели собирается из заголовка (вес A), описания (B) и текста всех комментариев (C).
+# Триггер на комментариях сбрасывает search_vector цели, что заново запускает триггер цели.
+SEARCH_TRIGGERS_SQL = """
+CREATE FUNCTION goals_goal_search_vector() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('russian', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('russian', coalesce(NEW.description, '')), 'B') ||
+        setweight(to_tsvector('russian', coalesce(
+            (SELECT string_agg(c.text, ' ') FROM goals_goalcomment c WHERE c.goal_id = NEW.id), ''
+        )), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER goals_goal_search_vector
+    BEFORE INSERT OR UPDATE OF title, description, search_vector ON goals_goal
+    FOR EACH ROW EXECUTE FUNCTION goals_goal_search_vector();
+
+CREATE FUNCTION goals_goalcomment_search_vector() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP <> 'INSERT' THEN
+        UPDATE goals_goal SET search_vector = NULL WHERE id = OLD.goal_id;
+    END IF;
+    IF TG_OP = 'INSERT' OR (TG_OP = 'UPDATE' AND NEW.goal_id <> OLD.goal_id) THEN
+        UPDATE goals_goal SET search_vector = NULL WHERE id = NEW.goal_id;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER goals_goalcomment_search_vector
+    AFTER INSERT OR UPDATE OF text, goal_id OR DELETE ON goals_goalcomment
+    FOR EACH ROW EXECUTE FUNCTION goals_goalcomment_search_vector();
+
+UPDATE goals_goal SET search_vector = NULL;
+"""
+
+DROP_SEARCH_TRIGGERS_SQL = """
+DROP TRIGGER goals_goalcomment_search_vector ON goals_goalcomment;
+DROP FUNCTION goals_goalcomment_search_vector();
+DROP TRIGGER goals_goal_search_vector ON goals_goal;
+DROP FUNCTION goals_goal_search_vector();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0007_goal_cursor_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='goal',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Поисковый вектор'),
+        ),
+        migrations.AddIndex(
+            model_name='goal',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='goal_search_vector_gin'),
+        ),
+        migrations.RunSQL(SEARCH_TRIGGERS_SQL, DROP_SEARCH_TRIGGERS_SQL),
+    ]
@@ -0,0 +1,56 @@
+from django.db import migrations, models, transaction
+import django.db.models.deletion
+
+BATCH_SIZE = 10000
+
+BACKFILL_GOALS_SQL = """
+UPDATE goals_goal g SET board_id = c.board_id
+FROM goals_goalcategory c
+WHERE c.id = g.category_id AND g.id > %s AND g.id <= %s
+"""
+
+BACKFILL_COMMENTS_SQL = """
+UPDATE goals_goalcomment gc SET board_id = g.board_id
+FROM goals_goal g
+WHERE g.id = gc.goal_id AND gc.id > %s AND gc.id <= %s
+"""
+
+
+def backfill_batches(schema_editor, table: str, sql: str) -> None:
+    # Каждая пачка в своей транзакции, чтобы не держать блокировки на всю таблицу сразу
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"SELECT coalesce(max(id), 0) FROM {table}")
+        max_id = cursor.fetchone()[0]
+        for start in range(0, max_id, BATCH_SIZE):
+            with transaction.atomic(using=schema_editor.connection.alias):
+                cursor.execute(sql, [start, start + BATCH_SIZE])
+
+
+def backfill_board(apps, schema_editor):
+    # Сначала цели, затем комментарии: доска комментария берётся у уже заполненной цели
+    backfill_batches(schema_editor, "goals_goal", BACKFILL_GOALS_SQL)
+    backfill_batches(schema_editor, "goals_goalcomment", BACKFILL_COMMENTS_SQL)
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('goals', '0008_goal_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='goal',
+            name='board',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.PROTECT,
+                                    related_name='goals', to='goals.board', verbose_name='Доска'),
+        ),
+        migrations.AddField(
+            model_name='goalcomment',
+            name='board',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.PROTECT,
+                                    related_name='comments', to='goals.board', verbose_name='Доска'),
+        ),
+        migrations.RunPython(backfill_board, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('goals', '0009_goal_board_goalcomment_board'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='goal',
+            name='board',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.PROTECT,
+                                    related_name='goals', to='goals.board', verbose_name='Доска'),
+        ),
+        migrations.AlterField(
+            model_name='goalcomment',
+            name='board',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.PROTECT,
+                                    related_name='comments', to='goals.board', verbose_name='Доска'),
+        ),
+    ]
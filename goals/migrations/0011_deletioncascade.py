@@ -0,0 +1,35 @@
+# Generated by Django 4.2.1 on 2026-10-18 20:38
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0010_alter_goal_board_alter_goalcomment_board'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeletionCascade',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stage', models.PositiveSmallIntegerField(choices=[(1, 'Категории'), (2, 'Цели')], verbose_name='Этап')),
+                ('cursor', models.BigIntegerField(default=0, verbose_name='Последний обработанный id')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('finished', models.DateTimeField(blank=True, null=True, verbose_name='Дата завершения')),
+                ('board', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='goals.board', verbose_name='Доска')),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='goals.goalcategory', verbose_name='Категория')),
+            ],
+            options={
+                'verbose_name': 'Каскад удаления',
+                'verbose_name_plural': 'Каскады удаления',
+                'indexes': [models.Index(condition=models.Q(('finished__isnull', True)), fields=['id'], name='cascade_pending_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='deletioncascade',
+            constraint=models.CheckConstraint(check=models.Q(('board__isnull', True), ('category__isnull', True), _connector='XOR'), name='cascade_board_xor_category'),
+        ),
+    ]
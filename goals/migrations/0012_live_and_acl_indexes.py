@@ -0,0 +1,36 @@
+# Generated by Django 4.2.1 on 2026-10-18 20:42
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Индексы строятся CONCURRENTLY, не блокируя запись в таблицы
+    atomic = False
+
+    dependencies = [
+        ('goals', '0011_deletioncascade'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='board',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['title', 'id'], name='board_live_title_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='boardparticipant',
+            index=models.Index(fields=['user', 'board'], include=('role',), name='participant_user_role_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='goal',
+            index=models.Index(fields=['board', 'status', 'priority', 'due_date', 'id'], name='goal_board_status_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='goalcategory',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['board', 'title'], name='category_live_title_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='goalcomment',
+            index=models.Index(fields=['goal', '-id'], name='comment_goal_id_desc_idx'),
+        ),
+    ]
@@ -0,0 +1,149 @@
+# Generated by Django 4.2.1 on 2026-10-18 20:50
+
+from django.db import migrations, models
+import django.utils.timezone
+import goals.models
+
+# change_xid каждой строки — номер транзакции, которая её последней записала (см. goals/changes.py).
+# Доска получает новый change_xid только при изменении своих полей и состава участников;
+# удаления попадают в goals_changetombstone.
+CHANGE_FEED_SQL = """
+CREATE FUNCTION goals_set_change_xid() RETURNS trigger AS $$
+BEGIN
+    NEW.change_xid := pg_current_xact_id()::text::bigint;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER goals_goal_change_xid BEFORE INSERT OR UPDATE ON goals_goal
+    FOR EACH ROW EXECUTE FUNCTION goals_set_change_xid();
+CREATE TRIGGER goals_goalcategory_change_xid BEFORE INSERT OR UPDATE ON goals_goalcategory
+    FOR EACH ROW EXECUTE FUNCTION goals_set_change_xid();
+CREATE TRIGGER goals_goalcomment_change_xid BEFORE INSERT OR UPDATE ON goals_goalcomment
+    FOR EACH ROW EXECUTE FUNCTION goals_set_change_xid();
+CREATE TRIGGER goals_board_change_xid BEFORE INSERT OR UPDATE OF title, is_deleted ON goals_board
+    FOR EACH ROW EXECUTE FUNCTION goals_set_change_xid();
+
+CREATE FUNCTION goals_participant_change_xid() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        UPDATE goals_board SET change_xid = pg_current_xact_id()::text::bigint WHERE id = OLD.board_id;
+        INSERT INTO goals_changetombstone (kind, object_id, board_id, user_id, change_xid, created)
+        VALUES ('participant', OLD.board_id, OLD.board_id, OLD.user_id, pg_current_xact_id()::text::bigint, now());
+    ELSE
+        UPDATE goals_board SET change_xid = pg_current_xact_id()::text::bigint WHERE id = NEW.board_id;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER goals_boardparticipant_change_xid AFTER INSERT OR UPDATE OR DELETE ON goals_boardparticipant
+    FOR EACH ROW EXECUTE FUNCTION goals_participant_change_xid();
+
+CREATE FUNCTION goals_change_tombstone() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO goals_changetombstone (kind, object_id, board_id, change_xid, created)
+    VALUES (TG_ARGV[0], OLD.id, OLD.board_id, pg_current_xact_id()::text::bigint, now());
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER goals_goal_tombstone AFTER DELETE ON goals_goal
+    FOR EACH ROW EXECUTE FUNCTION goals_change_tombstone('goal');
+CREATE TRIGGER goals_goalcategory_tombstone AFTER DELETE ON goals_goalcategory
+    FOR EACH ROW EXECUTE FUNCTION goals_change_tombstone('category');
+CREATE TRIGGER goals_goalcomment_tombstone AFTER DELETE ON goals_goalcomment
+    FOR EACH ROW EXECUTE FUNCTION goals_change_tombstone('comment');
+"""
+
+DROP_CHANGE_FEED_SQL = """
+DROP TRIGGER goals_goalcomment_tombstone ON goals_goalcomment;
+DROP TRIGGER goals_goalcategory_tombstone ON goals_goalcategory;
+DROP TRIGGER goals_goal_tombstone ON goals_goal;
+DROP FUNCTION goals_change_tombstone();
+DROP TRIGGER goals_boardparticipant_change_xid ON goals_boardparticipant;
+DROP FUNCTION goals_participant_change_xid();
+DROP TRIGGER goals_board_change_xid ON goals_board;
+DROP TRIGGER goals_goalcomment_change_xid ON goals_goalcomment;
+DROP TRIGGER goals_goalcategory_change_xid ON goals_goalcategory;
+DROP TRIGGER goals_goal_change_xid ON goals_goal;
+DROP FUNCTION goals_set_change_xid();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0012_live_and_acl_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('category', 'Категория'), ('goal', 'Цель'), ('comment', 'Комментарий'), ('participant', 'Участник')], max_length=16, verbose_name='Тип')),
+                ('object_id', models.BigIntegerField(verbose_name='Id объекта')),
+                ('board_id', models.BigIntegerField(verbose_name='Id доски')),
+                ('user_id', models.BigIntegerField(blank=True, null=True, verbose_name='Id пользователя')),
+                ('change_xid', goals.models.ChangeXidField(default=0, editable=False, verbose_name='Транзакция изменения')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Дата удаления')),
+            ],
+            options={
+                'verbose_name': 'Удалённый объект',
+                'verbose_name_plural': 'Удалённые объекты',
+            },
+        ),
+        migrations.AddField(
+            model_name='board',
+            name='change_xid',
+            field=goals.models.ChangeXidField(default=0, editable=False, verbose_name='Транзакция изменения'),
+        ),
+        migrations.AddField(
+            model_name='goal',
+            name='change_xid',
+            field=goals.models.ChangeXidField(default=0, editable=False, verbose_name='Транзакция изменения'),
+        ),
+        migrations.AddField(
+            model_name='goal',
+            name='created',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now, verbose_name='Дата создания'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='goal',
+            name='updated',
+            field=models.DateTimeField(auto_now=True, verbose_name='Дата последнего обновления'),
+        ),
+        migrations.AddField(
+            model_name='goalcategory',
+            name='change_xid',
+            field=goals.models.ChangeXidField(default=0, editable=False, verbose_name='Транзакция изменения'),
+        ),
+        migrations.AddField(
+            model_name='goalcomment',
+            name='change_xid',
+            field=goals.models.ChangeXidField(default=0, editable=False, verbose_name='Транзакция изменения'),
+        ),
+        migrations.AddIndex(
+            model_name='board',
+            index=models.Index(fields=['change_xid', 'id'], name='board_change_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='goal',
+            index=models.Index(fields=['change_xid', 'id'], name='goal_change_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='goalcategory',
+            index=models.Index(fields=['change_xid', 'id'], name='category_change_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='goalcomment',
+            index=models.Index(fields=['change_xid', 'id'], name='comment_change_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='changetombstone',
+            index=models.Index(fields=['change_xid', 'id'], name='tombstone_change_idx'),
+        ),
+        migrations.RunSQL(CHANGE_FEED_SQL, DROP_CHANGE_FEED_SQL),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 4.2.1 on 2026-10-18 20:53
+
+from django.db import migrations, models
+
+# Версия доски растёт один раз на каждый SQL-оператор, изменивший её цели, категории, комментарии
+# или участников: триггеры уровня оператора читают затронутые board_id из таблиц переходов.
+# Собственное изменение доски (название, удаление) увеличивает версию построчным триггером.
+BOARD_VERSION_SQL = """
+CREATE FUNCTION goals_bump_version_new() RETURNS trigger AS $$
+BEGIN
+    UPDATE goals_board SET version = version + 1 WHERE id IN (SELECT DISTINCT board_id FROM new_rows);
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE FUNCTION goals_bump_version_old() RETURNS trigger AS $$
+BEGIN
+    UPDATE goals_board SET version = version + 1 WHERE id IN (SELECT DISTINCT board_id FROM old_rows);
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE FUNCTION goals_bump_version_both() RETURNS trigger AS $$
+BEGIN
+    UPDATE goals_board SET version = version + 1
+    WHERE id IN (SELECT board_id FROM new_rows UNION SELECT board_id FROM old_rows);
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE FUNCTION goals_board_bump_version() RETURNS trigger AS $$
+BEGIN
+    NEW.version := OLD.version + 1;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER goals_board_version BEFORE UPDATE OF title, is_deleted ON goals_board
+    FOR EACH ROW EXECUTE FUNCTION goals_board_bump_version();
+"""
+
+BOARD_VERSION_TABLES: tuple = ("goals_goal", "goals_goalcategory", "goals_goalcomment", "goals_boardparticipant")
+
+for table in BOARD_VERSION_TABLES:
+    BOARD_VERSION_SQL += f"""
+CREATE TRIGGER {table}_version_insert AFTER INSERT ON {table}
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION goals_bump_version_new();
+CREATE TRIGGER {table}_version_update AFTER UPDATE ON {table}
+    REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION goals_bump_version_both();
+CREATE TRIGGER {table}_version_delete AFTER DELETE ON {table}
+    REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION goals_bump_version_old();
+"""
+
+DROP_BOARD_VERSION_SQL = "".join(
+    f"DROP TRIGGER {table}_version_{event} ON {table};\n"
+    for table in BOARD_VERSION_TABLES for event in ("insert", "update", "delete")
+) + """
+DROP TRIGGER goals_board_version ON goals_board;
+DROP FUNCTION goals_board_bump_version();
+DROP FUNCTION goals_bump_version_both();
+DROP FUNCTION goals_bump_version_old();
+DROP FUNCTION goals_bump_version_new();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0013_change_feed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='board',
+            name='version',
+            field=models.BigIntegerField(default=0, editable=False, verbose_name='Версия'),
+        ),
+        migrations.RunSQL(BOARD_VERSION_SQL, DROP_BOARD_VERSION_SQL),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 4.2.1 on 2026-10-18 21:07
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    # Индексы на существующих таблицах строятся CONCURRENTLY, не блокируя запись
+    atomic = False
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('goals', '0014_board_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedComment',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('text', models.TextField(verbose_name='Текст')),
+                ('created', models.DateTimeField(verbose_name='Дата создания')),
+                ('updated', models.DateTimeField(verbose_name='Дата последнего обновления')),
+            ],
+            options={
+                'verbose_name': 'Комментарий в архиве',
+                'verbose_name_plural': 'Комментарии в архиве',
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedGoal',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('board_id', models.BigIntegerField(verbose_name='Id доски')),
+                ('category_id', models.BigIntegerField(verbose_name='Id категории')),
+                ('category_title', models.CharField(max_length=255, verbose_name='Название категории')),
+                ('title', models.CharField(max_length=255, verbose_name='Заголовок цели')),
+                ('description', models.TextField(blank=True, null=True, verbose_name='Описание')),
+                ('status', models.PositiveSmallIntegerField(choices=[(1, 'К выполнению'), (2, 'В процессе'), (3, 'Выполнено'), (4, 'Архив')], verbose_name='Статус')),
+                ('priority', models.PositiveSmallIntegerField(choices=[(1, 'Низкий'), (2, 'Средний'), (3, 'Высокий'), (4, 'Критический')], verbose_name='Приоритет')),
+                ('due_date', models.DateField(blank=True, null=True, verbose_name='Дата выполнения')),
+                ('created', models.DateTimeField(verbose_name='Дата создания')),
+                ('updated', models.DateTimeField(verbose_name='Дата последнего обновления')),
+                ('archived', models.DateTimeField(verbose_name='Дата переноса в архив')),
+            ],
+            options={
+                'verbose_name': 'Цель в архиве',
+                'verbose_name_plural': 'Цели в архиве',
+            },
+        ),
+        AddIndexConcurrently(
+            model_name='board',
+            index=models.Index(condition=models.Q(('is_deleted', True)), fields=['updated'], name='board_deleted_updated_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='goal',
+            index=models.Index(condition=models.Q(('status', 4)), fields=['updated'], name='goal_archived_updated_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='goalcategory',
+            index=models.Index(condition=models.Q(('is_deleted', True)), fields=['updated'], name='category_deleted_updated_idx'),
+        ),
+        migrations.AddField(
+            model_name='archivedgoal',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Автор'),
+        ),
+        migrations.AddField(
+            model_name='archivedcomment',
+            name='goal',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='goals.archivedgoal', verbose_name='Цель'),
+        ),
+        migrations.AddField(
+            model_name='archivedcomment',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedgoal',
+            index=models.Index(fields=['board_id', '-id'], name='archived_goal_board_idx'),
+        ),
+    ]
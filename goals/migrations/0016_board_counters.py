@@ -0,0 +1,107 @@
+# Generated by Django 4.2.1 on 2026-10-18 21:14
+
+from django.db import migrations, models
+
+# Счётчики доски меняются в том же UPDATE goals_board, что и версия (0014): на каждый оператор над целями,
+# категориями и участниками один триггер уровня оператора суммирует вклад строк из таблиц переходов
+# по доскам (новые строки со знаком +, старые со знаком -). Статусы целей: 1 и 2 — открытые, 4 — архив.
+BOARD_COUNTERS: dict = {
+    "goals_goal": {
+        "goal_count": "(status <> 4)::int",
+        "open_goal_count": "(status IN (1, 2))::int",
+    },
+    "goals_goalcategory": {
+        "category_count": "(NOT is_deleted)::int",
+    },
+    "goals_boardparticipant": {
+        "participant_count": "1",
+    },
+}
+
+ROWS_SQL: dict = {
+    "insert": "SELECT board_id, {plus} FROM new_rows",
+    "update": "SELECT board_id, {plus} FROM new_rows UNION ALL SELECT board_id, {minus} FROM old_rows",
+    "delete": "SELECT board_id, {minus} FROM old_rows",
+}
+
+REFERENCING_SQL: dict = {
+    "insert": "REFERENCING NEW TABLE AS new_rows",
+    "update": "REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows",
+    "delete": "REFERENCING OLD TABLE AS old_rows",
+}
+
+# Функции версии из 0014, которые снова вешаются на таблицы при откате
+VERSION_FUNCTIONS: dict = {"insert": "new", "update": "both", "delete": "old"}
+
+BOARD_COUNTERS_SQL = ""
+DROP_BOARD_COUNTERS_SQL = ""
+for table, counters in BOARD_COUNTERS.items():
+    for event in ("insert", "update", "delete"):
+        rows = ROWS_SQL[event].format(
+            plus=", ".join(f"{expression} AS {name}" for name, expression in counters.items()),
+            minus=", ".join(f"-{expression} AS {name}" for name, expression in counters.items()),
+        )
+        BOARD_COUNTERS_SQL += f"""
+CREATE FUNCTION {table}_board_stats_{event}() RETURNS trigger AS $$
+BEGIN
+    UPDATE goals_board b SET version = b.version + 1,
+        {", ".join(f"{name} = b.{name} + d.{name}" for name in counters)}
+    FROM (
+        SELECT board_id, {", ".join(f"sum({name}) AS {name}" for name in counters)}
+        FROM ({rows}) AS rows GROUP BY board_id
+    ) AS d
+    WHERE b.id = d.board_id;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER {table}_version_{event} ON {table};
+CREATE TRIGGER {table}_board_stats_{event} AFTER {event.upper()} ON {table}
+    {REFERENCING_SQL[event]} FOR EACH STATEMENT EXECUTE FUNCTION {table}_board_stats_{event}();
+"""
+        DROP_BOARD_COUNTERS_SQL += f"""
+DROP TRIGGER {table}_board_stats_{event} ON {table};
+DROP FUNCTION {table}_board_stats_{event}();
+CREATE TRIGGER {table}_version_{event} AFTER {event.upper()} ON {table}
+    {REFERENCING_SQL[event]} FOR EACH STATEMENT EXECUTE FUNCTION goals_bump_version_{VERSION_FUNCTIONS[event]}();
+"""
+
+RECOUNT_SQL = """
+UPDATE goals_board b SET
+    goal_count = (SELECT count(*) FROM goals_goal g WHERE g.board_id = b.id AND g.status <> 4),
+    open_goal_count = (SELECT count(*) FROM goals_goal g WHERE g.board_id = b.id AND g.status IN (1, 2)),
+    category_count = (SELECT count(*) FROM goals_goalcategory c WHERE c.board_id = b.id AND NOT c.is_deleted),
+    participant_count = (SELECT count(*) FROM goals_boardparticipant p WHERE p.board_id = b.id);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0015_cold_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='board',
+            name='category_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Категорий'),
+        ),
+        migrations.AddField(
+            model_name='board',
+            name='goal_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Целей'),
+        ),
+        migrations.AddField(
+            model_name='board',
+            name='open_goal_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Открытых целей'),
+        ),
+        migrations.AddField(
+            model_name='board',
+            name='participant_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Участников'),
+        ),
+        migrations.RunSQL(BOARD_COUNTERS_SQL, DROP_BOARD_COUNTERS_SQL),
+        migrations.RunSQL(RECOUNT_SQL, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.1 on 2026-10-18 22:05
+
+from django.db import migrations
+
+# Цели, категории, комментарии и участники доски отдаются вместе с данными их пользователей (UserSerializer),
+# поэтому смена имени, фамилии, логина или почты тоже меняет ответ. Триггер увеличивает версию всех досок,
+# где пользователь участник или автор; запись last_login при входе версию не трогает.
+USER_VERSION_SQL = """
+CREATE FUNCTION goals_user_bump_version() RETURNS trigger AS $$
+BEGIN
+    UPDATE goals_board SET version = version + 1 WHERE id IN (
+        SELECT board_id FROM goals_boardparticipant WHERE user_id = NEW.id
+        UNION SELECT board_id FROM goals_goalcategory WHERE user_id = NEW.id
+        UNION SELECT board_id FROM goals_goal WHERE user_id = NEW.id
+        UNION SELECT board_id FROM goals_goalcomment WHERE user_id = NEW.id
+    );
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER goals_user_version AFTER UPDATE OF username, first_name, last_name, email ON core_user
+    FOR EACH ROW WHEN ((OLD.username, OLD.first_name, OLD.last_name, OLD.email)
+                       IS DISTINCT FROM (NEW.username, NEW.first_name, NEW.last_name, NEW.email))
+    EXECUTE FUNCTION goals_user_bump_version();
+"""
+
+DROP_USER_VERSION_SQL = """
+DROP TRIGGER goals_user_version ON core_user;
+DROP FUNCTION goals_user_bump_version();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        ('goals', '0016_board_counters'),
+    ]
+
+    operations = [
+        migrations.RunSQL(USER_VERSION_SQL, DROP_USER_VERSION_SQL),
+    ]
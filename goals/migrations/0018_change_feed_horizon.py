@@ -0,0 +1,68 @@
+# Generated by Django 4.2.1 on 2026-10-18 21:54
+
+from django.contrib.postgres.operations import AddIndexConcurrently, RemoveIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Индексы ленты по доскам строятся CONCURRENTLY, старые индексы по (change_xid, id) удаляются после них
+    atomic = False
+
+    dependencies = [
+        ('goals', '0017_user_board_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeFeedHorizon',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pruned_xid', models.BigIntegerField(default=0, verbose_name='Очищено до транзакции')),
+                ('updated', models.DateTimeField(auto_now=True, verbose_name='Дата очистки')),
+            ],
+            options={
+                'verbose_name': 'Горизонт ленты изменений',
+                'verbose_name_plural': 'Горизонт ленты изменений',
+            },
+        ),
+        AddIndexConcurrently(
+            model_name='changetombstone',
+            index=models.Index(fields=['board_id', 'change_xid', 'id'], name='tombstone_board_change_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='changetombstone',
+            index=models.Index(condition=models.Q(('kind', 'participant')), fields=['user_id', 'change_xid', 'id'], name='tombstone_user_change_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='changetombstone',
+            index=models.Index(fields=['created'], name='tombstone_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='goal',
+            index=models.Index(fields=['board', 'change_xid', 'id'], name='goal_board_change_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='goalcategory',
+            index=models.Index(fields=['board', 'change_xid', 'id'], name='category_board_change_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='goalcomment',
+            index=models.Index(fields=['board', 'change_xid', 'id'], name='comment_board_change_idx'),
+        ),
+        RemoveIndexConcurrently(
+            model_name='changetombstone',
+            name='tombstone_change_idx',
+        ),
+        RemoveIndexConcurrently(
+            model_name='goal',
+            name='goal_change_idx',
+        ),
+        RemoveIndexConcurrently(
+            model_name='goalcategory',
+            name='category_change_idx',
+        ),
+        RemoveIndexConcurrently(
+            model_name='goalcomment',
+            name='comment_change_idx',
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 4.2.1 on 2026-10-18 21:57
+
+from django.db import migrations, models
+
+# Триггер записи об удалении отмечает строки, удалённые переносом в архив: goals/retention.py выставляет
+# goals.archiving на время своей транзакции. Умолчание в БД нужно триггеру исключения участника,
+# который колонку не заполняет.
+TOMBSTONE_ARCHIVED_SQL = """
+ALTER TABLE goals_changetombstone ALTER COLUMN archived SET DEFAULT false;
+
+CREATE OR REPLACE FUNCTION goals_change_tombstone() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO goals_changetombstone (kind, object_id, board_id, change_xid, created, archived)
+    VALUES (TG_ARGV[0], OLD.id, OLD.board_id, pg_current_xact_id()::text::bigint, now(),
+            COALESCE(current_setting('goals.archiving', true), '') = 'on');
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+DROP_TOMBSTONE_ARCHIVED_SQL = """
+CREATE OR REPLACE FUNCTION goals_change_tombstone() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO goals_changetombstone (kind, object_id, board_id, change_xid, created)
+    VALUES (TG_ARGV[0], OLD.id, OLD.board_id, pg_current_xact_id()::text::bigint, now());
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+ALTER TABLE goals_changetombstone ALTER COLUMN archived DROP DEFAULT;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0018_change_feed_horizon'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='changetombstone',
+            name='archived',
+            field=models.BooleanField(default=False, verbose_name='Перенесён в архив'),
+        ),
+        migrations.RunSQL(TOMBSTONE_ARCHIVED_SQL, DROP_TOMBSTONE_ARCHIVED_SQL),
+    ]
@@ -0,0 +1,183 @@
+# Generated by Django 4.2.1 on 2026-10-18 22:26
+
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+# Комментарии больше не перечитываются при каждой записи (0008 собирала string_agg всех комментариев цели).
+# На каждый оператор над комментариями один триггер уровня оператора берёт лексемы строк из таблиц переходов
+# (новые со знаком +, старые со знаком -), суммирует их по (goal_id, lexeme) и прибавляет к goals_commentlexeme —
+# так же, как счётчики доски в 0016. В goals_goal.comments_vector добавляются лексемы, чей счётчик только что
+# стал положительным, и удаляются те, чей счётчик дошёл до нуля; search_vector цели собирается из заголовка,
+# описания и comments_vector без чтения комментариев.
+
+# Лексема попадает в вектор с позицией 1 и весом C, чтобы ранг совпадения в комментарии не изменился
+LEXEMES_VECTOR_SQL = r"""
+CREATE FUNCTION goals_lexemes_vector(lexemes text[]) RETURNS tsvector AS $$
+    SELECT coalesce(string_agg('''' || replace(replace(lexeme, '\', '\\'), '''', '''''') || ''':1C', ' '), '')::tsvector
+    FROM unnest(lexemes) AS lexeme
+$$ LANGUAGE sql IMMUTABLE;
+"""
+
+LEXEMES_SQL: str = "unnest(tsvector_to_array(to_tsvector('russian', text)))"
+
+ROWS_SQL: dict = {
+    "insert": f"SELECT goal_id, {LEXEMES_SQL} AS lexeme, 1 AS delta FROM new_rows",
+    "update": f"SELECT goal_id, {LEXEMES_SQL} AS lexeme, 1 AS delta FROM new_rows "
+              f"UNION ALL SELECT goal_id, {LEXEMES_SQL}, -1 FROM old_rows",
+    "delete": f"SELECT goal_id, {LEXEMES_SQL} AS lexeme, -1 AS delta FROM old_rows",
+}
+
+REFERENCING_SQL: dict = {
+    "insert": "REFERENCING NEW TABLE AS new_rows",
+    "update": "REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows",
+    "delete": "REFERENCING OLD TABLE AS old_rows",
+}
+
+# comments_vector меняют только триггеры комментариев (глубина вложенности триггеров 2); save() цели пишет все
+# столбцы, и прочитанное до нового комментария значение не должно затереть его лексемы
+COMMENT_TRIGGERS_SQL = """
+DROP TRIGGER goals_goalcomment_search_vector ON goals_goalcomment;
+DROP FUNCTION goals_goalcomment_search_vector();
+
+CREATE OR REPLACE FUNCTION goals_goal_search_vector() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND pg_trigger_depth() < 2 THEN
+        NEW.comments_vector := OLD.comments_vector;
+    END IF;
+    NEW.search_vector :=
+        setweight(to_tsvector('russian', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('russian', coalesce(NEW.description, '')), 'B') ||
+        coalesce(NEW.comments_vector, '');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER goals_goal_search_vector ON goals_goal;
+CREATE TRIGGER goals_goal_search_vector
+    BEFORE INSERT OR UPDATE OF title, description, search_vector, comments_vector ON goals_goal
+    FOR EACH ROW EXECUTE FUNCTION goals_goal_search_vector();
+"""
+DROP_COMMENT_TRIGGERS_SQL = ""
+for event in ("insert", "update", "delete"):
+    COMMENT_TRIGGERS_SQL += f"""
+CREATE FUNCTION goals_goalcomment_lexemes_{event}() RETURNS trigger AS $$
+BEGIN
+    WITH delta AS (
+        SELECT goal_id, lexeme, sum(delta)::int AS delta FROM ({ROWS_SQL[event]}) AS rows
+        GROUP BY goal_id, lexeme HAVING sum(delta) <> 0
+    ), counted AS (
+        INSERT INTO goals_commentlexeme AS l (goal_id, lexeme, count)
+        SELECT goal_id, lexeme, delta FROM delta ORDER BY goal_id, lexeme
+        ON CONFLICT (goal_id, lexeme) DO UPDATE SET count = l.count + EXCLUDED.count
+        RETURNING l.goal_id, l.lexeme, l.count
+    )
+    UPDATE goals_goal g
+    SET comments_vector = ts_delete(coalesce(g.comments_vector, ''), c.removed) || goals_lexemes_vector(c.added)
+    FROM (
+        SELECT goal_id,
+            coalesce(array_agg(lexeme) FILTER (WHERE count <= 0), '{{}}') AS removed,
+            coalesce(array_agg(lexeme) FILTER (WHERE count > 0 AND count = delta), '{{}}') AS added
+        FROM counted JOIN delta USING (goal_id, lexeme)
+        GROUP BY goal_id
+    ) AS c
+    WHERE g.id = c.goal_id AND (cardinality(c.removed) > 0 OR cardinality(c.added) > 0);
+    DELETE FROM goals_commentlexeme WHERE count <= 0;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER goals_goalcomment_lexemes_{event} AFTER {event.upper()} ON goals_goalcomment
+    {REFERENCING_SQL[event]} FOR EACH STATEMENT EXECUTE FUNCTION goals_goalcomment_lexemes_{event}();
+"""
+    DROP_COMMENT_TRIGGERS_SQL += f"""
+DROP TRIGGER goals_goalcomment_lexemes_{event} ON goals_goalcomment;
+DROP FUNCTION goals_goalcomment_lexemes_{event}();
+"""
+
+# Обратно — триггеры 0008
+DROP_COMMENT_TRIGGERS_SQL += """
+CREATE OR REPLACE FUNCTION goals_goal_search_vector() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('russian', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('russian', coalesce(NEW.description, '')), 'B') ||
+        setweight(to_tsvector('russian', coalesce(
+            (SELECT string_agg(c.text, ' ') FROM goals_goalcomment c WHERE c.goal_id = NEW.id), ''
+        )), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER goals_goal_search_vector ON goals_goal;
+CREATE TRIGGER goals_goal_search_vector
+    BEFORE INSERT OR UPDATE OF title, description, search_vector ON goals_goal
+    FOR EACH ROW EXECUTE FUNCTION goals_goal_search_vector();
+
+CREATE FUNCTION goals_goalcomment_search_vector() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP <> 'INSERT' THEN
+        UPDATE goals_goal SET search_vector = NULL WHERE id = OLD.goal_id;
+    END IF;
+    IF TG_OP = 'INSERT' OR (TG_OP = 'UPDATE' AND NEW.goal_id <> OLD.goal_id) THEN
+        UPDATE goals_goal SET search_vector = NULL WHERE id = NEW.goal_id;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER goals_goalcomment_search_vector
+    AFTER INSERT OR UPDATE OF text, goal_id OR DELETE ON goals_goalcomment
+    FOR EACH ROW EXECUTE FUNCTION goals_goalcomment_search_vector();
+
+UPDATE goals_goal SET search_vector = NULL;
+"""
+
+# Заполнение до замены триггеров: старый триггер цели на comments_vector не срабатывает, а новый сохранил бы
+# прежнее значение. Затем search_vector пересобирается уже новым триггером
+BACKFILL_SQL = f"""
+INSERT INTO goals_commentlexeme (goal_id, lexeme, count)
+SELECT goal_id, lexeme, count(*) FROM (SELECT goal_id, {LEXEMES_SQL} AS lexeme FROM goals_goalcomment) AS rows
+GROUP BY goal_id, lexeme;
+
+UPDATE goals_goal g SET comments_vector = goals_lexemes_vector(l.lexemes)
+FROM (SELECT goal_id, array_agg(lexeme) AS lexemes FROM goals_commentlexeme GROUP BY goal_id) AS l
+WHERE g.id = l.goal_id;
+"""
+
+RESET_SEARCH_VECTOR_SQL = "UPDATE goals_goal SET search_vector = NULL WHERE comments_vector IS NOT NULL;"
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0019_tombstone_archived'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='goal',
+            name='comments_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Лексемы комментариев'),
+        ),
+        migrations.CreateModel(
+            name='CommentLexeme',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('goal_id', models.BigIntegerField(verbose_name='Id цели')),
+                ('lexeme', models.TextField(verbose_name='Лексема')),
+                ('count', models.IntegerField(default=0, verbose_name='Комментариев')),
+            ],
+            options={
+                'verbose_name': 'Лексема комментариев',
+                'verbose_name_plural': 'Лексемы комментариев',
+                'indexes': [models.Index(condition=models.Q(('count__lte', 0)), fields=['goal_id'], name='comment_lexeme_unused_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='commentlexeme',
+            constraint=models.UniqueConstraint(fields=('goal_id', 'lexeme'), name='comment_lexeme_goal_uniq'),
+        ),
+        migrations.RunSQL(LEXEMES_VECTOR_SQL + BACKFILL_SQL, "DROP FUNCTION goals_lexemes_vector(text[]);"),
+        migrations.RunSQL(COMMENT_TRIGGERS_SQL, DROP_COMMENT_TRIGGERS_SQL),
+        migrations.RunSQL(RESET_SEARCH_VECTOR_SQL, migrations.RunSQL.noop),
+    ]
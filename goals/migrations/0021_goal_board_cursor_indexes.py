@@ -0,0 +1,31 @@
+# Generated by Django 4.2.1 on 2026-10-18 22:31
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    # Таблица целей большая: индексы строятся CONCURRENTLY, без блокировки записи
+    atomic = False
+
+    dependencies = [
+        ('goals', '0020_goal_comments_vector'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='goal',
+            index=models.Index(fields=['board', 'priority', 'due_date', 'id'], name='goal_board_priority_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='goal',
+            index=models.Index(fields=['board', 'due_date', 'priority', 'id'], name='goal_board_due_date_idx'),
+        ),
+        # Индекс внешнего ключа удаляется после того, как составные индексы с доской впереди построены
+        migrations.AlterField(
+            model_name='goal',
+            name='board',
+            field=models.ForeignKey(db_index=False, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='goals', to='goals.board', verbose_name='Доска'),
+        ),
+    ]
@@ -1,9 +1,24 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.utils import timezone
 
 from core.models import User
 
 
+class ChangeXidField(models.BigIntegerField):
+    """
+    Номер транзакции, последней изменившей строку (`pg_current_xact_id()`).
+    Проставляется триггером БД при каждой записи и служит курсором ленты изменений (goals/changes.py).
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("verbose_name", "Транзакция изменения")
+        kwargs.setdefault("default", 0)
+        kwargs.setdefault("editable", False)
+        super().__init__(*args, **kwargs)
+
+
 class GoalCategory(models.Model):
     """
     Модель категории цели.
@@ -13,6 +28,15 @@ class GoalCategory(models.Model):
     class Meta:
         verbose_name = "Категория"
         verbose_name_plural = "Категории"
+        indexes = [
+            # Лента изменений читает каждую доску пользователя отдельным диапазоном индекса
+            models.Index(fields=["board", "change_xid", "id"], name="category_board_change_idx"),
+            # Очистка давно удалённых категорий
+            models.Index(fields=["updated"], name="category_deleted_updated_idx", condition=models.Q(is_deleted=True)),
+            # Список категорий: неудалённые категории доски по названию
+            models.Index(fields=["board", "title"], name="category_live_title_idx",
+                         condition=models.Q(is_deleted=False)),
+        ]
 
     board = models.ForeignKey('Board', verbose_name="Доска", on_delete=models.PROTECT, related_name="categories")
     title = models.CharField(verbose_name="Название", max_length=255)
@@ -20,6 +44,7 @@ class GoalCategory(models.Model):
     is_deleted = models.BooleanField(verbose_name="Удалена", default=False)
     created = models.DateTimeField(verbose_name="Дата создания")
     updated = models.DateTimeField(verbose_name="Дата последнего обновления")
+    change_xid = ChangeXidField()
 
     def save(self, *args, **kwargs):
         """
@@ -56,9 +81,35 @@ class Goal(models.Model):
                                                 default=Priority.medium)
     user = models.ForeignKey(User, verbose_name="Автор", related_name="goals", on_delete=models.PROTECT)
     category = models.ForeignKey(GoalCategory, verbose_name="Категория", on_delete=models.PROTECT)
+    # Денормализованная доска категории: проверка доступа соединяет цель сразу с участниками доски.
+    # Отдельный индекс не нужен: доска стоит первой в составных индексах из Meta
+    board = models.ForeignKey('Board', verbose_name="Доска", on_delete=models.PROTECT, related_name="goals",
+                              editable=False, db_index=False)
     title = models.CharField(verbose_name="Заголовок цели", max_length=255)
     description = models.TextField(verbose_name="Описание", null=True, blank=True, default=None)
     due_date = models.DateField(verbose_name="Дата выполнения", null=True, blank=True, default=None)
+    # Заполняется триггером БД из заголовка (вес A), описания (B) и лексем комментариев (C)
+    search_vector = SearchVectorField(verbose_name="Поисковый вектор", null=True, editable=False)
+    # Лексемы всех комментариев цели (вес C), триггеры комментариев меняют их на разницу по CommentLexeme
+    comments_vector = SearchVectorField(verbose_name="Лексемы комментариев", null=True, editable=False)
+    created = models.DateTimeField(verbose_name="Дата создания", auto_now_add=True)
+    updated = models.DateTimeField(verbose_name="Дата последнего обновления", auto_now=True)
+    change_xid = ChangeXidField()
+
+    def save(self, *args, **kwargs):
+        """
+        Переопределение метода save: доска цели всегда совпадает с доской её категории.
+        Если цель перенесена на другую доску, за ней переносятся и комментарии.
+        """
+        board_id = self.category.board_id
+        moved = self.id is not None and self.board_id is not None and self.board_id != board_id
+        self.board_id = board_id
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "category" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "board"}
+        super().save(*args, **kwargs)
+        if moved:
+            GoalComment.objects.filter(goal=self).update(board_id=board_id)
 
     def __str__(self):
         return '{}'.format(self.title)
@@ -66,6 +117,24 @@ class Goal(models.Model):
     class Meta:
         verbose_name = "Цель"
         verbose_name_plural = "Цели"
+        # Индексы под курсорную пагинацию: каждая комбинация `ordering_fields` (с `id` в конце)
+        # совпадает с одним из них при прямом или обратном проходе. Список целей всегда ограничен досками
+        # пользователя: индексы с доской впереди дают по диапазону «после курсора» на каждую доску, поэтому
+        # глубокая страница пользователя с несколькими досками не проходит индекс с начала через чужие цели
+        indexes = [
+            models.Index(fields=["board", "change_xid", "id"], name="goal_board_change_idx"),
+            models.Index(fields=["board", "priority", "due_date", "id"], name="goal_board_priority_idx"),
+            models.Index(fields=["board", "due_date", "priority", "id"], name="goal_board_due_date_idx"),
+            models.Index(fields=["priority", "due_date", "id"], name="goal_priority_due_date_idx"),
+            models.Index(fields=["priority", "-due_date", "-id"], name="goal_priority_due_desc_idx"),
+            models.Index(fields=["due_date", "priority", "id"], name="goal_due_date_priority_idx"),
+            models.Index(fields=["due_date", "-priority", "-id"], name="goal_due_priority_desc_idx"),
+            GinIndex(fields=["search_vector"], name="goal_search_vector_gin"),
+            # Фильтры по статусу внутри доски и колонки канбана в порядке списка целей
+            models.Index(fields=["board", "status", "priority", "due_date", "id"], name="goal_board_status_idx"),
+            # Перенос в архив: архивные цели (status=4) от давно изменённых
+            models.Index(fields=["updated"], name="goal_archived_updated_idx", condition=models.Q(status=4)),
+        ]
 
 
 class GoalComment(models.Model):
@@ -75,9 +144,20 @@ class GoalComment(models.Model):
     """
     text = models.TextField(verbose_name="Текст")
     goal = models.ForeignKey(Goal, verbose_name="Цель", on_delete=models.CASCADE)
+    # Денормализованная доска цели, поддерживается в save() цели и комментария
+    board = models.ForeignKey('Board', verbose_name="Доска", on_delete=models.PROTECT, related_name="comments",
+                              editable=False)
     user = models.ForeignKey(User, verbose_name="Пользователь", related_name="comments", on_delete=models.PROTECT)
     created = models.DateTimeField(verbose_name="Дата создания", auto_now_add=True)
     updated = models.DateTimeField(verbose_name="Дата последнего обновления", auto_now=True)
+    change_xid = ChangeXidField()
+
+    def save(self, *args, **kwargs):
+        """
+        Переопределение метода save для проставления доски цели.
+        """
+        self.board_id = self.goal.board_id
+        return super().save(*args, **kwargs)
 
     def __str__(self):
         return 'Comment #{}'.format(self.id)
@@ -85,6 +165,35 @@ class GoalComment(models.Model):
     class Meta:
         verbose_name = "Комментарий"
         verbose_name_plural = "Комментарии"
+        indexes = [
+            models.Index(fields=["board", "change_xid", "id"], name="comment_board_change_idx"),
+            # Комментарии цели от новых к старым
+            models.Index(fields=["goal", "-id"], name="comment_goal_id_desc_idx"),
+        ]
+
+
+class CommentLexeme(models.Model):
+    """
+    Сколько комментариев цели содержат лексему.
+    Триггеры комментариев (миграция 0020) прибавляют лексемы новых строк и вычитают лексемы старых, а в
+    `Goal.comments_vector` добавляют лексемы, появившиеся впервые, и убирают те, что больше не встречаются:
+    запись комментария не перечитывает остальные комментарии цели. Цель хранится как id, без внешнего ключа,
+    чтобы удаление цели вместе с комментариями одним оператором не зависело от порядка проверок.
+    """
+    class Meta:
+        verbose_name = "Лексема комментариев"
+        verbose_name_plural = "Лексемы комментариев"
+        constraints = [
+            models.UniqueConstraint(fields=["goal_id", "lexeme"], name="comment_lexeme_goal_uniq"),
+        ]
+        indexes = [
+            # Строки, счётчик которых дошёл до нуля, удаляются тем же триггером
+            models.Index(fields=["goal_id"], name="comment_lexeme_unused_idx", condition=models.Q(count__lte=0)),
+        ]
+
+    goal_id = models.BigIntegerField(verbose_name="Id цели")
+    lexeme = models.TextField(verbose_name="Лексема")
+    count = models.IntegerField(verbose_name="Комментариев", default=0)
 
 
 class Board(models.Model):
@@ -95,11 +204,40 @@ class Board(models.Model):
     class Meta:
         verbose_name = "Доска"
         verbose_name_plural = "Доски"
+        indexes = [
+            models.Index(fields=["change_xid", "id"], name="board_change_idx"),
+            # Список досок: только неудалённые, по названию
+            models.Index(fields=["title", "id"], name="board_live_title_idx", condition=models.Q(is_deleted=False)),
+            # Очистка давно удалённых досок
+            models.Index(fields=["updated"], name="board_deleted_updated_idx", condition=models.Q(is_deleted=True)),
+        ]
 
     title = models.CharField(verbose_name="Название", max_length=255)
     is_deleted = models.BooleanField(verbose_name="Удалена", default=False)
     created = models.DateTimeField(verbose_name="Дата создания", auto_now_add=True)
     updated = models.DateTimeField(verbose_name="Дата последнего обновления", auto_now=True)
+    change_xid = ChangeXidField()
+    # Увеличивается триггерами БД при любой записи в цели, категории, комментарии и участников доски
+    version = models.BigIntegerField(verbose_name="Версия", default=0, editable=False)
+    # Счётчики поддерживаются теми же триггерами БД, что и версия; расхождения чинит команда `recount_boards`
+    goal_count = models.IntegerField(verbose_name="Целей", default=0, editable=False)
+    open_goal_count = models.IntegerField(verbose_name="Открытых целей", default=0, editable=False)
+    category_count = models.IntegerField(verbose_name="Категорий", default=0, editable=False)
+    participant_count = models.IntegerField(verbose_name="Участников", default=0, editable=False)
+
+    COUNTER_FIELDS: tuple = ("goal_count", "open_goal_count", "category_count", "participant_count")
+
+    def save(self, *args, **kwargs):
+        """
+        Переопределение метода save: при обновлении доски счётчики не перезаписываются значениями,
+        прочитанными раньше, — их меняют только триггеры БД и команда `recount_boards`.
+        """
+        if not self._state.adding and not kwargs.get("force_insert") and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
+        return super().save(*args, **kwargs)
 
     def __str__(self):
         return '{}'.format(self.title)
@@ -115,6 +253,10 @@ class BoardParticipant(models.Model):
         unique_together = ("board", "user")
         verbose_name = "Участник"
         verbose_name_plural = "Участники"
+        indexes = [
+            # Покрывающий индекс проверок доступа: board_ids(), role_subquery() и карта ролей читают только индекс
+            models.Index(fields=["user", "board"], include=["role"], name="participant_user_role_idx"),
+        ]
 
     class Role(models.IntegerChoices):
         owner = 1, "Владелец"
@@ -140,5 +282,175 @@ class BoardParticipant(models.Model):
     created = models.DateTimeField(verbose_name="Дата создания", auto_now_add=True)
     updated = models.DateTimeField(verbose_name="Дата последнего обновления", auto_now=True)
 
+    @classmethod
+    def board_ids(cls, user) -> models.QuerySet:
+        """
+        Подзапрос с id неудалённых досок, в которых участвует пользователь.
+        Фильтр `board_id__in=...` соединяет объект только с таблицей участников.
+        """
+        return cls.objects.filter(user=user, board__is_deleted=False).values("board_id")
+
+    @classmethod
+    def role_subquery(cls, user, board_field: str = "board_id") -> models.Subquery:
+        """
+        Подзапрос роли пользователя на доске объекта (`board_field` — путь к id доски).
+        Аннотация `user_role` заменяет соединение с участниками и отдельную проверку в permissions.
+        На удалённой доске роли нет, даже пока каскад удаления ещё не дошёл до её содержимого.
+        """
+        return models.Subquery(
+            cls.objects.filter(
+                board_id=models.OuterRef(board_field), user=user, board__is_deleted=False,
+            ).values("role")[:1]
+        )
+
     def __str__(self):
         return '{}: {}'.format(self.board, self.user)
+
+
+class DeletionCascade(models.Model):
+    """
+    Задание на каскадное «удаление» содержимого доски или категории.
+    Доска или категория помечается удалённой сразу, а её категории и цели обрабатываются
+    пачками командой `run_cascades`. `stage` и `cursor` (последний обработанный id) сохраняются
+    вместе с каждой пачкой, поэтому прерванный каскад продолжается с места остановки.
+    """
+    class Meta:
+        verbose_name = "Каскад удаления"
+        verbose_name_plural = "Каскады удаления"
+        indexes = [
+            models.Index(fields=["id"], name="cascade_pending_idx", condition=models.Q(finished__isnull=True)),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(board__isnull=True) ^ models.Q(category__isnull=True), name="cascade_board_xor_category",
+            ),
+        ]
+
+    class Stage(models.IntegerChoices):
+        categories = 1, "Категории"
+        goals = 2, "Цели"
+
+    board = models.ForeignKey(
+        Board, verbose_name="Доска", on_delete=models.CASCADE, null=True, blank=True, related_name="+",
+    )
+    category = models.ForeignKey(
+        GoalCategory, verbose_name="Категория", on_delete=models.CASCADE, null=True, blank=True, related_name="+",
+    )
+    stage = models.PositiveSmallIntegerField(verbose_name="Этап", choices=Stage.choices)
+    cursor = models.BigIntegerField(verbose_name="Последний обработанный id", default=0)
+    created = models.DateTimeField(verbose_name="Дата создания", auto_now_add=True)
+    finished = models.DateTimeField(verbose_name="Дата завершения", null=True, blank=True)
+
+    def __str__(self):
+        return 'Удаление {}'.format(self.board or self.category)
+
+    @classmethod
+    def pending_category_ids(cls) -> models.QuerySet:
+        """
+        Подзапрос с id категорий, удаление которых ещё идёт. Пока каскад не перевёл их цели в архив,
+        цели скрываются фильтром `.exclude(category_id__in=...)`: незавершённых заданий единицы
+        (частичный индекс cascade_pending_idx), поэтому соединять каждую цель с категорией не нужно.
+        """
+        return cls.objects.filter(finished__isnull=True, category__isnull=False).values("category_id")
+
+
+class ChangeTombstone(models.Model):
+    """
+    Запись об удалении строки для ленты изменений.
+    Заполняется триггерами БД при удалении целей, категорий и комментариев, а также при исключении
+    участника из доски (`kind=participant`, `object_id` — доска, `user_id` — исключённый пользователь).
+    Перенос целей с комментариями в архивные таблицы (goals/retention.py) отмечается `archived=True`:
+    объект не удалён, а доступен через архив.
+    """
+    class Meta:
+        verbose_name = "Удалённый объект"
+        verbose_name_plural = "Удалённые объекты"
+        indexes = [
+            models.Index(fields=["board_id", "change_xid", "id"], name="tombstone_board_change_idx"),
+            # Исключения самого пользователя из досок
+            models.Index(fields=["user_id", "change_xid", "id"], name="tombstone_user_change_idx",
+                         condition=models.Q(kind="participant")),
+            # Очистка записей старше горизонта ленты
+            models.Index(fields=["created"], name="tombstone_created_idx"),
+        ]
+
+    class Kind(models.TextChoices):
+        category = "category", "Категория"
+        goal = "goal", "Цель"
+        comment = "comment", "Комментарий"
+        participant = "participant", "Участник"
+
+    kind = models.CharField(verbose_name="Тип", max_length=16, choices=Kind.choices)
+    object_id = models.BigIntegerField(verbose_name="Id объекта")
+    board_id = models.BigIntegerField(verbose_name="Id доски")
+    user_id = models.BigIntegerField(verbose_name="Id пользователя", null=True, blank=True)
+    change_xid = ChangeXidField()
+    archived = models.BooleanField(verbose_name="Перенесён в архив", default=False)
+    created = models.DateTimeField(verbose_name="Дата удаления", auto_now_add=True)
+
+    def __str__(self):
+        return '{} {}'.format(self.kind, self.object_id)
+
+
+class ChangeFeedHorizon(models.Model):
+    """
+    Горизонт ленты изменений — единственная строка с id=1.
+    Записи об удалениях с `change_xid` не больше `pruned_xid` уже удалены очисткой (goals/changes.py):
+    курсор, не дошедший до горизонта, мог пропустить удаления, и реплику нужно загрузить заново.
+    """
+    class Meta:
+        verbose_name = "Горизонт ленты изменений"
+        verbose_name_plural = "Горизонт ленты изменений"
+
+    pruned_xid = models.BigIntegerField(verbose_name="Очищено до транзакции", default=0)
+    updated = models.DateTimeField(verbose_name="Дата очистки", auto_now=True)
+
+
+class ArchivedGoal(models.Model):
+    """
+    Архивная цель в холодном хранилище.
+    Командой `run_retention` сюда переносятся давно архивированные цели с тем же id. Доска и категория
+    хранятся как id (и название категории), поэтому очистка удалённых досок и категорий от архива не зависит.
+    """
+    class Meta:
+        verbose_name = "Цель в архиве"
+        verbose_name_plural = "Цели в архиве"
+        indexes = [
+            models.Index(fields=["board_id", "-id"], name="archived_goal_board_idx"),
+        ]
+
+    id = models.BigIntegerField(primary_key=True)
+    board_id = models.BigIntegerField(verbose_name="Id доски")
+    category_id = models.BigIntegerField(verbose_name="Id категории")
+    category_title = models.CharField(verbose_name="Название категории", max_length=255)
+    user = models.ForeignKey(User, verbose_name="Автор", on_delete=models.PROTECT, related_name="+")
+    title = models.CharField(verbose_name="Заголовок цели", max_length=255)
+    description = models.TextField(verbose_name="Описание", null=True, blank=True)
+    status = models.PositiveSmallIntegerField(verbose_name="Статус", choices=Goal.Status.choices)
+    priority = models.PositiveSmallIntegerField(verbose_name="Приоритет", choices=Goal.Priority.choices)
+    due_date = models.DateField(verbose_name="Дата выполнения", null=True, blank=True)
+    created = models.DateTimeField(verbose_name="Дата создания")
+    updated = models.DateTimeField(verbose_name="Дата последнего обновления")
+    archived = models.DateTimeField(verbose_name="Дата переноса в архив")
+
+    def __str__(self):
+        return '{}'.format(self.title)
+
+
+class ArchivedComment(models.Model):
+    """
+    Комментарий архивной цели, переносится в холодное хранилище вместе с ней.
+    """
+    class Meta:
+        verbose_name = "Комментарий в архиве"
+        verbose_name_plural = "Комментарии в архиве"
+
+    id = models.BigIntegerField(primary_key=True)
+    goal = models.ForeignKey(ArchivedGoal, verbose_name="Цель", on_delete=models.CASCADE, related_name="comments")
+    user = models.ForeignKey(User, verbose_name="Пользователь", on_delete=models.PROTECT, related_name="+")
+    text = models.TextField(verbose_name="Текст")
+    created = models.DateTimeField(verbose_name="Дата создания")
+    updated = models.DateTimeField(verbose_name="Дата последнего обновления")
+
+    def __str__(self):
+        return 'Comment #{}'.format(self.id)
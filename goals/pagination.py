@@ -0,0 +1,295 @@
+import base64
+import binascii
+import hashlib
+import json
+from typing import Any, Optional
+
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Model, Q, QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Курсорная (keyset) пагинация.
+    Вместо OFFSET запоминает значения полей сортировки крайней записи страницы и продолжает
+    выборку условием «строго после» неё, поэтому страница N стоит столько же, сколько первая,
+    а COUNT(*) не выполняется вовсе.
+
+    Сортировка из `OrderingFilter` дополняется остальными полями `ordering_fields` и `id`
+    (в направлении последнего поля), чтобы порядок был полным и совпадал с составными индексами.
+    NULL считается больше любого значения — так же, как сортирует PostgreSQL по умолчанию.
+    """
+
+    page_size: int = 20
+    max_page_size: int = 100
+    page_size_query_param: str = "limit"
+    cursor_query_param: str = "cursor"
+    invalid_cursor_message: str = "Некорректный курсор"
+
+    def paginate_queryset(self, queryset: QuerySet, request, view=None) -> list:
+        self.request = request
+        self.base_url: str = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering: list[str] = self.get_ordering(request, queryset, view)
+
+        position: Optional[list] = None
+        self.reverse: bool = False
+        encoded: Optional[str] = request.query_params.get(self.cursor_query_param)
+        if encoded:
+            position, self.reverse = self.decode_cursor(encoded, queryset.model)
+
+        ordering: list[str] = self.reverse_ordering(self.ordering) if self.reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self.build_after_filter(queryset.model, ordering, position))
+
+        results: list = list(queryset[:self.page_size + 1])
+        has_more: bool = len(results) > self.page_size
+        results = results[:self.page_size]
+        if self.reverse:
+            results.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        self.page: list = results
+        return results
+
+    def get_paginated_response(self, data) -> Response:
+        return Response({
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        })
+
+    def get_page_size(self, request) -> int:
+        """ Размер страницы из параметра `limit`, ограниченный `max_page_size`. """
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(size, self.max_page_size) if size > 0 else self.page_size
+
+    def get_ordering(self, request, queryset: QuerySet, view) -> list[str]:
+        """
+        Возвращает полный порядок сортировки: запрошенные поля, затем оставшиеся
+        `ordering_fields` и `id` в направлении последнего запрошенного поля.
+        """
+        backend: type[OrderingFilter] = next(
+            (backend for backend in getattr(view, "filter_backends", []) if issubclass(backend, OrderingFilter)),
+            OrderingFilter,
+        )
+        ordering: list[str] = list(backend().get_ordering(request, queryset, view) or [])
+        descending: bool = bool(ordering) and ordering[-1].startswith("-")
+        used: set[str] = {key.lstrip("-") for key in ordering}
+        for name in [*(getattr(view, "ordering_fields", None) or []), "id"]:
+            if name not in used and name != "__all__":
+                ordering.append(f"-{name}" if descending else name)
+                used.add(name)
+        return ordering
+
+    @staticmethod
+    def reverse_ordering(ordering: list[str]) -> list[str]:
+        return [key[1:] if key.startswith("-") else f"-{key}" for key in ordering]
+
+    @staticmethod
+    def build_after_filter(model: type[Model], ordering: list[str], position: list) -> Q:
+        """
+        Условие «строго после позиции» для составного ключа сортировки:
+        (k1 > v1) OR (k1 = v1 AND k2 > v2) OR ... с учётом направления и NULL.
+        Первый ключ дополнительно ограничивается диапазоном, чтобы индекс использовался как Index Cond.
+        """
+        condition: Q = Q(pk__in=[])
+        equal: Q = Q()
+        for key, value in zip(ordering, position):
+            name: str = key.lstrip("-")
+            descending: bool = key.startswith("-")
+            nullable: bool = _is_nullable(model, name)
+            if value is None:
+                after = Q(**{f"{name}__isnull": False}) if descending else Q(pk__in=[])
+                same = Q(**{f"{name}__isnull": True})
+            else:
+                after = Q(**{f"{name}__lt" if descending else f"{name}__gt": value})
+                if nullable and not descending:
+                    after |= Q(**{f"{name}__isnull": True})
+                same = Q(**{name: value})
+            condition |= equal & after
+            equal &= same
+
+        name, value = ordering[0].lstrip("-"), position[0]
+        if value is not None:
+            bound = Q(**{f"{name}__lte" if ordering[0].startswith("-") else f"{name}__gte": value})
+            if _is_nullable(model, name) and not ordering[0].startswith("-"):
+                bound |= Q(**{f"{name}__isnull": True})
+            condition &= bound
+        return condition
+
+    def encode_cursor(self, instance: Any, reverse: bool) -> str:
+        return encode_position(self.ordering, [getattr(instance, key.lstrip("-")) for key in self.ordering], reverse)
+
+    def decode_cursor(self, encoded: str, model: type[Model]) -> tuple[list, bool]:
+        try:
+            payload: dict = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")))
+            if payload["o"] != self.ordering or len(payload["p"]) != len(self.ordering):
+                raise ValueError
+            position: list = [
+                None if value is None else _to_python(model, key.lstrip("-"), value)
+                for key, value in zip(self.ordering, payload["p"])
+            ]
+            return position, bool(payload.get("r"))
+        except (binascii.Error, UnicodeEncodeError, ValueError, KeyError, TypeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self) -> Optional[str]:
+        if not self.has_next or not self.page:
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param, self.encode_cursor(self.page[-1], False))
+
+    def get_previous_link(self) -> Optional[str]:
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return replace_query_param(self.base_url, self.cursor_query_param, self.encode_cursor(self.page[0], True))
+
+
+class EstimatedCountPagination(LimitOffsetPagination):
+    """
+    `LimitOffsetPagination`, которая не считает точный COUNT(*) на каждой странице больших выборок.
+    Сначала выполняется COUNT, ограниченный подзапросом с LIMIT `exact_count_threshold` + 1: небольшие
+    выборки получают точное число одним запросом. Выше порога точный COUNT(*) выполняется один раз и
+    кэшируется на `count_cache_timeout` секунд для пользователя и набора фильтров; пока значение в кэше,
+    страницы не выполняют ни одного COUNT. Списки почти всегда ограничены досками пользователя
+    (подзапрос к участникам), а для таких выборок оценка планировщика неточна, поэтому кэш включён по умолчанию.
+    С `count_cache_timeout` = 0 выше порога используется оценка планировщика (EXPLAIN без выполнения запроса),
+    если выборка — простое сканирование одной таблицы, иначе — обычный COUNT(*).
+    Поле `count_estimated` в ответе говорит, приблизительно ли значение `count`.
+    """
+
+    exact_count_threshold: int = 1000
+    count_cache_timeout: int = 30
+    count_cache_key: str = "goals:count:{user_id}:{digest}"
+
+    def paginate_queryset(self, queryset: QuerySet, request, view=None) -> Optional[list]:
+        # LimitOffsetPagination запоминает request только после get_count, а ключ кэша нужен раньше
+        self.request = request
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_count(self, queryset: QuerySet) -> int:
+        self.count_estimated: bool = False
+        key: Optional[str] = self.get_count_cache_key() if self.count_cache_timeout else None
+        if key is not None:
+            cached: Optional[int] = cache.get(key)
+            if cached is not None:
+                self.count_estimated = True
+                return cached
+        bounded: int = queryset.order_by().values("pk")[:self.exact_count_threshold + 1].count()
+        if bounded <= self.exact_count_threshold:
+            return bounded
+        if key is not None:
+            count: int = super().get_count(queryset)
+            cache.set(key, count, self.count_cache_timeout)
+            self.count_estimated = True
+            return count
+        estimate: Optional[int] = estimate_count(queryset)
+        if estimate is None:
+            return super().get_count(queryset)
+        self.count_estimated = True
+        return max(estimate, bounded)
+
+    def get_count_cache_key(self) -> str:
+        """ Ключ кэша: пользователь, путь и все параметры запроса, кроме limit/offset. """
+        params: list = sorted(
+            (key, value) for key, value in self.request.query_params.lists()
+            if key not in (self.limit_query_param, self.offset_query_param)
+        )
+        digest: str = hashlib.md5(json.dumps([self.request.path, params]).encode()).hexdigest()
+        return self.count_cache_key.format(user_id=self.request.user.id, digest=digest)
+
+    def get_paginated_response(self, data) -> Response:
+        response: Response = super().get_paginated_response(data)
+        response.data["count_estimated"] = self.count_estimated
+        return response
+
+    def get_paginated_response_schema(self, schema: dict) -> dict:
+        result: dict = super().get_paginated_response_schema(schema)
+        result["properties"]["count_estimated"] = {"type": "boolean", "example": False}
+        return result
+
+
+class GoalPagination(EstimatedCountPagination):
+    """
+    Пагинация списка целей.
+    По умолчанию работает как `EstimatedCountPagination`, а с параметром `?pagination=cursor`
+    (или при наличии `cursor`) переключается на курсорную `KeysetPagination`.
+    """
+
+    mode_query_param: str = "pagination"
+    keyset_class: type[KeysetPagination] = KeysetPagination
+
+    def paginate_queryset(self, queryset: QuerySet, request, view=None) -> Optional[list]:
+        self.keyset: Optional[KeysetPagination] = None
+        if request.query_params.get(self.mode_query_param) == "cursor" or (
+                self.keyset_class.cursor_query_param in request.query_params):
+            self.keyset = self.keyset_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data) -> Response:
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+def encode_position(ordering: list[str], position: list, reverse: bool = False) -> str:
+    """ Упаковывает позицию в непрозрачный курсор. """
+    values: list = [value if value is None or isinstance(value, (int, float, str)) else str(value)
+                    for value in position]
+    payload: bytes = json.dumps({"o": ordering, "p": values, "r": int(reverse)}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode("ascii")
+
+
+# Узлы плана простого сканирования одной таблицы: на них оценка числа строк надёжна
+SCAN_NODES: frozenset = frozenset({
+    "Seq Scan", "Index Scan", "Index Only Scan", "Bitmap Heap Scan", "Bitmap Index Scan", "BitmapAnd", "BitmapOr",
+})
+
+
+def estimate_count(queryset: QuerySet) -> Optional[int]:
+    """
+    Число строк выборки по оценке планировщика PostgreSQL.
+    None, если план — не простое сканирование одной таблицы: оценки соединений и подзапросов неточны.
+    """
+    plan: Any = queryset.order_by().explain(format="json")
+    plan = json.loads(plan) if isinstance(plan, str) else plan
+    nodes: list[dict] = [plan[0]["Plan"]]
+    relations: set = set()
+    for node in nodes:
+        if node["Node Type"] not in SCAN_NODES:
+            return None
+        if "Relation Name" in node:
+            relations.add(node["Relation Name"])
+        nodes += node.get("Plans", [])
+    if len(relations) != 1:
+        return None
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def _is_nullable(model: type[Model], name: str) -> bool:
+    try:
+        return model._meta.get_field(name).null
+    except FieldDoesNotExist:
+        return False
+
+
+def _to_python(model: type[Model], name: str, value: Any) -> Any:
+    try:
+        return model._meta.get_field(name).to_python(value)
+    except FieldDoesNotExist:
+        return value
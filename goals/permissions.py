@@ -1,8 +1,22 @@
+from typing import Optional
+
 from rest_framework import permissions
 
+from goals.membership import get_board_role
 from goals.models import BoardParticipant
 
 
+def get_object_board_role(request, obj, board_id: int) -> Optional[int]:
+    """
+    Роль пользователя на доске объекта.
+    Берётся из аннотации `user_role`, которую проставляют querysets детальных представлений,
+    а при её отсутствии — из кэша ролей участников.
+    """
+    if hasattr(obj, "user_role"):
+        return obj.user_role
+    return get_board_role(request.user, board_id)
+
+
 class GoalCategoryPermissions(permissions.BasePermission):
     """
     В коде выше мы:
@@ -18,12 +32,10 @@ class GoalCategoryPermissions(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         if not request.user.is_authenticated:
             return False
+        role = get_object_board_role(request, obj, obj.board_id)
         if request.method in permissions.SAFE_METHODS:
-            return BoardParticipant.objects.filter(user=request.user, board=obj.board).exists()
-        return BoardParticipant.objects.filter(
-            user=request.user, board=obj.board,
-            role__in=[BoardParticipant.Role.owner, BoardParticipant.Role.writer],
-        ).exists()
+            return role is not None
+        return role in [BoardParticipant.Role.owner, BoardParticipant.Role.writer]
 
 
 class BoardPermissions(permissions.BasePermission):
@@ -41,10 +53,10 @@ class BoardPermissions(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         if not request.user.is_authenticated:
             return False
+        role = get_object_board_role(request, obj, obj.id)
         if request.method in permissions.SAFE_METHODS:
-            return BoardParticipant.objects.filter(user=request.user, board=obj).exists()
-        return BoardParticipant.objects.filter(
-            user=request.user, board=obj, role=BoardParticipant.Role.owner).exists()
+            return role is not None
+        return role == BoardParticipant.Role.owner
 
 
 class GoalPermissions(permissions.BasePermission):
@@ -62,12 +74,10 @@ class GoalPermissions(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         if not request.user.is_authenticated:
             return False
+        role = get_object_board_role(request, obj, obj.board_id)
         if request.method in permissions.SAFE_METHODS:
-            return BoardParticipant.objects.filter(user=request.user, board=obj.category.board).exists()
-        return BoardParticipant.objects.filter(
-            user=request.user, board=obj.category.board,
-            role__in=[BoardParticipant.Role.owner, BoardParticipant.Role.writer],
-        ).exists()
+            return role is not None
+        return role in [BoardParticipant.Role.owner, BoardParticipant.Role.writer]
 
 
 class CommentPermissions(permissions.BasePermission):
@@ -87,4 +97,4 @@ class CommentPermissions(permissions.BasePermission):
             return False
         if request.method in permissions.SAFE_METHODS:
             return True
-        return obj.user == request.user
+        return obj.user_id == request.user.id
@@ -0,0 +1,160 @@
+from datetime import datetime, timedelta
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from goals.cascade import BATCH_SIZE
+from goals.changes import prune_tombstones
+from goals.models import (ArchivedComment, ArchivedGoal, Board, BoardParticipant, DeletionCascade, Goal, GoalCategory,
+                          GoalComment)
+
+ARCHIVE_AFTER_DAYS: int = 90
+PURGE_AFTER_DAYS: int = 30
+# Сколько хранятся записи об удалениях: курсор ленты изменений старше этого срока требует полной загрузки
+TOMBSTONE_DAYS: int = 30
+
+GOAL: str = Goal._meta.db_table
+COMMENT: str = GoalComment._meta.db_table
+CATEGORY: str = GoalCategory._meta.db_table
+CASCADE: str = DeletionCascade._meta.db_table
+
+# Пачка архивных целей блокируется отдельным запросом: после FOR UPDATE к ним нельзя добавить комментарий
+# (проверка внешнего ключа ждёт блокировку), а следующий запрос берёт новый снимок и видит все комментарии,
+# закоммиченные до блокировки
+LOCK_ARCHIVE_SQL: str = f"""
+    SELECT id FROM {GOAL} WHERE status = %(archived)s AND updated < %(cutoff)s
+    ORDER BY updated LIMIT %(limit)s FOR UPDATE SKIP LOCKED
+"""
+
+# Записи об удалениях, которые триггеры создают между этими командами, отмечаются как перенос в архив.
+# Флаг снимается явно: внутри внешней транзакции SET LOCAL действовал бы до её конца
+MARK_ARCHIVING_SQL: str = "SET LOCAL goals.archiving = 'on'"
+UNMARK_ARCHIVING_SQL: str = "SET LOCAL goals.archiving = 'off'"
+
+# Заблокированные цели удаляются из живых таблиц вместе с комментариями и вставляются в архив одним
+# запросом: DELETE ... RETURNING отдаёт удалённые строки прямо в INSERT
+ARCHIVE_SQL: str = f"""
+    WITH moved AS (
+        DELETE FROM {GOAL} WHERE id = ANY(%(ids)s)
+        RETURNING *
+    ), comments AS (
+        DELETE FROM {COMMENT} WHERE goal_id IN (SELECT id FROM moved)
+        RETURNING *
+    ), goals AS (
+        INSERT INTO {ArchivedGoal._meta.db_table} (id, board_id, category_id, category_title, user_id, title,
+                                                  description, status, priority, due_date, created, updated, archived)
+        SELECT m.id, m.board_id, m.category_id, c.title, m.user_id, m.title, m.description, m.status, m.priority,
+               m.due_date, m.created, m.updated, now()
+        FROM moved m JOIN {CATEGORY} c ON c.id = m.category_id
+        RETURNING id
+    ), archived_comments AS (
+        INSERT INTO {ArchivedComment._meta.db_table} (id, goal_id, user_id, text, created, updated)
+        SELECT id, goal_id, user_id, text, created, updated FROM comments
+    )
+    SELECT count(*) FROM goals
+"""
+
+# Удалённые категории без целей: их архивные цели к этому времени уже перенесены в архив
+PURGE_CATEGORIES_SQL: str = f"""
+    WITH purged AS (
+        SELECT c.id FROM {CATEGORY} c
+        WHERE c.is_deleted AND c.updated < %(cutoff)s
+          AND NOT EXISTS (SELECT 1 FROM {GOAL} g WHERE g.category_id = c.id)
+          AND NOT EXISTS (SELECT 1 FROM {CASCADE} d WHERE d.category_id = c.id AND d.finished IS NULL)
+        ORDER BY c.updated LIMIT %(limit)s FOR UPDATE SKIP LOCKED
+    ), cascades AS (
+        DELETE FROM {CASCADE} WHERE category_id IN (SELECT id FROM purged)
+    )
+    DELETE FROM {CATEGORY} WHERE id IN (SELECT id FROM purged)
+"""
+
+PURGE_BOARD_GOALS_SQL: str = f"""
+    WITH goals AS (
+        DELETE FROM {GOAL} WHERE id IN (SELECT id FROM {GOAL} WHERE board_id = %(board)s LIMIT %(limit)s)
+        RETURNING id
+    ), comments AS (
+        DELETE FROM {COMMENT} WHERE goal_id IN (SELECT id FROM goals)
+    )
+    SELECT count(*) FROM goals
+"""
+
+
+def archive_goals(cutoff: datetime, batch_size: int = BATCH_SIZE) -> int:
+    """
+    Переносит цели со статусом «Архив», не менявшиеся с `cutoff`, вместе с комментариями в архивные таблицы.
+    Каждая пачка — отдельная транзакция; строки, заблокированные другими транзакциями, пропускаются.
+    Лента изменений получает перенос как удаление с `archived: true`.
+    Возвращает число перенесённых целей.
+    """
+    params: dict = {"archived": Goal.Status.archived.value, "cutoff": cutoff, "limit": batch_size}
+    total: int = 0
+    while True:
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(LOCK_ARCHIVE_SQL, params)
+            ids: list[int] = [row[0] for row in cursor.fetchall()]
+            if ids:
+                cursor.execute(MARK_ARCHIVING_SQL)
+                cursor.execute(ARCHIVE_SQL, {"ids": ids})
+                cursor.execute(UNMARK_ARCHIVING_SQL)
+        total += len(ids)
+        if len(ids) < batch_size:
+            return total
+
+
+def purge_categories(cutoff: datetime, batch_size: int = BATCH_SIZE) -> int:
+    """ Окончательно удаляет категории, помеченные удалёнными до `cutoff` и оставшиеся без целей. """
+    params: dict = {"cutoff": cutoff, "limit": batch_size}
+    total: int = 0
+    while True:
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(PURGE_CATEGORIES_SQL, params)
+            purged: int = cursor.rowcount
+        total += purged
+        if purged < batch_size:
+            return total
+
+
+def purge_board(board_id: int, batch_size: int = BATCH_SIZE) -> None:
+    """
+    Окончательно удаляет доску со всем содержимым, включая её архив.
+    Цели с комментариями удаляются пачками в отдельных транзакциях, остальное — одной транзакцией в конце.
+    """
+    params: dict = {"board": board_id, "limit": batch_size}
+    while True:
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(PURGE_BOARD_GOALS_SQL, params)
+            if cursor.fetchone()[0] < batch_size:
+                break
+    with transaction.atomic():
+        ArchivedComment.objects.filter(goal__board_id=board_id).delete()
+        ArchivedGoal.objects.filter(board_id=board_id).delete()
+        GoalCategory.objects.filter(board_id=board_id).delete()
+        BoardParticipant.objects.filter(board_id=board_id).delete()
+        Board.objects.filter(id=board_id).delete()
+
+
+def purge_boards(cutoff: datetime, batch_size: int = BATCH_SIZE) -> int:
+    """ Окончательно удаляет доски, помеченные удалёнными до `cutoff`, каскад которых уже завершён. """
+    board_ids: list[int] = list(
+        Board.objects.filter(is_deleted=True, updated__lt=cutoff).exclude(
+            id__in=DeletionCascade.objects.filter(board__isnull=False, finished__isnull=True).values("board_id"),
+        ).values_list("id", flat=True)
+    )
+    for board_id in board_ids:
+        purge_board(board_id, batch_size)
+    return len(board_ids)
+
+
+def run_retention(archive_days: int = ARCHIVE_AFTER_DAYS, purge_days: int = PURGE_AFTER_DAYS,
+                  batch_size: int = BATCH_SIZE, tombstone_days: int = TOMBSTONE_DAYS) -> dict[str, int]:
+    """
+    Перенос архивных целей, очистка удалённых досок и категорий и старых записей ленты об удалениях;
+    возвращает счётчики по шагам.
+    """
+    now: datetime = timezone.now()
+    return {
+        "archived_goals": archive_goals(now - timedelta(days=archive_days), batch_size),
+        "purged_boards": purge_boards(now - timedelta(days=purge_days), batch_size),
+        "purged_categories": purge_categories(now - timedelta(days=purge_days), batch_size),
+        "pruned_tombstones": prune_tombstones(now - timedelta(days=tombstone_days), batch_size),
+    }
@@ -1,9 +1,17 @@
+import csv
+import io
+from typing import Iterable
+
 from django.db import transaction
+from django.db.models import Prefetch, prefetch_related_objects
+from django.utils import timezone
 from rest_framework import serializers
 
 from core.models import User
 from core.serializers import UserSerializer
-from goals.models import GoalCategory, Goal, GoalComment, Board, BoardParticipant
+from goals.filters import GoalSearchFilter
+from goals.membership import can_write, invalidate_board_roles
+from goals.models import GoalCategory, Goal, GoalComment, Board, BoardParticipant, ArchivedGoal, ArchivedComment
 from django.core.exceptions import PermissionDenied
 
 
@@ -20,7 +28,7 @@ class GoalCategoryCreateSerializer(serializers.ModelSerializer):
 
     class Meta:
         model: GoalCategory = GoalCategory
-        fields: list = '__all__'
+        exclude: tuple = ("change_xid",)
         read_only_fields: list = ["id", "created", "updated", "user"]
 
     def validate_board(self, value):
@@ -29,12 +37,7 @@ class GoalCategoryCreateSerializer(serializers.ModelSerializer):
         """
         if value.is_deleted:
             raise serializers.ValidationError("Не разрешено в удаленном объекте")
-        allow = BoardParticipant.objects.filter(
-            board=value,
-            role__in=[BoardParticipant.Role.owner, BoardParticipant.Role.writer],
-            user=self.context["request"].user,
-        ).exists()
-        if not allow:
+        if not can_write(self.context["request"].user, value.id):
             raise serializers.ValidationError("Вы должны быть владельцем или редактором")
         return value
 
@@ -48,7 +51,7 @@ class GoalCategorySerializer(serializers.ModelSerializer):
 
     class Meta:
         model: GoalCategory = GoalCategory
-        fields: list = '__all__'
+        exclude: tuple = ("change_xid",)
         read_only_fields: tuple = ("id", "created", "updated", "user", "board")
 
 
@@ -66,7 +69,7 @@ class GoalCreateSerializer(serializers.ModelSerializer):
 
     class Meta:
         model: Goal = Goal
-        fields: list = '__all__'
+        exclude: tuple = ("search_vector", "comments_vector", "change_xid")
         read_only_fields: list = ["id", "created", "updated", "user"]
 
     def validate_category(self, value):
@@ -76,35 +79,104 @@ class GoalCreateSerializer(serializers.ModelSerializer):
         if value.is_deleted:
             raise serializers.ValidationError("Не разрешено в удаленной категории")
 
-        if not BoardParticipant.objects.filter(
-                board_id=value.board_id,
-                role__in=[BoardParticipant.Role.owner, BoardParticipant.Role.writer],
-                user=self.context["request"].user,
-        ).exists():
+        if not can_write(self.context["request"].user, value.board_id):
             raise serializers.ValidationError("Вы не создавали эту категорию")
         return value
 
 
+class GoalBulkCreateItemSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор одной цели в массовом создании.
+    Категория принимается как id и проверяется представлением сразу для всех целей, без запроса на каждую.
+    """
+
+    category: serializers.IntegerField = serializers.IntegerField()
+
+    class Meta:
+        model: Goal = Goal
+        fields: tuple = ("category", "title", "description", "status", "priority", "due_date")
+
+
+class GoalImportRowSerializer(GoalBulkCreateItemSerializer):
+    """
+    Сериализатор строки импорта целей.
+    Правила полей те же, что при создании цели, но категория задаётся названием на доске импорта.
+    """
+
+    category: serializers.CharField = serializers.CharField(max_length=255)
+
+
+class GoalBulkPatchSerializer(serializers.ModelSerializer):
+    """
+    Изменения, применяемые к выбранным целям массового обновления.
+    """
+
+    class Meta:
+        model: Goal = Goal
+        fields: tuple = ("status", "priority", "due_date", "category")
+        extra_kwargs: dict = {field: {"required": False} for field in fields}
+
+    def validate_category(self, value):
+        """
+        Проверяет, что новая категория не удалена.
+        """
+        if value.is_deleted:
+            raise serializers.ValidationError("Не разрешено в удаленной категории")
+        return value
+
+    def validate(self, attrs: dict) -> dict:
+        if not attrs:
+            raise serializers.ValidationError("Не указано ни одного изменения")
+        return attrs
+
+
+class GoalBulkUpdateSerializer(serializers.Serializer):
+    """
+    Массовое обновление целей: явный список `ids` (необязательно) и изменения `patch`.
+    """
+
+    ids: serializers.ListField = serializers.ListField(
+        child=serializers.IntegerField(), required=False, allow_empty=False, max_length=10000)
+    patch: GoalBulkPatchSerializer = GoalBulkPatchSerializer()
+
+
 class GoalSerializer(serializers.ModelSerializer):
     """
     Сериализатор для вывода объектов модели Goal.
     """
 
     user: UserSerializer = UserSerializer(read_only=True)
+    search_headline: serializers.SerializerMethodField = serializers.SerializerMethodField()
 
     class Meta:
         model: Goal = Goal
-        fields: list = '__all__'
+        exclude: tuple = ("search_vector", "comments_vector", "change_xid")
         read_only_fields: tuple = ("id", "created", "updated", "user")
 
+    def get_search_headline(self, obj):
+        """
+        Фрагмент с подсвеченными совпадениями, если список запрошен с `?search=`.
+        Пользовательский текст экранирован, разметкой в нём являются только теги <b>.
+        """
+        headline: str | None = getattr(obj, "search_headline", None)
+        return GoalSearchFilter.highlight(headline) if headline is not None else None
+
+    def to_representation(self, instance) -> dict:
+        """ `search_headline` есть только в результатах поиска """
+        data: dict = super().to_representation(instance)
+        if not hasattr(instance, "search_headline"):
+            data.pop("search_headline", None)
+        return data
+
     def validate_category(self, value):
         """
         Проверяет, что категория, связанная с целью, не удалена и пользователь является владельцем категории.
+        Цель переносится только между категориями своей доски, поэтому её `board` остаётся согласованным.
         """
         if value.is_deleted:
             raise serializers.ValidationError("Не разрешено в удаленной категории")
 
-        if self.instance.category.board_id != value.board_id:
+        if self.instance.board_id != value.board_id:
             raise serializers.ValidationError("Вы не создавали эту категорию")
         return value
 
@@ -122,18 +194,14 @@ class CommentCreateSerializer(serializers.ModelSerializer):
 
     class Meta:
         model: GoalComment = GoalComment
-        fields: list = '__all__'
+        exclude: tuple = ("change_xid",)
         read_only_fields: tuple = ("id", "created", "updated", "user")
 
     def validate_goal(self, value):
         """
         Проверяет, что пользователь является автором комментария.
         """
-        if not BoardParticipant.objects.filter(
-                board_id=value.category.board_id,
-                role__in=[BoardParticipant.Role.owner, BoardParticipant.Role.writer],
-                user=self.context["request"].user,
-        ).exists():
+        if not can_write(self.context["request"].user, value.board_id):
             raise serializers.ValidationError("Вы не являетесь автором этого комментария")
         return value
 
@@ -147,7 +215,7 @@ class CommentSerializer(serializers.ModelSerializer):
 
     class Meta:
         model: GoalComment = GoalComment
-        fields: list = '__all__'
+        exclude: tuple = ("change_xid",)
         read_only_fields: tuple = ("id", "created", "updated", "user", "goal")
 
 
@@ -164,7 +232,7 @@ class BoardCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model: Board = Board
         read_only_fields: tuple = ("id", "created", "updated")
-        fields: str = "__all__"
+        exclude: tuple = ("change_xid", "version")
 
     def create(self, validated_data):
         """
@@ -178,6 +246,61 @@ class BoardCreateSerializer(serializers.ModelSerializer):
         return board
 
 
+class BoardCloneSerializer(serializers.Serializer):
+    """
+    Параметры копирования доски: название копии и что копировать кроме категорий.
+    """
+
+    title: serializers.CharField = serializers.CharField(max_length=255, required=False)
+    goals: serializers.BooleanField = serializers.BooleanField(default=False)
+    participants: serializers.BooleanField = serializers.BooleanField(default=False)
+
+
+class UsernameField(serializers.SlugRelatedField):
+    """
+    Пользователь по имени. При записи возвращает само имя без запроса к БД:
+    имена всех участников разрешаются одним запросом в `resolve_usernames`.
+    """
+
+    def to_internal_value(self, data) -> str:
+        if not isinstance(data, str) or not data.strip():
+            self.fail("invalid")
+        return data.strip()
+
+
+class UsernameListField(serializers.ListField):
+    """
+    Список имён пользователей: JSON-массив, строка CSV или загруженный CSV-файл.
+    Пустые значения и повторы отбрасываются, порядок сохраняется.
+    """
+
+    child = serializers.CharField()
+
+    def to_internal_value(self, data) -> list[str]:
+        if isinstance(data, str) or hasattr(data, "read"):
+            data = [data]
+        if not isinstance(data, list):
+            self.fail("not_a_list", input_type=type(data).__name__)
+        values: list = []
+        for item in data:
+            if hasattr(item, "read"):
+                try:
+                    item = item.read().decode("utf-8-sig")
+                except UnicodeDecodeError:
+                    raise serializers.ValidationError("Файл должен быть в кодировке UTF-8")
+            if isinstance(item, str):
+                values += [value.strip() for row in csv.reader(io.StringIO(item)) for value in row]
+            else:
+                values.append(item)
+        usernames: list[str] = super().to_internal_value([value for value in values if value != ""])
+        return list(dict.fromkeys(usernames))
+
+
+def resolve_usernames(usernames: Iterable[str]) -> dict[str, User]:
+    """ Пользователи по именам одним запросом `username IN (...)`. """
+    return {user.username: user for user in User.objects.filter(username__in=set(usernames))}
+
+
 class BoardParticipantSerializer(serializers.ModelSerializer):
     """
     Сериализатор для объектов модели BoardParticipant.
@@ -186,7 +309,7 @@ class BoardParticipantSerializer(serializers.ModelSerializer):
     role: serializers.ChoiceField = serializers.ChoiceField(
         required=True, choices=BoardParticipant.Role.choices
     )
-    user: serializers.SlugRelatedField = serializers.SlugRelatedField(
+    user: UsernameField = UsernameField(
         slug_field="username", queryset=User.objects.all()
     )
 
@@ -206,38 +329,100 @@ class BoardSerializer(serializers.ModelSerializer):
 
     class Meta:
         model: Board = Board
-        fields: str = "__all__"
+        exclude: tuple = ("change_xid", "version")
         read_only_fields: tuple = ("id", "created", "updated")
 
+    def validate_participants(self, value: list[dict]) -> list[dict]:
+        """
+        Заменяет имена участников на пользователей, загружая всех одним запросом.
+        """
+        users: dict[str, User] = resolve_usernames(part["user"] for part in value)
+        missing: list[str] = [part["user"] for part in value if part["user"] not in users]
+        if missing:
+            raise serializers.ValidationError(f"Пользователи не найдены: {', '.join(missing)}")
+        return [{**part, "user": users[part["user"]]} for part in value]
+
+    def to_representation(self, instance: Board) -> dict:
+        """
+        Подгружает участников вместе с пользователями одним запросом, если их ещё нет в кэше
+        (например, после `update`, когда DRF сбрасывает prefetch-кэш доски).
+        """
+        prefetch_related_objects(
+            [instance], Prefetch("participants", queryset=BoardParticipant.objects.select_related("user"))
+        )
+        return super().to_representation(instance)
+
     def update(self, instance, validated_data):
         """
         Обновляет доску и роли участников доски.
+        Разница между старым и новым составом применяется тремя запросами:
+        удаление выбывших, `bulk_update` изменённых ролей и `bulk_create` новых участников.
         """
         owner = validated_data.pop("user")
-        new_participants = validated_data.pop("participants")
-        new_by_id = {part["user"].id: part for part in new_participants}
+        new_roles: dict[int, int] = {part["user"].id: part["role"] for part in validated_data.pop("participants")}
+        new_roles.pop(owner.id, None)
 
-        old_participants = instance.participants.exclude(user=owner)
         with transaction.atomic():
-            for old_participant in old_participants:
-                if old_participant.user_id not in new_by_id:
-                    old_participant.delete()
-                else:
-                    if old_participant.role != new_by_id[old_participant.user_id]["role"]:
-                        old_participant.role = new_by_id[old_participant.user_id]["role"]
-                        old_participant.save()
-                    new_by_id.pop(old_participant.user_id)
-            for new_part in new_by_id.values():
-                BoardParticipant.objects.create(
-                    board=instance, user=new_part["user"], role=new_part["role"]
-                )
+            old_participants: dict[int, BoardParticipant] = {
+                participant.user_id: participant for participant in instance.participants.exclude(user=owner)
+            }
+            removed: set[int] = old_participants.keys() - new_roles.keys()
+            changed: list[BoardParticipant] = []
+            now = timezone.now()
+            for user_id, participant in old_participants.items():
+                if user_id in new_roles and participant.role != new_roles[user_id]:
+                    participant.role, participant.updated = new_roles[user_id], now
+                    changed.append(participant)
+            added: list[BoardParticipant] = [
+                BoardParticipant(board=instance, user_id=user_id, role=role)
+                for user_id, role in new_roles.items() if user_id not in old_participants
+            ]
+
+            if removed:
+                BoardParticipant.objects.filter(board=instance, user_id__in=removed).delete()
+            BoardParticipant.objects.bulk_update(changed, ["role", "updated"])
+            BoardParticipant.objects.bulk_create(added)
+            invalidate_board_roles([*removed, *(participant.user_id for participant in changed + added)])
 
             instance.title = validated_data["title"]
             instance.save()
+            # Счётчик участников изменили триггеры БД
+            instance.refresh_from_db(fields=Board.COUNTER_FIELDS)
 
         return instance
 
 
+class BoardInviteSerializer(serializers.Serializer):
+    """
+    Массовое приглашение на доску списком или CSV имён пользователей с одной ролью.
+    Уже участвующие и несуществующие пользователи пропускаются и перечисляются в ответе.
+    """
+
+    usernames: UsernameListField = UsernameListField(allow_empty=False, max_length=10000)
+    role: serializers.ChoiceField = serializers.ChoiceField(
+        choices=BoardParticipant.Role.choices[1:], default=BoardParticipant.Role.reader
+    )
+
+    def save(self, board: Board) -> dict:
+        usernames: list[str] = self.validated_data["usernames"]
+        users: dict[str, User] = resolve_usernames(usernames)
+        existing: set[int] = set(
+            BoardParticipant.objects.filter(board=board, user__in=users.values()).values_list("user_id", flat=True)
+        )
+        invited: list[User] = [user for user in users.values() if user.id not in existing]
+
+        BoardParticipant.objects.bulk_create(
+            [BoardParticipant(board=board, user=user, role=self.validated_data["role"]) for user in invited],
+            ignore_conflicts=True,
+        )
+        invalidate_board_roles([user.id for user in invited])
+        return {
+            "invited": [user.username for user in invited],
+            "skipped": [username for username in usernames if username in users and users[username].id in existing],
+            "not_found": [username for username in usernames if username not in users],
+        }
+
+
 class BoardListSerializer(serializers.ModelSerializer):
     """
     Сериализатор для вывода списка досок.
@@ -245,4 +430,38 @@ class BoardListSerializer(serializers.ModelSerializer):
 
     class Meta:
         model: Board = Board
+        exclude: tuple = ("change_xid", "version")
+
+
+# _______________________________________________________________
+# ________________goal_archive_serializers_______________________________
+class ArchivedCommentSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор для вывода комментариев архивной цели.
+    """
+
+    user: UserSerializer = UserSerializer(read_only=True)
+
+    class Meta:
+        model: ArchivedComment = ArchivedComment
+        exclude: tuple = ("goal",)
+
+
+class ArchivedGoalSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор для вывода архивных целей.
+    """
+
+    user: UserSerializer = UserSerializer(read_only=True)
+
+    class Meta:
+        model: ArchivedGoal = ArchivedGoal
         fields: str = "__all__"
+
+
+class ArchivedGoalDetailSerializer(ArchivedGoalSerializer):
+    """
+    Сериализатор для вывода архивной цели вместе с комментариями.
+    """
+
+    comments: ArchivedCommentSerializer = ArchivedCommentSerializer(many=True, read_only=True)
@@ -0,0 +1,25 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from goals.membership import invalidate_board_roles
+from goals.models import Board, BoardParticipant
+
+
+@receiver([post_save, post_delete], sender=BoardParticipant)
+def participant_changed(sender, instance: BoardParticipant, **kwargs) -> None:
+    """ Изменилось участие в доске — сбрасываем роли этого пользователя. """
+    invalidate_board_roles([instance.user_id])
+
+
+@receiver(post_init, sender=Board)
+def board_loaded(sender, instance: Board, **kwargs) -> None:
+    """ Запоминаем флаг удаления, с которым доска загружена (None — поле отложено). """
+    instance._loaded_is_deleted = instance.__dict__.get("is_deleted")
+
+
+@receiver(post_save, sender=Board)
+def board_changed(sender, instance: Board, created: bool, **kwargs) -> None:
+    """ Удалённая доска пропадает из карт ролей всех её участников, восстановленная — возвращается. """
+    if not created and instance._loaded_is_deleted is not instance.is_deleted:
+        invalidate_board_roles(instance.participants.values_list("user_id", flat=True))
+    instance._loaded_is_deleted = instance.is_deleted
@@ -1,7 +1,11 @@
 from django.urls import path
 
-from goals.views.goal__view import GoalCreateView, GoalDetailView, GoalListView
-from goals.views.goal_board import BoardCreateView, BoardListView, BoardView
+from goals.views.goal__view import (GoalCreateView, GoalDetailView, GoalListView, GoalBulkCreateView,
+                                     GoalBulkUpdateView)
+from goals.views.goal_archive_view import ArchivedGoalDetailView, ArchivedGoalListView
+from goals.views.goal_board import (BoardCreateView, BoardListView, BoardView, BoardInviteView, BoardExportView,
+                                     BoardImportView, BoardCloneView, BoardKanbanView)
+from goals.views.goal_changes_view import ChangesView
 from goals.views.goal_category_view import GoalCategoryCreateView, GoalCategoryListView, GoalCategoryView
 from goals.views.goal_comment_view import CommentCreateView, CommentListView, CommentDetailView
 
@@ -12,6 +16,10 @@ urlpatterns = [
 
     path("goal/create", GoalCreateView.as_view(), name='goal_create'),
     path("goal/list", GoalListView.as_view(), name='goal_list'),
+    path("goal/bulk_create", GoalBulkCreateView.as_view(), name='goal_bulk_create'),
+    path("goal/bulk_update", GoalBulkUpdateView.as_view(), name='goal_bulk_update'),
+    path("goal/archive", ArchivedGoalListView.as_view(), name='goal_archive'),
+    path("goal/archive/<int:pk>", ArchivedGoalDetailView.as_view(), name='goal_archive_pk'),
     path("goal/<pk>", GoalDetailView.as_view(), name='goal_pk'),
 
     path('goal_comment/create', CommentCreateView.as_view(), name='comment-create'),
@@ -21,4 +29,11 @@ urlpatterns = [
     path('board/create', BoardCreateView.as_view(), name='board_create'),
     path('board/list', BoardListView.as_view(), name='board_list'),
     path('board/<int:pk>', BoardView.as_view(), name='board_pk'),
+    path('board/<int:pk>/invite', BoardInviteView.as_view(), name='board_invite'),
+    path('board/<int:pk>/clone', BoardCloneView.as_view(), name='board_clone'),
+    path('board/<int:pk>/kanban', BoardKanbanView.as_view(), name='board_kanban'),
+    path('board/<int:pk>/export', BoardExportView.as_view(), name='board_export'),
+    path('board/<int:pk>/import', BoardImportView.as_view(), name='board_import'),
+
+    path('changes', ChangesView.as_view(), name='changes'),
 ]
@@ -1,13 +1,22 @@
-from rest_framework import filters
+from typing import Optional
+
+from django.db import transaction
+from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.generics import CreateAPIView, RetrieveUpdateDestroyAPIView, ListAPIView
-from rest_framework.pagination import LimitOffsetPagination
+from rest_framework import status
+from rest_framework.exceptions import ValidationError, PermissionDenied
+from rest_framework.generics import CreateAPIView, RetrieveUpdateDestroyAPIView, ListAPIView, GenericAPIView
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 
-from goals.filters import GoalDateFilter
-from goals.models import Goal
+from goals.conditional import BoardVersionETagMixin
+from goals.filters import GoalDateFilter, GoalSearchFilter, GoalOrderingFilter
+from goals.membership import can_write
+from goals.models import Goal, GoalCategory, BoardParticipant, DeletionCascade
+from goals.pagination import GoalPagination
 from goals.permissions import GoalPermissions
-from goals.serializers import GoalCreateSerializer, GoalSerializer
+from goals.serializers import (GoalCreateSerializer, GoalSerializer, GoalBulkCreateItemSerializer,
+                               GoalBulkUpdateSerializer)
 
 
 class GoalCreateView(CreateAPIView):
@@ -17,14 +26,22 @@ class GoalCreateView(CreateAPIView):
     permission_classes: list = [IsAuthenticated]
 
 
-class GoalDetailView(RetrieveUpdateDestroyAPIView):
+class GoalDetailView(BoardVersionETagMixin, RetrieveUpdateDestroyAPIView):
     """ Модель представления, которая позволяет редактировать и удалять объекты Goal. """
     model: Goal = Goal
     serializer_class: GoalSerializer = GoalSerializer
     permission_classes: list = [IsAuthenticated, GoalPermissions]
 
     def get_queryset(self):
-        return Goal.objects.filter(category__board__participants__user=self.request.user)
+        """
+        Цель загружается одним запросом вместе с автором, категорией и ролью пользователя на доске,
+        которую затем читает GoalPermissions.
+        """
+        return Goal.objects.annotate(
+            user_role=BoardParticipant.role_subquery(self.request.user),
+        ).filter(user_role__isnull=False).exclude(
+            category_id__in=DeletionCascade.pending_category_ids(),
+        ).select_related("user", "category")
 
     def perform_destroy(self, instance: Goal) -> Goal:
         instance.status = Goal.Status.archived
@@ -32,20 +49,151 @@ class GoalDetailView(RetrieveUpdateDestroyAPIView):
         return instance
 
 
-class GoalListView(ListAPIView):
+class GoalListView(BoardVersionETagMixin, ListAPIView):
     """
     Модель представления, которая позволяет выводить все объекты Goal.
-    Сортировать, фильтровать и искать по полям `title`, `description`
+    Сортировать, фильтровать и искать полнотекстово по `title`, `description` и комментариям.
+    С параметром `?pagination=cursor` отдаёт страницы по курсору вместо `limit`/`offset`.
     """
     model: Goal = Goal
     permission_classes: list = [IsAuthenticated]
     serializer_class: GoalSerializer = GoalSerializer
-    pagination_class: LimitOffsetPagination = LimitOffsetPagination
-    filter_backends: list = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter, ]
+    pagination_class: GoalPagination = GoalPagination
+    filter_backends: list = [DjangoFilterBackend, GoalSearchFilter, GoalOrderingFilter]
     filterset_class: GoalDateFilter = GoalDateFilter
-    search_fields: list = ["title", "description"]
     ordering_fields: list = ["due_date", "priority"]
-    ordering: list = ["priority", "due_date"]
+    ordering: list = ["priority", "due_date", "id"]
 
     def get_queryset(self):
-        return Goal.objects.filter(category__board__participants__user=self.request.user)
+        return Goal.objects.filter(board_id__in=BoardParticipant.board_ids(self.request.user)).exclude(
+            category_id__in=DeletionCascade.pending_category_ids(),
+        ).select_related("user")
+
+
+class GoalBulkCreateView(GenericAPIView):
+    """
+    Массовое создание целей из массива объектов в теле запроса.
+    Права проверяются одним запросом на все категории, цели вставляются через `bulk_create` пачками
+    в одной транзакции. Ошибочные элементы возвращаются в `errors` с индексом, остальные создаются;
+    с `?atomic=true` при любой ошибке не создаётся ничего.
+    """
+    model: Goal = Goal
+    serializer_class: GoalBulkCreateItemSerializer = GoalBulkCreateItemSerializer
+    permission_classes: list = [IsAuthenticated]
+    batch_size: int = 500
+    max_items: int = 10000
+
+    def post(self, request, *args, **kwargs) -> Response:
+        if not isinstance(request.data, list):
+            raise ValidationError({"non_field_errors": ["Ожидается массив целей"]})
+        if len(request.data) > self.max_items:
+            raise ValidationError({"non_field_errors": [f"Не больше {self.max_items} целей за запрос"]})
+
+        errors: dict[int, dict] = {}
+        items: dict[int, dict] = {}
+        for index, data in enumerate(request.data):
+            serializer = self.get_serializer(data=data)
+            if serializer.is_valid():
+                items[index] = serializer.validated_data
+            else:
+                errors[index] = serializer.errors
+
+        category_ids: set[int] = {item["category"] for item in items.values()}
+        categories: dict[int, tuple[int, bool]] = {
+            category_id: (board_id, is_deleted)
+            for category_id, board_id, is_deleted in GoalCategory.objects.filter(
+                id__in=category_ids).values_list("id", "board_id", "is_deleted")
+        }
+        for index, item in list(items.items()):
+            error = self.check_category(categories.get(item["category"]))
+            if error:
+                errors[index] = {"category": [error]}
+                del items[index]
+
+        if errors and self.is_atomic(request):
+            return Response({"created": [], "errors": self.format_errors(errors)}, status=status.HTTP_400_BAD_REQUEST)
+
+        goals: list[Goal] = []
+        for item in items.values():
+            category_id: int = item.pop("category")
+            goals.append(Goal(user=request.user, category_id=category_id, board_id=categories[category_id][0], **item))
+        with transaction.atomic():
+            created: list[Goal] = Goal.objects.bulk_create(goals, batch_size=self.batch_size)
+
+        return Response(
+            {"created": GoalCreateSerializer(created, many=True).data, "errors": self.format_errors(errors)},
+            status=status.HTTP_201_CREATED if created or not errors else status.HTTP_400_BAD_REQUEST,
+        )
+
+    def check_category(self, category: Optional[tuple[int, bool]]) -> Optional[str]:
+        """ Текст ошибки для категории цели или None, если создавать в ней можно """
+        if category is None:
+            return "Категория не найдена"
+        board_id, is_deleted = category
+        if is_deleted:
+            return "Не разрешено в удаленной категории"
+        if not can_write(self.request.user, board_id):
+            return "Вы не создавали эту категорию"
+        return None
+
+    @staticmethod
+    def is_atomic(request) -> bool:
+        return request.query_params.get("atomic", "").lower() in ("1", "true", "yes")
+
+    @staticmethod
+    def format_errors(errors: dict[int, dict]) -> list[dict]:
+        return [{"index": index, "errors": item_errors} for index, item_errors in sorted(errors.items())]
+
+
+class GoalBulkUpdateView(GenericAPIView):
+    """
+    Массовое изменение целей (статус, приоритет, дедлайн, категория), в том числе перенос в архив.
+    Цели выбираются списком `ids` в теле и/или теми же параметрами, что у списка целей
+    (фильтры `GoalDateFilter` и `?search=`). Выбранные цели блокируются, права проверяются один раз
+    на каждую доску, и в той же транзакции изменения применяются одним `UPDATE` ровно к проверенным целям.
+    """
+    model: Goal = Goal
+    serializer_class: GoalBulkUpdateSerializer = GoalBulkUpdateSerializer
+    permission_classes: list = [IsAuthenticated]
+    filter_backends: list = [DjangoFilterBackend, GoalSearchFilter]
+    filterset_class: GoalDateFilter = GoalDateFilter
+
+    def get_queryset(self):
+        return Goal.objects.filter(board_id__in=BoardParticipant.board_ids(self.request.user)).exclude(
+            category_id__in=DeletionCascade.pending_category_ids(),
+        )
+
+    def patch(self, request, *args, **kwargs) -> Response:
+        serializer: GoalBulkUpdateSerializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids: Optional[list[int]] = serializer.validated_data.get("ids")
+        patch: dict = serializer.validated_data["patch"]
+
+        filter_params: set[str] = set(GoalDateFilter.base_filters) | {GoalSearchFilter.search_param}
+        if ids is None and not filter_params & set(request.query_params):
+            raise ValidationError({"ids": ["Укажите ids или хотя бы один фильтр"]})
+
+        goals = self.filter_queryset(self.get_queryset())
+        if ids is not None:
+            goals = goals.filter(id__in=ids)
+
+        with transaction.atomic():
+            # Блокировка в порядке id: параллельные массовые изменения не взаимоблокируются, а проверенный
+            # набор целей и их досок не меняется до UPDATE
+            locked: dict[int, int] = dict(
+                Goal.objects.select_for_update().filter(id__in=goals.values("id")).order_by("id")
+                .values_list("id", "board_id")
+            )
+            board_ids: set[int] = set(locked.values())
+            if not all(can_write(request.user, board_id) for board_id in board_ids):
+                raise PermissionDenied("Вы должны быть владельцем или редактором всех досок выбранных целей")
+
+            category: Optional[GoalCategory] = patch.pop("category", None)
+            if category is not None:
+                if board_ids - {category.board_id}:
+                    raise ValidationError(
+                        {"patch": {"category": ["Цели можно переносить только в категорию своей доски"]}})
+                patch["category_id"] = category.id
+
+            updated: int = Goal.objects.filter(id__in=list(locked)).update(**patch, updated=timezone.now())
+        return Response({"updated": updated})
@@ -0,0 +1,41 @@
+from django.db.models import Prefetch
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework.generics import ListAPIView, RetrieveAPIView
+from rest_framework.permissions import IsAuthenticated
+
+from goals.filters import ArchivedGoalFilter
+from goals.models import ArchivedComment, ArchivedGoal, BoardParticipant
+from goals.pagination import EstimatedCountPagination
+from goals.serializers import ArchivedGoalDetailSerializer, ArchivedGoalSerializer
+
+
+class ArchivedGoalListView(ListAPIView):
+    """
+    Модель представления, которая позволяет выводить архивные цели из холодного хранилища.
+    Доступны цели досок, в которых участвует пользователь, от новых к старым; фильтры `board` и `category`.
+    """
+    model: ArchivedGoal = ArchivedGoal
+    permission_classes: list = [IsAuthenticated]
+    serializer_class: ArchivedGoalSerializer = ArchivedGoalSerializer
+    pagination_class: EstimatedCountPagination = EstimatedCountPagination
+    filter_backends: list = [DjangoFilterBackend]
+    filterset_class: ArchivedGoalFilter = ArchivedGoalFilter
+
+    def get_queryset(self):
+        return ArchivedGoal.objects.filter(
+            board_id__in=BoardParticipant.board_ids(self.request.user),
+        ).select_related("user").order_by("-id")
+
+
+class ArchivedGoalDetailView(RetrieveAPIView):
+    """ Модель представления, которая позволяет просматривать архивную цель вместе с комментариями. """
+    model: ArchivedGoal = ArchivedGoal
+    permission_classes: list = [IsAuthenticated]
+    serializer_class: ArchivedGoalDetailSerializer = ArchivedGoalDetailSerializer
+
+    def get_queryset(self):
+        return ArchivedGoal.objects.filter(
+            board_id__in=BoardParticipant.board_ids(self.request.user),
+        ).select_related("user").prefetch_related(
+            Prefetch("comments", queryset=ArchivedComment.objects.select_related("user").order_by("-id")),
+        )
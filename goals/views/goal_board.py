@@ -1,12 +1,32 @@
+import io
+
 from django.db import transaction
+from django.db.models import Count, F, Prefetch, Window
+from django.db.models.functions import RowNumber
+from django.http import StreamingHttpResponse
+from django.urls import reverse
+from django.utils.http import urlencode
 from rest_framework import filters
-from rest_framework.generics import CreateAPIView, RetrieveUpdateDestroyAPIView, ListAPIView
-from rest_framework.pagination import LimitOffsetPagination
+from rest_framework import status
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.generics import (CreateAPIView, RetrieveUpdateDestroyAPIView, ListAPIView, GenericAPIView,
+                                     RetrieveAPIView)
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 
-from goals.models import Board, Goal
+from goals.cascade import delete_board
+from goals.clone import clone_board
+from goals.conditional import BoardVersionETagMixin
+from goals.export import EXPORT_TYPES, export_rows
+from goals.importer import IMPORT_TYPES, GoalImport
+from goals.membership import WRITE_ROLES
+from goals.filters import GoalOrderingFilter
+from goals.models import Board, BoardParticipant, DeletionCascade, Goal
+from goals.pagination import EstimatedCountPagination, KeysetPagination, encode_position
 from goals.permissions import BoardPermissions
-from goals.serializers import BoardCreateSerializer, BoardSerializer, BoardListSerializer
+from goals.serializers import (BoardCreateSerializer, BoardSerializer, BoardListSerializer, BoardInviteSerializer,
+                               BoardCloneSerializer, GoalSerializer)
+from goals.views.goal__view import GoalListView
 
 
 class BoardCreateView(CreateAPIView):
@@ -20,7 +40,7 @@ class BoardCreateView(CreateAPIView):
     serializer_class: BoardCreateSerializer = BoardCreateSerializer
 
 
-class BoardView(RetrieveUpdateDestroyAPIView):
+class BoardView(BoardVersionETagMixin, RetrieveUpdateDestroyAPIView):
     """
     Представление для просмотра, обновления и удаления доски.
     Позволяет получить, обновить и удалить доску с использованием сериализатора BoardSerializer.
@@ -33,25 +53,26 @@ class BoardView(RetrieveUpdateDestroyAPIView):
     def get_queryset(self):
         """
         Возвращает queryset досок, к которым пользователь имеет доступ.
-        Фильтрация осуществляется по полю participants, где пользователь является участником.
+        Роль пользователя аннотируется для BoardPermissions, участники подгружаются одним запросом вместе с
+        пользователями.
         """
-        return Board.objects.filter(participants__user=self.request.user, is_deleted=False)
+        return Board.objects.annotate(
+            user_role=BoardParticipant.role_subquery(self.request.user, "id"),
+        ).filter(user_role__isnull=False, is_deleted=False).prefetch_related(
+            Prefetch("participants", queryset=BoardParticipant.objects.select_related("user")),
+        )
 
     def perform_destroy(self, instance: Board) -> Board:
         """
         Выполняет удаление доски.
-        При удалении доски помечает ее как is_deleted, а также «удаляет» связанные с ней категории
-        и обновляет статус целей.
+        Доска сразу помечается как is_deleted, а её категории и цели «удаляются» пачками
+        командой `run_cascades` (см. goals/cascade.py).
         """
-        with transaction.atomic():
-            instance.is_deleted = True
-            instance.save()
-            instance.categories.update(is_deleted=True)
-            Goal.objects.filter(category__board=instance).update(status=Goal.Status.archived)
+        delete_board(instance)
         return instance
 
 
-class BoardListView(ListAPIView):
+class BoardListView(BoardVersionETagMixin, ListAPIView):
     """
     Представление для просмотра списка всех досок.
     Позволяет получить список всех досок, к которым пользователь имеет доступ,
@@ -60,7 +81,7 @@ class BoardListView(ListAPIView):
 
     model: Board = Board
     permission_classes: list = [IsAuthenticated]
-    pagination_class: LimitOffsetPagination = LimitOffsetPagination
+    pagination_class: EstimatedCountPagination = EstimatedCountPagination
     serializer_class: BoardListSerializer = BoardListSerializer
     filter_backends: list = [filters.OrderingFilter]
     ordering: list = ["title"]
@@ -71,3 +92,182 @@ class BoardListView(ListAPIView):
         Фильтрация осуществляется по полю participants, где пользователь является участником.
         """
         return Board.objects.filter(participants__user=self.request.user, is_deleted=False)
+
+
+class BoardInviteView(GenericAPIView):
+    """
+    Представление для массового приглашения участников на доску.
+    Принимает список имён пользователей или CSV (строкой или файлом) и роль; приглашать может только владелец.
+    """
+
+    model: Board = Board
+    permission_classes: list = [IsAuthenticated, BoardPermissions]
+    serializer_class: BoardInviteSerializer = BoardInviteSerializer
+
+    def get_queryset(self):
+        return Board.objects.annotate(
+            user_role=BoardParticipant.role_subquery(self.request.user, "id"),
+        ).filter(user_role__isnull=False, is_deleted=False)
+
+    def post(self, request, *args, **kwargs) -> Response:
+        board: Board = self.get_object()
+        serializer: BoardInviteSerializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            result: dict = serializer.save(board)
+        return Response(result, status=status.HTTP_201_CREATED if result["invited"] else status.HTTP_200_OK)
+
+
+class BoardCloneView(GenericAPIView):
+    """
+    Представление для копирования доски: категории, по желанию цели (`goals`) и участники (`participants`).
+    Копировать может любой участник доски, переносить участников — только владелец.
+    Пользователь становится владельцем копии.
+    """
+
+    model: Board = Board
+    permission_classes: list = [IsAuthenticated]
+    serializer_class: BoardCloneSerializer = BoardCloneSerializer
+
+    def get_queryset(self):
+        return Board.objects.annotate(
+            user_role=BoardParticipant.role_subquery(self.request.user, "id"),
+        ).filter(user_role__isnull=False, is_deleted=False)
+
+    def post(self, request, *args, **kwargs) -> Response:
+        source: Board = self.get_object()
+        serializer: BoardCloneSerializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        options: dict = serializer.validated_data
+        if options["participants"] and source.user_role != BoardParticipant.Role.owner:
+            raise PermissionDenied("Переносить участников может только владелец доски")
+        board: Board = clone_board(
+            source, request.user, options.get("title") or f"{source.title} (копия)"[:255],
+            goals=options["goals"], participants=options["participants"],
+        )
+        return Response(BoardSerializer(board).data, status=status.HTTP_201_CREATED)
+
+
+class BoardKanbanView(BoardVersionETagMixin, RetrieveAPIView):
+    """
+    Представление канбана доски: колонки по статусам (кроме архива) с первыми `limit` целями и числом целей.
+    Все колонки считаются одним запросом с оконными функциями ROW_NUMBER() и COUNT() по статусу.
+    Цели в колонке отсортированы как в списке целей (поддерживается `?ordering=`), а `next` колонки —
+    ссылка на курсорную страницу списка целей с фильтрами `board` и `status`, продолжающую колонку.
+    """
+
+    model: Board = Board
+    permission_classes: list = [IsAuthenticated, BoardPermissions]
+    serializer_class: GoalSerializer = GoalSerializer
+    pagination_class: type[KeysetPagination] = KeysetPagination
+    # Порядок целей в колонках разбирает KeysetPagination по ordering_fields; фильтровать саму доску нечем
+    filter_backends: list = []
+    ordering_fields: list = GoalListView.ordering_fields
+    ordering: list = GoalListView.ordering
+    statuses: tuple = (Goal.Status.to_do, Goal.Status.in_progress, Goal.Status.done)
+
+    def get_queryset(self):
+        return Board.objects.annotate(
+            user_role=BoardParticipant.role_subquery(self.request.user, "id"),
+        ).filter(user_role__isnull=False, is_deleted=False)
+
+    def retrieve(self, request, *args, **kwargs) -> Response:
+        board: Board = self.get_object()
+        pagination: KeysetPagination = self.pagination_class()
+        limit: int = pagination.get_page_size(request)
+        ordering: list[str] = pagination.get_ordering(request, Goal.objects.all(), self)
+
+        goals: list[Goal] = list(
+            Goal.objects.filter(board=board, status__in=self.statuses).exclude(
+                category_id__in=DeletionCascade.pending_category_ids(),
+            ).annotate(
+                column_position=Window(RowNumber(), partition_by=F("status"), order_by=ordering),
+                column_count=Window(Count("id"), partition_by=F("status")),
+            ).filter(column_position__lte=limit).select_related("user").order_by("status", "column_position")
+        )
+
+        columns: list[dict] = []
+        for goal_status in self.statuses:
+            column: list[Goal] = [goal for goal in goals if goal.status == goal_status]
+            count: int = column[0].column_count if column else 0
+            columns.append({
+                "status": goal_status.value,
+                "title": goal_status.label,
+                "count": count,
+                "next": self.get_next_link(board, goal_status, ordering, limit, column[-1]) if count > limit else None,
+                "results": self.get_serializer(column, many=True).data,
+            })
+        return Response({"columns": columns})
+
+    def get_next_link(self, board: Board, goal_status: int, ordering: list[str], limit: int, last: Goal) -> str:
+        """ Курсорная страница списка целей, продолжающая колонку после `last`. """
+        params: dict = {"board": board.id, "status": goal_status, "pagination": "cursor", "limit": limit}
+        if self.request.query_params.get(GoalOrderingFilter.ordering_param):
+            params[GoalOrderingFilter.ordering_param] = self.request.query_params[GoalOrderingFilter.ordering_param]
+        params["cursor"] = encode_position(ordering, [getattr(last, key.lstrip("-")) for key in ordering])
+        return self.request.build_absolute_uri(f"{reverse('goals:goal_list')}?{urlencode(params)}")
+
+
+class BoardExportView(GenericAPIView):
+    """
+    Представление для потоковой выгрузки доски со всеми категориями, целями и комментариями.
+    Формат задаётся параметром `?type=ndjson` (по умолчанию) или `?type=csv`; параметр `format`
+    занят DRF под выбор рендерера. Выгружать может любой участник доски.
+    """
+
+    model: Board = Board
+    permission_classes: list = [IsAuthenticated, BoardPermissions]
+    type_query_param: str = "type"
+
+    def get_queryset(self):
+        return Board.objects.annotate(
+            user_role=BoardParticipant.role_subquery(self.request.user, "id"),
+        ).filter(user_role__isnull=False, is_deleted=False)
+
+    def get(self, request, *args, **kwargs) -> StreamingHttpResponse:
+        export_type: str = request.query_params.get(self.type_query_param, "ndjson")
+        if export_type not in EXPORT_TYPES:
+            raise ValidationError({self.type_query_param: [f"Допустимые значения: {', '.join(EXPORT_TYPES)}"]})
+        board: Board = self.get_object()
+        encode, content_type = EXPORT_TYPES[export_type]
+        response = StreamingHttpResponse(encode(export_rows(board)), content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="board-{board.id}.{export_type}"'
+        return response
+
+
+class BoardImportView(GenericAPIView):
+    """
+    Представление для импорта целей в доску из загруженного файла CSV или NDJSON (поле `file`).
+    Формат задаётся параметром `?type=`, по умолчанию определяется по расширению файла. Категории указываются
+    названием; импортировать может владелец или редактор доски. Ошибочные строки возвращаются в `errors`
+    с номером строки, остальные создаются; с `?atomic=true` при любой ошибке не создаётся ничего.
+    """
+
+    model: Board = Board
+    permission_classes: list = [IsAuthenticated]
+    type_query_param: str = "type"
+
+    def get_queryset(self):
+        return Board.objects.annotate(
+            user_role=BoardParticipant.role_subquery(self.request.user, "id"),
+        ).filter(user_role__isnull=False, is_deleted=False)
+
+    def post(self, request, *args, **kwargs) -> Response:
+        board: Board = self.get_object()
+        if board.user_role not in WRITE_ROLES:
+            raise PermissionDenied()
+        upload = request.FILES.get("file")
+        if upload is None:
+            raise ValidationError({"file": ["Загрузите файл CSV или NDJSON"]})
+        import_type: str = request.query_params.get(self.type_query_param) or upload.name.rpartition(".")[2].lower()
+        if import_type not in IMPORT_TYPES:
+            raise ValidationError({self.type_query_param: [f"Допустимые значения: {', '.join(IMPORT_TYPES)}"]})
+
+        atomic: bool = request.query_params.get("atomic", "").lower() in ("1", "true", "yes")
+        stream = io.TextIOWrapper(upload, encoding="utf-8-sig", newline="")
+        result: dict = GoalImport(board, request.user, atomic=atomic).run(stream, import_type)
+        return Response(
+            result,
+            status=status.HTTP_201_CREATED if result["created"] or not result["error_count"]
+            else status.HTTP_400_BAD_REQUEST,
+        )
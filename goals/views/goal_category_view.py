@@ -1,12 +1,13 @@
-from django.db import transaction
 from django.db.models import QuerySet
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
 from rest_framework.generics import CreateAPIView, ListAPIView, RetrieveUpdateDestroyAPIView
-from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.permissions import IsAuthenticated
 
-from goals.models import GoalCategory, Goal
+from goals.cascade import delete_category
+from goals.conditional import BoardVersionETagMixin
+from goals.models import GoalCategory, BoardParticipant
+from goals.pagination import EstimatedCountPagination
 from goals.permissions import GoalCategoryPermissions
 from goals.serializers import GoalCategorySerializer, GoalCategoryCreateSerializer
 
@@ -22,7 +23,7 @@ class GoalCategoryCreateView(CreateAPIView):
     serializer_class: GoalCategoryCreateSerializer = GoalCategoryCreateSerializer
 
 
-class GoalCategoryListView(ListAPIView):
+class GoalCategoryListView(BoardVersionETagMixin, ListAPIView):
     """
     Представление для просмотра списка всех категорий целей.
     Позволяет получить список всех категорий целей, к которым пользователь имеет доступ,
@@ -32,7 +33,7 @@ class GoalCategoryListView(ListAPIView):
     model: GoalCategory = GoalCategory
     permission_classes: list = [IsAuthenticated]
     serializer_class: GoalCategorySerializer = GoalCategorySerializer
-    pagination_class: LimitOffsetPagination = LimitOffsetPagination
+    pagination_class: EstimatedCountPagination = EstimatedCountPagination
     filter_backends: list = [DjangoFilterBackend, filters.OrderingFilter, filters.SearchFilter]
     ordering_fields: list = ["title", "created"]
     filterset_fields: list = ["board", "user"]
@@ -45,10 +46,11 @@ class GoalCategoryListView(ListAPIView):
         Фильтрация осуществляется по полю board, где пользователь является участником,
         и исключаются удаленные категории.
         """
-        return GoalCategory.objects.filter(board__participants__user=self.request.user, is_deleted=False)
+        return GoalCategory.objects.filter(
+            board_id__in=BoardParticipant.board_ids(self.request.user), is_deleted=False).select_related("user")
 
 
-class GoalCategoryView(RetrieveUpdateDestroyAPIView):
+class GoalCategoryView(BoardVersionETagMixin, RetrieveUpdateDestroyAPIView):
     """
     Представление для просмотра, обновления и удаления категории целей.
     Позволяет получить, обновить и удалить категорию целей с использованием сериализатора GoalCategorySerializer.
@@ -61,17 +63,17 @@ class GoalCategoryView(RetrieveUpdateDestroyAPIView):
     def get_queryset(self) -> QuerySet[GoalCategory]:
         """
         Возвращает queryset категорий целей, к которым пользователь имеет доступ.
-        Исключаются удаленные категории.
+        Исключаются удаленные категории. Роль пользователя на доске аннотируется для GoalCategoryPermissions.
         """
-        return GoalCategory.objects.filter(board__participants__user=self.request.user).exclude(is_deleted=True)
+        return GoalCategory.objects.annotate(
+            user_role=BoardParticipant.role_subquery(self.request.user),
+        ).filter(user_role__isnull=False).exclude(is_deleted=True).select_related("user")
 
     def perform_destroy(self, instance: GoalCategory) -> GoalCategory:
         """
         Выполняет удаление категории целей.
-        При удалении категории помечает ее как is_deleted и обновляет статус всех связанных целей на "archived".
+        Категория сразу помечается как is_deleted, а статус её целей меняется на "archived" пачками
+        командой `run_cascades` (см. goals/cascade.py).
         """
-        with transaction.atomic():
-            instance.is_deleted = True
-            instance.save()
-            Goal.objects.filter(category=instance).update(status=Goal.Status.archived)
+        delete_category(instance)
         return instance
@@ -0,0 +1,60 @@
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import GenericAPIView
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from goals.changes import Change, CursorExpired, InvalidCursor, Position, read_changes
+from goals.serializers import BoardSerializer, CommentSerializer, GoalCategorySerializer, GoalSerializer
+
+
+class ChangesView(GenericAPIView):
+    """
+    Лента изменений досок пользователя для синхронизации реплики клиента.
+    `?since=` — курсор из предыдущего ответа (пустой — полная загрузка), `?limit=` — размер страницы.
+    Ответ содержит изменения, новый курсор `since` и признак `has_more`.
+    Удалённые объекты приходят с `deleted: true`; исключение пользователя из доски — как удаление доски.
+    Цели и комментарии, перенесённые в архивные таблицы, приходят с `deleted: true, archived: true`.
+    Если в ленте появилась незнакомая доска (пользователя пригласили), её содержимое нужно загрузить
+    списками с фильтром по доске. Курсор старше горизонта хранения удалений даёт 410: реплику нужно
+    загрузить заново с пустого курсора.
+    """
+    permission_classes: list = [IsAuthenticated]
+    page_size: int = 100
+    max_page_size: int = 500
+    serializer_classes: dict = {
+        "board": BoardSerializer,
+        "category": GoalCategorySerializer,
+        "goal": GoalSerializer,
+        "comment": CommentSerializer,
+    }
+
+    def get(self, request, *args, **kwargs) -> Response:
+        try:
+            since: Position = Position.decode(request.query_params.get("since"))
+        except InvalidCursor:
+            raise ValidationError({"since": ["Некорректный курсор"]})
+        try:
+            changes, cursor, has_more = read_changes(request.user, since, self.get_page_size())
+        except CursorExpired:
+            return Response({"detail": "Курсор устарел: загрузите данные заново с пустым курсором"},
+                            status=status.HTTP_410_GONE)
+        return Response({
+            "changes": [self.serialize(change) for change in changes],
+            "since": cursor.encode(),
+            "has_more": has_more,
+        })
+
+    def get_page_size(self) -> int:
+        try:
+            size = int(self.request.query_params["limit"])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(size, self.max_page_size) if size > 0 else self.page_size
+
+    def serialize(self, change: Change) -> dict:
+        data = None
+        if change.obj is not None:
+            data = self.serializer_classes[change.type](change.obj, context=self.get_serializer_context()).data
+        return {"type": change.type, "id": change.id, "deleted": change.deleted, "archived": change.archived,
+                "data": data}
@@ -1,10 +1,11 @@
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
 from rest_framework.generics import CreateAPIView, RetrieveUpdateDestroyAPIView, ListAPIView
-from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.permissions import IsAuthenticated
 
-from goals.models import GoalComment
+from goals.conditional import BoardVersionETagMixin
+from goals.models import GoalComment, BoardParticipant
+from goals.pagination import EstimatedCountPagination
 from goals.permissions import CommentPermissions
 from goals.serializers import CommentCreateSerializer, CommentSerializer
 
@@ -16,17 +17,19 @@ class CommentCreateView(CreateAPIView):
     permission_classes: list = [IsAuthenticated]
 
 
-class CommentDetailView(RetrieveUpdateDestroyAPIView):
+class CommentDetailView(BoardVersionETagMixin, RetrieveUpdateDestroyAPIView):
     """ Модель представления, которая позволяет редактировать и удалять объекты Comment. """
     model: GoalComment = GoalComment
     serializer_class: CommentSerializer = CommentSerializer
     permission_classes: list = [IsAuthenticated, CommentPermissions]
 
     def get_queryset(self):
-        return GoalComment.objects.filter(goal__category__board__participants__user=self.request.user)
+        return GoalComment.objects.annotate(
+            user_role=BoardParticipant.role_subquery(self.request.user),
+        ).filter(user_role__isnull=False).select_related("user")
 
 
-class CommentListView(ListAPIView):
+class CommentListView(BoardVersionETagMixin, ListAPIView):
     """
     Модель представления, которая позволяет выводить все объекты Comment.
     Так же сортирую и делает фильтрацию по полю `goal`.
@@ -34,10 +37,11 @@ class CommentListView(ListAPIView):
     model: GoalComment = GoalComment
     serializer_class: CommentSerializer = CommentSerializer
     permission_classes: list = [IsAuthenticated]
-    pagination_class: LimitOffsetPagination = LimitOffsetPagination
+    pagination_class: EstimatedCountPagination = EstimatedCountPagination
     filter_backends: list = [filters.OrderingFilter, DjangoFilterBackend]
     filterset_fields: list = ["goal"]
     ordering: str = "-id"
 
     def get_queryset(self):
-        return GoalComment.objects.filter(goal__category__board__participants__user=self.request.user)
+        return GoalComment.objects.filter(
+            board_id__in=BoardParticipant.board_ids(self.request.user)).select_related("user")
@@ -0,0 +1,206 @@
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Callable, Union
+from unittest.mock import patch
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from bot.tg.client import TgClient
+from core.models import User
+from goals.models import ArchivedGoal, Board, BoardParticipant, Goal, GoalCategory, GoalComment
+from goals.retention import archive_goals
+from tests.factories import (BoardFactory, BoardParticipantFactory, CategoryFactory, GoalCommentFactory,
+                             GoalFactory, TuserFactory, UserFactory)
+
+# Размеры досок, на которых сравнивается число запросов каждого маршрута
+SIZES: tuple = (1, 5, 20)
+PASSWORD: str = "Benchmark-Pa55word"
+WEBHOOK_SECRET: str = "benchmark-secret"
+
+
+@dataclass
+class Seed:
+    """
+    Засеянная доска: по `size` участников, категорий, целей и комментариев, `size` пользователей вне доски
+    и цель в холодном архиве с `size` комментариями
+    """
+    size: int
+    board: Board
+    category: GoalCategory
+    goal: Goal
+    comment: GoalComment
+    archived: ArchivedGoal
+    members: list[BoardParticipant]
+    guests: list[User]
+
+
+@dataclass
+class Route:
+    """ Запрос к маршруту: метод, URL и тело, построенные по засеянной доске, формат тела и заголовки """
+    method: str
+    url: Callable[[Seed], str]
+    data: Callable[[Seed], Union[dict, list]] = lambda seed: {}
+    format: str = "json"
+    headers: dict = field(default_factory=dict)
+
+
+def import_file(seed: Seed) -> dict:
+    """ CSV для импорта: `size` целей в категории засеянной доски """
+    content = "category,title\n" + "".join(f"{seed.category.title},Цель {index}\n" for index in range(seed.size))
+    return {"file": SimpleUploadedFile("goals.csv", content.encode())}
+
+
+ROUTES: dict[str, Route] = {
+    "goals:category_create": Route("post", lambda s: reverse("goals:category_create"),
+                                   lambda s: {"board": s.board.id, "title": "Категория"}),
+    "goals:category_list": Route("get", lambda s: reverse("goals:category_list"), lambda s: {"limit": 100}),
+    "goals:category_pk": Route("get", lambda s: reverse("goals:category_pk", kwargs={"pk": s.category.id})),
+    "goals:category_pk[patch]": Route("patch", lambda s: reverse("goals:category_pk", kwargs={"pk": s.category.id}),
+                                      lambda s: {"title": "Категория"}),
+    "goals:category_pk[delete]": Route("delete", lambda s: reverse("goals:category_pk",
+                                                                    kwargs={"pk": s.category.id})),
+    "goals:goal_create": Route("post", lambda s: reverse("goals:goal_create"),
+                               lambda s: {"category": s.category.id, "title": "Цель"}),
+    "goals:goal_bulk_create": Route("post", lambda s: reverse("goals:goal_bulk_create"),
+                                    lambda s: [{"category": s.category.id, "title": f"Цель {index}"}
+                                               for index in range(s.size)]),
+    "goals:goal_bulk_update": Route("patch", lambda s: f"{reverse('goals:goal_bulk_update')}?category={s.category.id}",
+                                    lambda s: {"patch": {"priority": 4}}),
+    "goals:goal_list": Route("get", lambda s: reverse("goals:goal_list"), lambda s: {"limit": 100}),
+    "goals:goal_list[cursor]": Route("get", lambda s: reverse("goals:goal_list"),
+                                     lambda s: {"pagination": "cursor", "limit": 100}),
+    "goals:goal_list[search]": Route("get", lambda s: reverse("goals:goal_list"),
+                                     lambda s: {"search": "цель", "limit": 100}),
+    "goals:goal_archive": Route("get", lambda s: reverse("goals:goal_archive"), lambda s: {"limit": 100}),
+    "goals:goal_archive_pk": Route("get", lambda s: reverse("goals:goal_archive_pk", kwargs={"pk": s.archived.id})),
+    "goals:goal_pk": Route("get", lambda s: reverse("goals:goal_pk", kwargs={"pk": s.goal.id})),
+    "goals:goal_pk[patch]": Route("patch", lambda s: reverse("goals:goal_pk", kwargs={"pk": s.goal.id}),
+                                  lambda s: {"priority": 4}),
+    "goals:goal_pk[delete]": Route("delete", lambda s: reverse("goals:goal_pk", kwargs={"pk": s.goal.id})),
+    "goals:comment-create": Route("post", lambda s: reverse("goals:comment-create"),
+                                  lambda s: {"goal": s.goal.id, "text": "Комментарий"}),
+    "goals:comment-list": Route("get", lambda s: reverse("goals:comment-list"), lambda s: {"limit": 100}),
+    "goals:comment-detail": Route("get", lambda s: reverse("goals:comment-detail", kwargs={"pk": s.comment.id})),
+    "goals:comment-detail[patch]": Route("patch", lambda s: reverse("goals:comment-detail",
+                                                                    kwargs={"pk": s.comment.id}),
+                                         lambda s: {"text": "Комментарий"}),
+    "goals:comment-detail[delete]": Route("delete", lambda s: reverse("goals:comment-detail",
+                                                                      kwargs={"pk": s.comment.id})),
+    "goals:board_create": Route("post", lambda s: reverse("goals:board_create"), lambda s: {"title": "Доска"}),
+    "goals:board_list": Route("get", lambda s: reverse("goals:board_list"), lambda s: {"limit": 100}),
+    "goals:board_pk": Route("get", lambda s: reverse("goals:board_pk", kwargs={"pk": s.board.id})),
+    "goals:board_pk[put]": Route("put", lambda s: reverse("goals:board_pk", kwargs={"pk": s.board.id}),
+                                 lambda s: {"title": "Доска", "participants": [
+                                     {"user": participant.user.username, "role": BoardParticipant.Role.reader}
+                                     for participant in s.members
+                                 ] + [{"user": user.username, "role": BoardParticipant.Role.writer}
+                                      for user in s.guests]}),
+    "goals:board_pk[delete]": Route("delete", lambda s: reverse("goals:board_pk", kwargs={"pk": s.board.id})),
+    "goals:board_invite": Route("post", lambda s: reverse("goals:board_invite", kwargs={"pk": s.board.id}),
+                                lambda s: {"usernames": ",".join(user.username for user in s.guests)}),
+    "goals:board_clone": Route("post", lambda s: reverse("goals:board_clone", kwargs={"pk": s.board.id}),
+                               lambda s: {"goals": True, "participants": True}),
+    "goals:board_import": Route("post", lambda s: reverse("goals:board_import", kwargs={"pk": s.board.id}),
+                                import_file, format="multipart"),
+    "goals:board_kanban": Route("get", lambda s: reverse("goals:board_kanban", kwargs={"pk": s.board.id}),
+                                lambda s: {"limit": 100}),
+    "goals:board_export": Route("get", lambda s: reverse("goals:board_export", kwargs={"pk": s.board.id})),
+    "goals:board_export[csv]": Route("get", lambda s: reverse("goals:board_export", kwargs={"pk": s.board.id}),
+                                     lambda s: {"type": "csv"}),
+    "goals:changes": Route("get", lambda s: reverse("goals:changes"), lambda s: {"limit": 500}),
+    "core:login": Route("post", lambda s: reverse("core:login"),
+                        lambda s: {"username": "benchmark", "password": PASSWORD}),
+    "core:signup": Route("post", lambda s: reverse("core:signup"),
+                         lambda s: {"username": f"new_user_{s.size}", "password": PASSWORD,
+                                    "password_repeat": PASSWORD}),
+    # Имя user-profile в core/urls.py занято дважды, поэтому пути указаны явно
+    "core:user-profile": Route("get", lambda s: "/core/profile"),
+    "core:user-profile[put]": Route("put", lambda s: "/core/profile",
+                                    lambda s: {"username": "benchmark", "first_name": f"Имя {s.size}",
+                                               "last_name": "Фамилия", "email": "benchmark@example.com"}),
+    "core:user-profile[patch]": Route("patch", lambda s: "/core/profile", lambda s: {"first_name": f"Имя {s.size}"}),
+    "core:user-profile[delete]": Route("delete", lambda s: "/core/profile"),
+    "core:update_password": Route("put", lambda s: "/core/update_password",
+                                  lambda s: {"old_password": PASSWORD, "new_password": PASSWORD + "!"}),
+    "bot:verify": Route("patch", lambda s: reverse("bot:verify"), lambda s: {"verification_code": f"code{s.size}"}),
+    # Обработка обновления идёт в фоне, поэтому измеряется только приём обновления представлением
+    "bot:webhook": Route("post", lambda s: reverse("bot:webhook"),
+                         lambda s: {"update_id": s.size, "message": {
+                             "message_id": 1, "from": {"id": s.size, "first_name": "t", "username": "t"},
+                             "chat": {"id": s.size, "type": "private"}, "text": "/goals"}},
+                         headers={"HTTP_X_TELEGRAM_BOT_API_SECRET_TOKEN": WEBHOOK_SECRET}),
+}
+
+
+def seed_board(user: User, size: int) -> Seed:
+    """ Доска пользователя, где всех связанных объектов по `size` штук """
+    board = BoardFactory()
+    BoardParticipantFactory(board=board, user=user)
+    members = [BoardParticipantFactory(board=board, user=member, role=BoardParticipant.Role.writer)
+               for member in UserFactory.create_batch(size)]
+    categories = CategoryFactory.create_batch(size, board=board, user=user)
+    goals = [GoalFactory(category=categories[index % size], user=user, title=f"Цель {index}")
+             for index in range(size)]
+    comments = [GoalCommentFactory(goal=goals[index % size], user=user) for index in range(size)]
+    archived = GoalFactory(category=categories[0], user=user, status=Goal.Status.archived)
+    GoalCommentFactory.create_batch(size, goal=archived, user=user)
+    archive_goals(timezone.now() + timedelta(days=1))
+    TuserFactory(user=None, verification_code=f"code{size}")
+    return Seed(size=size, board=board, category=categories[0], goal=goals[0], comment=comments[0],
+                archived=ArchivedGoal.objects.get(id=archived.id), members=members,
+                guests=UserFactory.create_batch(size))
+
+
+def send(client, route: Route, seed: Seed):
+    """ Запрос к маршруту; отправка в Telegram и фоновая обработка обновлений вебхука отключены """
+    data = route.data(seed)
+    with patch.object(TgClient, "send_message"), patch("bot.views.get_worker"):
+        if route.method == "get":
+            response = client.get(route.url(seed), data, **route.headers)
+        else:
+            response = getattr(client, route.method)(route.url(seed), data, format=route.format, **route.headers)
+        if response.streaming:
+            b"".join(response.streaming_content)
+    assert response.status_code < 400, response.content
+    return response
+
+
+def measure(client, route: Route, seed: Seed) -> tuple[int, float]:
+    """ Число SQL-запросов и время выполнения одного запроса к маршруту """
+    with CaptureQueriesContext(connection) as context:
+        started = time.perf_counter()
+        send(client, route, seed)
+        elapsed = time.perf_counter() - started
+    return len(context.captured_queries), elapsed
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("name", ROUTES)
+def test_query_budget(name, client, user_factory, settings, record_property) -> None:
+    """
+    Число запросов маршрута не зависит от размера доски.
+    Число запросов и время для каждого размера пишутся в свойства теста (`--junitxml`).
+    """
+    settings.PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+    settings.BOT_WEBHOOK_SECRET = WEBHOOK_SECRET
+    user = user_factory(username="benchmark", password=PASSWORD)
+    client.force_login(user)
+
+    counts: dict[int, int] = {}
+    for size in SIZES:
+        seed = seed_board(user, size)
+        counts[size], elapsed = measure(client, ROUTES[name], seed)
+        record_property(f"size_{size}", {"queries": counts[size], "seconds": round(elapsed, 4)})
+        # Смена пароля и удаление профиля завершают сессию
+        if name == "core:update_password":
+            user.set_password(PASSWORD)
+            user.save()
+        client.force_login(user)
+
+    assert len(set(counts.values())) == 1, f"Число запросов {name} растёт с размером доски: {counts}"
@@ -0,0 +1,139 @@
+import json
+from datetime import date, timedelta
+from urllib.parse import parse_qsl, urlsplit
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from goals.models import Board, BoardParticipant, Goal
+from tests.benchmark_test.test_query_budget import PASSWORD, ROUTES, WEBHOOK_SECRET, Route, Seed, seed_board, send
+from tests.factories import BoardFactory, BoardParticipantFactory, CategoryFactory, UserFactory
+
+# Таблицы, которые растут вместе с числом пользователей: по ним не должно быть Seq Scan
+LARGE_TABLES: set = {
+    "core_user", "bot_tguser", "goals_board", "goals_boardparticipant",
+    "goals_goalcategory", "goals_goal", "goals_goalcomment", "goals_archivedgoal", "goals_archivedcomment",
+    "goals_changetombstone",
+}
+
+# Фильтры, которые фронтенд передаёт спискам, сверх маршрутов бенчмарка
+PLAN_ROUTES: dict[str, Route] = {
+    **ROUTES,
+    "goals:goal_list[status]": Route("get", lambda s: reverse("goals:goal_list"),
+                                     lambda s: {"status__in": "1,2", "limit": 100}),
+    "goals:goal_list[category]": Route("get", lambda s: reverse("goals:goal_list"),
+                                       lambda s: {"category__in": s.category.id, "due_date__gte": "2020-01-01"}),
+    "goals:goal_list[kanban]": Route("get", lambda s: reverse("goals:goal_list"),
+                                     lambda s: {"board": s.board.id, "status": 2, "pagination": "cursor"}),
+    "goals:comment-list[goal]": Route("get", lambda s: reverse("goals:comment-list"),
+                                      lambda s: {"goal": s.goal.id, "limit": 100}),
+    "goals:category_list[board]": Route("get", lambda s: reverse("goals:category_list"),
+                                        lambda s: {"board": s.board.id, "limit": 100}),
+}
+
+
+def capture_sql(client, route: Route, seed: Seed) -> list[str]:
+    """ SQL всех запросов, выполненных маршрутом """
+    with CaptureQueriesContext(connection) as context:
+        send(client, route, seed)
+    return [query["sql"] for query in context.captured_queries]
+
+
+def seq_scans(plan: dict) -> set[str]:
+    """ Таблицы, которые план читает последовательным сканированием """
+    tables: set = set()
+    if plan.get("Node Type") == "Seq Scan":
+        tables.add(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        tables |= seq_scans(child)
+    return tables
+
+
+def scan_nodes(plan: dict, table: str) -> list[dict]:
+    """ Узлы плана, читающие таблицу """
+    nodes: list[dict] = [plan] if plan.get("Relation Name") == table else []
+    for child in plan.get("Plans", []):
+        nodes += scan_nodes(child, table)
+    return nodes
+
+
+def rows_read(plan: dict, table: str) -> int:
+    """ Сколько строк таблицы прочитали узлы плана EXPLAIN ANALYZE, включая отброшенные фильтром """
+    return sum((node["Actual Rows"] + node.get("Rows Removed by Filter", 0)) * node["Actual Loops"]
+               for node in scan_nodes(plan, table))
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("name", PLAN_ROUTES)
+def test_no_seq_scans(name, client, user_factory, settings) -> None:
+    """
+    Для каждого запроса маршрута есть подходящий индекс.
+    При `enable_seqscan = off` планировщик выбирает Seq Scan только тогда, когда индекса нет,
+    поэтому проверка не зависит от объёма тестовых данных.
+    """
+    settings.PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+    settings.BOT_WEBHOOK_SECRET = WEBHOOK_SECRET
+    user = user_factory(username="benchmark", password=PASSWORD)
+    client.force_login(user)
+    seed = seed_board(user, 20)
+    Goal.objects.filter(board=seed.board).update(status=Goal.Status.in_progress)
+
+    statements = [sql for sql in capture_sql(client, PLAN_ROUTES[name], seed)
+                  if sql.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE"))]
+
+    problems: dict[str, set] = {}
+    with connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+        for sql in statements:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}")
+            plan = cursor.fetchone()[0]
+            plan = json.loads(plan) if isinstance(plan, str) else plan
+            tables = seq_scans(plan[0]["Plan"]) & LARGE_TABLES
+            if tables:
+                problems[sql] = tables
+
+    assert not problems, f"Seq Scan в запросах {name}: {problems}"
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("ordering", ["priority", "-priority", "due_date", "-due_date"])
+def test_deep_cursor_page_few_boards(ordering, auth_client, user) -> None:
+    """
+    Глубокая страница курсорной пагинации пользователя, у которого две доски из многих, читает только
+    цели его досок после курсора: по диапазону индекса на доску, а не проход общего индекса с начала
+    """
+    per_board, own, pages = 30, 2, 4
+    boards = BoardFactory.create_batch(40)
+    for board in boards[-own:]:
+        BoardParticipantFactory(board=board, user=user)
+    author = UserFactory()
+    Goal.objects.bulk_create([
+        Goal(category=category, board_id=board.id, user=author, title=f"Цель {index}", priority=index % 4 + 1,
+             due_date=None if index % 5 == 0 else date(2030, 1, 1) + timedelta(days=index % 17))
+        for board in boards for category in [CategoryFactory(board=board, user=author)] for index in range(per_board)
+    ])
+    with connection.cursor() as cursor:
+        for model in (Goal, Board, BoardParticipant):
+            cursor.execute(f"ANALYZE {model._meta.db_table}")
+
+    params: dict = {"pagination": "cursor", "ordering": ordering, "limit": 10}
+    for _ in range(pages - 1):
+        response = auth_client.get(reverse("goals:goal_list"), params)
+        params = dict(parse_qsl(urlsplit(response.data["next"]).query))
+    with CaptureQueriesContext(connection) as context:
+        response = auth_client.get(reverse("goals:goal_list"), params)
+    assert len(response.data["results"]) == 10
+
+    sql = next(query["sql"] for query in context.captured_queries
+               if query["sql"].startswith("SELECT") and f'FROM "{Goal._meta.db_table}"' in query["sql"])
+    with connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+        cursor.execute(f"EXPLAIN (ANALYZE, FORMAT JSON) {sql}")
+        plan = cursor.fetchone()[0]
+    plan = json.loads(plan) if isinstance(plan, str) else plan
+    # Каждое чтение целей — диапазон индекса внутри одной доски пользователя, чужие цели не читаются вовсе
+    scans = scan_nodes(plan[0]["Plan"], Goal._meta.db_table)
+    assert scans and all("board_id" in node.get("Index Cond", node.get("Recheck Cond", "")) for node in scans), scans
+    assert rows_read(plan[0]["Plan"], Goal._meta.db_table) <= own * per_board
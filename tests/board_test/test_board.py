@@ -52,6 +52,7 @@ class TestBoardView:
 
         for board in active_boards:
             BoardParticipantFactory(board=board, user=user)
+            board.refresh_from_db()  # счётчики доски проставляют триггеры БД
 
         expected_response: Dict = BoardCreateSerializer(active_boards, many=True).data
         response: Response = auth_client.get(self.url)
@@ -132,6 +133,7 @@ class TestBoardView:
         """
         board = BoardFactory()
         BoardParticipantFactory(board=board, user=user)
+        board.refresh_from_db()  # счётчики доски проставляют триггеры БД
         url: str = reverse("goals:board_pk", kwargs={"pk": board.id})
 
         expected_response: Dict = BoardSerializer(board).data
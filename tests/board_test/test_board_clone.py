@@ -0,0 +1,80 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from goals.models import Board, BoardParticipant, Goal
+from tests.factories import BoardFactory, BoardParticipantFactory, CategoryFactory, GoalCommentFactory, GoalFactory
+
+
+@pytest.mark.django_db
+class TestBoardCloneView:
+    """ Тесты копирования доски """
+
+    @pytest.fixture()
+    def board(self, user):
+        board = BoardFactory(title="Спринт")
+        BoardParticipantFactory(board=board, user=user)
+        BoardParticipantFactory(board=board, role=BoardParticipant.Role.reader)
+        categories = CategoryFactory.create_batch(2, board=board, user=user)
+        CategoryFactory(board=board, user=user, is_deleted=True)
+        GoalFactory(category=categories[0], user=user, status=Goal.Status.done, title="Готово")
+        GoalFactory(category=categories[1], user=user, status=Goal.Status.in_progress, title="В работе")
+        GoalFactory(category=categories[1], user=user, status=Goal.Status.archived, title="Архив")
+        GoalCommentFactory(goal=board.goals.first(), user=user)
+        return board
+
+    def clone(self, client, board, **data):
+        return client.post(reverse("goals:board_clone", kwargs={"pk": board.id}), data, format="json")
+
+    def test_clone_categories(self, auth_client, user, board) -> None:
+        """ По умолчанию копируются только живые категории, пользователь — владелец копии """
+        response = self.clone(auth_client, board)
+
+        assert response.status_code == status.HTTP_201_CREATED
+        clone = Board.objects.get(id=response.json()["id"])
+        assert clone.title == "Спринт (копия)"
+        assert sorted(clone.categories.values_list("title", flat=True)) == \
+               sorted(board.categories.filter(is_deleted=False).values_list("title", flat=True))
+        assert not clone.goals.exists()
+        assert list(clone.participants.values_list("user", "role")) == [(user.id, BoardParticipant.Role.owner)]
+
+    def test_clone_goals_and_participants(self, auth_client, user, board) -> None:
+        """ Цели копируются в свои категории со сброшенным статусом, участники — со своими ролями """
+        response = self.clone(auth_client, board, title="Спринт 2", goals=True, participants=True)
+
+        clone = Board.objects.get(id=response.json()["id"])
+        assert clone.title == "Спринт 2"
+        goals = {goal.title: goal for goal in clone.goals.select_related("category")}
+        assert set(goals) == {"Готово", "В работе"}
+        assert {goal.status for goal in goals.values()} == {Goal.Status.to_do}
+        assert all(goal.category.board_id == clone.id for goal in goals.values())
+        original = board.goals.get(title="Готово")
+        assert goals["Готово"].category.title == original.category.title
+        assert set(clone.participants.values_list("user", "role")) == \
+               set(board.participants.values_list("user", "role"))
+        assert not clone.goals.filter(goalcomment__isnull=False).exists()
+
+    def test_constant_queries(self, auth_client, board, django_assert_max_num_queries) -> None:
+        """ Число запросов не зависит от размера доски """
+        category = board.categories.filter(is_deleted=False).first()
+        GoalFactory.create_batch(30, category=category, user=category.user)
+        CategoryFactory.create_batch(10, board=board, user=category.user)
+
+        with django_assert_max_num_queries(16):
+            response = self.clone(auth_client, board, goals=True, participants=True)
+
+        assert Board.objects.get(id=response.json()["id"]).goals.count() == 32
+
+    def test_participants_owner_only(self, client, board) -> None:
+        """ Читатель может скопировать доску, но не её участников """
+        reader = board.participants.get(role=BoardParticipant.Role.reader).user
+        client.force_login(reader)
+
+        assert self.clone(client, board, participants=True).status_code == status.HTTP_403_FORBIDDEN
+        assert self.clone(client, board).status_code == status.HTTP_201_CREATED
+
+    def test_foreign_board(self, auth_client) -> None:
+        """ Чужую доску скопировать нельзя """
+        response = self.clone(auth_client, BoardFactory())
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
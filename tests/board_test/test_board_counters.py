@@ -0,0 +1,96 @@
+import io
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+
+from goals.cascade import run_pending
+from goals.models import Board, BoardParticipant, Goal
+from tests.factories import BoardFactory, BoardParticipantFactory, CategoryFactory, GoalFactory, UserFactory
+
+
+@pytest.mark.django_db
+class TestBoardCounters:
+    """ Тесты денормализованных счётчиков доски """
+
+    @pytest.fixture()
+    def board(self, user):
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        category = CategoryFactory(board=board, user=user)
+        GoalFactory(category=category, user=user, status=Goal.Status.to_do)
+        GoalFactory(category=category, user=user, status=Goal.Status.done)
+        return board
+
+    @staticmethod
+    def counters(board: Board) -> tuple:
+        board.refresh_from_db()
+        return board.goal_count, board.open_goal_count, board.category_count, board.participant_count
+
+    def test_create(self, board) -> None:
+        """ Создание целей, категорий и участников увеличивает счётчики """
+        assert self.counters(board) == (2, 1, 1, 1)
+
+    def test_update_and_archive(self, auth_client, board) -> None:
+        """ Смена статуса и удаление цели через API меняют счётчики """
+        open_goal, done_goal = board.goals.order_by("status")
+
+        auth_client.patch(reverse("goals:goal_pk", kwargs={"pk": done_goal.id}), {"status": Goal.Status.in_progress})
+        assert self.counters(board) == (2, 2, 1, 1)
+
+        auth_client.delete(reverse("goals:goal_pk", kwargs={"pk": open_goal.id}))
+        assert self.counters(board) == (1, 1, 1, 1)
+
+    def test_bulk_paths(self, auth_client, user, board) -> None:
+        """ Массовые `.update()`, перенос цели между досками и каскад удаления категории """
+        Goal.objects.filter(board=board).update(status=Goal.Status.in_progress)
+        assert self.counters(board) == (2, 2, 1, 1)
+
+        other = BoardFactory()
+        goal = board.goals.first()
+        goal.category = CategoryFactory(board=other, user=user)
+        goal.save()
+        assert self.counters(board) == (1, 1, 1, 1)
+        assert self.counters(other) == (1, 1, 1, 0)
+
+        auth_client.delete(reverse("goals:category_pk", kwargs={"pk": board.categories.get().id}))
+        run_pending()
+        assert self.counters(board) == (0, 0, 0, 1)
+
+    def test_participants(self, auth_client, user, board) -> None:
+        """ Участники через приглашение и PUT доски; сохранение доски не затирает счётчики """
+        guests = UserFactory.create_batch(2)
+        auth_client.post(reverse("goals:board_invite", kwargs={"pk": board.id}),
+                         {"usernames": [guest.username for guest in guests]}, format="json")
+        assert self.counters(board) == (2, 1, 1, 3)
+
+        response = auth_client.put(reverse("goals:board_pk", kwargs={"pk": board.id}), {
+            "title": "Новое название",
+            "participants": [{"user": guests[0].username, "role": BoardParticipant.Role.writer}],
+        }, format="json")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["participant_count"] == 2
+        assert self.counters(board) == (2, 1, 1, 2)
+
+    def test_board_list(self, auth_client, board, django_assert_num_queries) -> None:
+        """ Список досок отдаёт счётчики без дополнительных запросов """
+        with django_assert_num_queries(4):
+            response = auth_client.get(reverse("goals:board_list"))
+
+        item = response.json()[0]
+        assert (item["goal_count"], item["open_goal_count"], item["category_count"], item["participant_count"]) == \
+               (2, 1, 1, 1)
+
+    def test_recount(self, board) -> None:
+        """ Команда recount_boards исправляет расхождения и меняет версию доски """
+        Board.objects.filter(id=board.id).update(goal_count=100, participant_count=0)
+        version = Board.objects.get(id=board.id).version
+        out = io.StringIO()
+
+        call_command("recount_boards", stdout=out)
+
+        assert "Исправлено досок: 1" in out.getvalue()
+        assert self.counters(board) == (2, 1, 1, 1)
+        assert board.version > version
@@ -0,0 +1,92 @@
+import csv
+import io
+import json
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from goals.export import SNAPSHOT_SQL
+from goals.models import BoardParticipant
+from tests.factories import BoardFactory, BoardParticipantFactory, CategoryFactory, GoalCommentFactory, GoalFactory
+
+
+@pytest.mark.django_db
+class TestBoardExportView:
+    """ Тесты потоковой выгрузки доски """
+
+    @pytest.fixture()
+    def board(self, user):
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user, role=BoardParticipant.Role.reader)
+        categories = CategoryFactory.create_batch(2, board=board, user=user)
+        goals = [GoalFactory(category=categories[index % 2], user=user, title=f"Цель {index}") for index in range(3)]
+        GoalCommentFactory(goal=goals[0], user=user, text="Комментарий, с запятой")
+        GoalFactory(category=CategoryFactory(user=user), user=user)
+        return board
+
+    def export(self, auth_client, board, **params) -> str:
+        response = auth_client.get(reverse("goals:board_export", kwargs={"pk": board.id}), params)
+        assert response.status_code == status.HTTP_200_OK, "Запрос не прошел"
+        assert response.streaming, "Выгрузка должна отдаваться потоком"
+        return b"".join(response.streaming_content).decode()
+
+    def test_export_ndjson(self, auth_client, user, board) -> None:
+        """ NDJSON: доска, затем все её категории, цели и комментарии """
+        rows = [json.loads(line) for line in self.export(auth_client, board).splitlines()]
+
+        assert [row["type"] for row in rows] == ["board", "category", "category", "goal", "goal", "goal", "comment"]
+        assert rows[0]["title"] == board.title
+        assert {row["title"] for row in rows if row["type"] == "goal"} == {"Цель 0", "Цель 1", "Цель 2"}
+        assert rows[-1]["user"] == user.username
+
+    def test_export_csv(self, auth_client, board) -> None:
+        """ CSV: одна таблица с колонкой type, экранирование значений """
+        rows = list(csv.DictReader(io.StringIO(self.export(auth_client, board, type="csv"))))
+
+        assert len(rows) == 7
+        assert rows[-1]["type"] == "comment"
+        assert rows[-1]["text"] == "Комментарий, с запятой"
+
+    def test_export_csv_formulas(self, auth_client, user, board) -> None:
+        """ Значения, начинающиеся с =, +, - или @, не выполняются табличным редактором как формулы """
+        category = board.categories.first()
+        for title in ("=HYPERLINK(\"http://evil\")", "+1", "-2", "@SUM(A1)"):
+            GoalFactory(category=category, user=user, title=title)
+
+        rows = list(csv.DictReader(io.StringIO(self.export(auth_client, board, type="csv"))))
+
+        titles = [row["title"] for row in rows if row["type"] == "goal"][3:]
+        assert titles == ["'=HYPERLINK(\"http://evil\")", "'+1", "'-2", "'@SUM(A1)"]
+
+    def test_export_unknown_type(self, auth_client, board) -> None:
+        response = auth_client.get(reverse("goals:board_export", kwargs={"pk": board.id}), {"type": "xml"})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_export_not_participant(self, auth_client) -> None:
+        """ Чужую доску выгрузить нельзя """
+        board = BoardFactory()
+
+        response = auth_client.get(reverse("goals:board_export", kwargs={"pk": board.id}))
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db(transaction=True)
+def test_export_snapshot(auth_client, user) -> None:
+    """ Выгрузка читает доску в одной транзакции REPEATABLE READ READ ONLY """
+    board = BoardFactory()
+    BoardParticipantFactory(board=board, user=user)
+    GoalFactory(category=CategoryFactory(board=board, user=user), user=user)
+
+    with CaptureQueriesContext(connection) as context:
+        response = auth_client.get(reverse("goals:board_export", kwargs={"pk": board.id}))
+        lines = b"".join(response.streaming_content).decode().splitlines()
+
+    assert len(lines) == 3
+    sql = [query["sql"] for query in context.captured_queries]
+    reads = [index for index, query in enumerate(sql) if "goals_goalcomment" in query or "goals_goal\"" in query]
+    assert sql.index(SNAPSHOT_SQL) < min(reads), "Цели и комментарии читаются после начала снимка"
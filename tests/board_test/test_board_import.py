@@ -0,0 +1,123 @@
+import io
+import json
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+
+from goals.models import BoardParticipant, Goal
+from tests.factories import BoardFactory, BoardParticipantFactory, CategoryFactory
+
+
+@pytest.mark.django_db
+class TestBoardImportView:
+    """ Тесты импорта целей в доску """
+
+    @pytest.fixture()
+    def board(self, user):
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user, role=BoardParticipant.Role.writer)
+        CategoryFactory(board=board, user=user, title="Работа")
+        CategoryFactory(board=board, user=user, title="Старая", is_deleted=True)
+        CategoryFactory(user=user, title="Чужая")
+        return board
+
+    def upload(self, auth_client, board, name: str, content: str, **params):
+        url = reverse("goals:board_import", kwargs={"pk": board.id})
+        if params:
+            url += "?" + "&".join(f"{key}={value}" for key, value in params.items())
+        return auth_client.post(url, {"file": SimpleUploadedFile(name, content.encode())}, format="multipart")
+
+    def test_import_csv(self, auth_client, user, board) -> None:
+        """ CSV: категории находятся по названию, незаполненные поля получают значения по умолчанию """
+        content = ("category,title,description,status,priority,due_date\n"
+                   "Работа,Первая,\"Описание, с запятой\",2,3,2030-01-01\n"
+                   "Работа,Вторая,,,,\n")
+
+        response = self.upload(auth_client, board, "goals.csv", content)
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.json() == {"created": 2, "error_count": 0, "errors": []}
+        first, second = Goal.objects.filter(board=board).order_by("id")
+        assert (first.title, first.description, first.status, first.priority, str(first.due_date)) == \
+               ("Первая", "Описание, с запятой", 2, 3, "2030-01-01")
+        assert (second.title, second.description, second.status, second.priority, second.due_date) == \
+               ("Вторая", None, Goal.Status.to_do, Goal.Priority.medium, None)
+        assert first.user == user and first.category.title == "Работа"
+
+    def test_import_ndjson_errors(self, auth_client, board) -> None:
+        """ Ошибочные строки возвращаются с номерами, остальные создаются """
+        lines = [
+            {"category": "Работа", "title": "Цель"},
+            {"category": "Старая", "title": "Цель"},
+            {"category": "Чужая", "title": "Цель"},
+            {"category": "Работа", "status": 99},
+        ]
+        content = "\n".join(json.dumps(line, ensure_ascii=False) for line in lines) + "\nне json\n"
+
+        response = self.upload(auth_client, board, "goals.ndjson", content)
+
+        assert response.status_code == status.HTTP_201_CREATED
+        data = response.json()
+        assert data["created"] == 1
+        assert data["error_count"] == 4
+        assert [error["line"] for error in data["errors"]] == [2, 3, 4, 5]
+        assert set(data["errors"][2]["errors"]) == {"title", "status"}
+        assert Goal.objects.filter(board=board).count() == 1
+
+    def test_atomic(self, auth_client, board) -> None:
+        """ С atomic=true при ошибке не создаётся ничего """
+        content = "category,title\nРабота,Цель\nНет такой,Цель\n"
+
+        response = self.upload(auth_client, board, "goals.csv", content, atomic="true")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()["created"] == 0
+        assert not Goal.objects.filter(board=board).exists()
+
+    def test_single_insert(self, auth_client, board, django_assert_max_num_queries) -> None:
+        """ Число запросов не зависит от числа строк """
+        content = "category,title\n" + "".join(f"Работа,Цель {index}\n" for index in range(500))
+
+        with django_assert_max_num_queries(12):
+            response = self.upload(auth_client, board, "goals.csv", content)
+
+        assert response.json()["created"] == 500
+
+    def test_reader_forbidden(self, client, board) -> None:
+        """ Читатель доски импортировать не может """
+        reader = BoardParticipantFactory(board=board, role=BoardParticipant.Role.reader).user
+        client.force_login(reader)
+
+        response = self.upload(client, board, "goals.csv", "category,title\nРабота,Цель\n")
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_unknown_type(self, auth_client, board) -> None:
+        """ Неизвестный формат даёт 400 """
+        response = self.upload(auth_client, board, "goals.xlsx", "")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_not_utf8(self, auth_client, board) -> None:
+        """ Файл не в UTF-8 даёт 400, а не ошибку сервера """
+        url = reverse("goals:board_import", kwargs={"pk": board.id})
+        upload = SimpleUploadedFile("goals.csv", "category,title\nРабота,Цель\n".encode("cp1251"))
+
+        response = auth_client.post(url, {"file": upload}, format="multipart")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "file" in response.json()
+
+    def test_command(self, user, board, tmp_path) -> None:
+        """ Команда import_goals загружает файл так же, как представление """
+        path = tmp_path / "goals.csv"
+        path.write_text("category,title\nРабота,Из команды\n", encoding="utf-8")
+        out = io.StringIO()
+
+        call_command("import_goals", str(path), board=board.id, user=user.username, stdout=out)
+
+        assert "Создано целей: 1" in out.getvalue()
+        assert Goal.objects.get(board=board).title == "Из команды"
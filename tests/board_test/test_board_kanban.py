@@ -0,0 +1,65 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from goals.cascade import delete_category
+from goals.models import Goal
+from tests.factories import BoardFactory, BoardParticipantFactory, CategoryFactory, GoalFactory
+
+
+@pytest.mark.django_db
+class TestBoardKanbanView:
+    """ Тесты канбана доски """
+
+    @pytest.fixture()
+    def board(self, user):
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        category = CategoryFactory(board=board, user=user)
+        for priority in (Goal.Priority.low, Goal.Priority.critical, Goal.Priority.medium):
+            GoalFactory(category=category, user=user, status=Goal.Status.to_do, priority=priority)
+        GoalFactory(category=category, user=user, status=Goal.Status.done)
+        GoalFactory(category=category, user=user, status=Goal.Status.archived)
+        # Удаление категории ещё идёт: её цели скрыты, пока каскад не перенесёт их в архив
+        deleted = CategoryFactory(board=board, user=user)
+        GoalFactory(category=deleted, user=user)
+        delete_category(deleted)
+        return board
+
+    def kanban(self, auth_client, board, **params) -> dict:
+        response = auth_client.get(reverse("goals:board_kanban", kwargs={"pk": board.id}), params)
+        assert response.status_code == status.HTTP_200_OK, "Запрос не прошел"
+        return response.json()
+
+    def test_columns(self, auth_client, board) -> None:
+        """ Колонки по статусам без архива, цели отсортированы как в списке, счётчики по колонкам """
+        columns = self.kanban(auth_client, board)["columns"]
+
+        assert [(column["status"], column["count"]) for column in columns] == [
+            (Goal.Status.to_do, 3), (Goal.Status.in_progress, 0), (Goal.Status.done, 1),
+        ]
+        assert [goal["priority"] for goal in columns[0]["results"]] == [
+            Goal.Priority.low, Goal.Priority.medium, Goal.Priority.critical,
+        ]
+        assert all(column["next"] is None for column in columns)
+
+    def test_load_more(self, auth_client, board) -> None:
+        """ Ссылка `next` колонки продолжает её курсорной страницей списка целей """
+        column = self.kanban(auth_client, board, limit=2, ordering="-priority")["columns"][0]
+
+        page = auth_client.get(column["next"]).json()
+
+        assert [goal["priority"] for goal in column["results"]] == [Goal.Priority.critical, Goal.Priority.medium]
+        assert [goal["priority"] for goal in page["results"]] == [Goal.Priority.low]
+        assert page["next"] is None
+
+    def test_single_goal_query(self, auth_client, board, django_assert_num_queries) -> None:
+        """ Сессия, пользователь, версии для ETag, доска и один запрос целей всех колонок """
+        with django_assert_num_queries(5):
+            self.kanban(auth_client, board)
+
+    def test_foreign_board(self, auth_client) -> None:
+        """ Канбан чужой доски недоступен """
+        response = auth_client.get(reverse("goals:board_kanban", kwargs={"pk": BoardFactory().id}))
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,97 @@
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from rest_framework import status
+
+from goals.models import BoardParticipant
+from tests.factories import BoardFactory, BoardParticipantFactory, UserFactory
+
+
+@pytest.mark.django_db
+class TestBoardParticipants:
+    """ Тесты изменения состава участников доски """
+
+    @pytest.fixture()
+    def board(self, user):
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        return board
+
+    @staticmethod
+    def roles(board) -> dict[str, int]:
+        return dict(BoardParticipant.objects.filter(board=board).values_list("user__username", "role"))
+
+    def test_update_participants_diff(self, auth_client, user, board) -> None:
+        """ Выбывшие удаляются, роли меняются, новые участники добавляются """
+        stay, change, leave, new = UserFactory.create_batch(4)
+        BoardParticipantFactory(board=board, user=stay, role=BoardParticipant.Role.reader)
+        BoardParticipantFactory(board=board, user=change, role=BoardParticipant.Role.reader)
+        BoardParticipantFactory(board=board, user=leave, role=BoardParticipant.Role.writer)
+
+        response = auth_client.put(reverse("goals:board_pk", kwargs={"pk": board.id}), {
+            "title": "Новое название",
+            "participants": [
+                {"user": stay.username, "role": BoardParticipant.Role.reader},
+                {"user": change.username, "role": BoardParticipant.Role.writer},
+                {"user": new.username, "role": BoardParticipant.Role.writer},
+            ],
+        }, format="json")
+
+        assert response.status_code == status.HTTP_200_OK, "Запрос не прошел"
+        assert self.roles(board) == {
+            user.username: BoardParticipant.Role.owner,
+            stay.username: BoardParticipant.Role.reader,
+            change.username: BoardParticipant.Role.writer,
+            new.username: BoardParticipant.Role.writer,
+        }
+        assert {part["user"] for part in response.data["participants"]} == set(self.roles(board))
+
+    def test_update_unknown_participant(self, auth_client, board) -> None:
+        """ Несуществующие имена перечисляются в ошибке, состав не меняется """
+        response = auth_client.put(reverse("goals:board_pk", kwargs={"pk": board.id}), {
+            "title": "Доска",
+            "participants": [{"user": "ghost", "role": BoardParticipant.Role.reader}],
+        }, format="json")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "ghost" in response.data["participants"][0]
+        assert BoardParticipant.objects.filter(board=board).count() == 1
+
+    def test_invite_list(self, auth_client, user, board) -> None:
+        """ Приглашение списком: существующие участники и неизвестные имена пропускаются """
+        member, *guests = UserFactory.create_batch(3)
+        BoardParticipantFactory(board=board, user=member, role=BoardParticipant.Role.writer)
+
+        response = auth_client.post(reverse("goals:board_invite", kwargs={"pk": board.id}), {
+            "usernames": [member.username, *(guest.username for guest in guests), "ghost"],
+            "role": BoardParticipant.Role.writer,
+        }, format="json")
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data == {
+            "invited": [guest.username for guest in guests],
+            "skipped": [member.username],
+            "not_found": ["ghost"],
+        }
+        assert all(self.roles(board)[guest.username] == BoardParticipant.Role.writer for guest in guests)
+
+    def test_invite_csv_file(self, auth_client, board) -> None:
+        """ Приглашение CSV-файлом, по умолчанию с ролью читателя """
+        guests = UserFactory.create_batch(3)
+        csv_file = SimpleUploadedFile("team.csv", "\n".join(guest.username for guest in guests).encode())
+
+        response = auth_client.post(reverse("goals:board_invite", kwargs={"pk": board.id}),
+                                    {"usernames": csv_file}, format="multipart")
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert all(self.roles(board)[guest.username] == BoardParticipant.Role.reader for guest in guests)
+
+    def test_invite_not_owner(self, auth_client, user) -> None:
+        """ Приглашать может только владелец доски """
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user, role=BoardParticipant.Role.writer)
+
+        response = auth_client.post(reverse("goals:board_invite", kwargs={"pk": board.id}),
+                                    {"usernames": UserFactory().username}, format="json")
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
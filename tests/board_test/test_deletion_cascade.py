@@ -0,0 +1,73 @@
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+
+from goals.cascade import process_batch
+from goals.models import DeletionCascade, Goal, GoalCategory
+from tests.factories import BoardFactory, BoardParticipantFactory, CategoryFactory, GoalFactory
+
+
+@pytest.mark.django_db
+class TestDeletionCascade:
+    """ Тесты пакетного каскада удаления доски и категории """
+
+    @pytest.fixture()
+    def board(self, user):
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        for category in CategoryFactory.create_batch(3, board=board, user=user):
+            GoalFactory.create_batch(2, category=category, user=user)
+        return board
+
+    def test_board_delete_hides_contents(self, auth_client, board) -> None:
+        """ Содержимое доски скрыто сразу, хотя каскад ещё не выполнялся """
+        response = auth_client.delete(reverse("goals:board_pk", kwargs={"pk": board.id}))
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert DeletionCascade.objects.get(board=board).finished is None
+        assert not Goal.objects.filter(status=Goal.Status.archived).exists()
+        assert auth_client.get(reverse("goals:goal_list")).json() == []
+        assert auth_client.get(reverse("goals:category_list")).json() == []
+        goal = Goal.objects.filter(board=board).first()
+        assert auth_client.get(reverse("goals:goal_pk", kwargs={"pk": goal.id})).status_code == 404
+
+    def test_board_cascade_batches(self, auth_client, board) -> None:
+        """ Команда доводит каскад до конца пачками: категории удалены, цели в архиве """
+        auth_client.delete(reverse("goals:board_pk", kwargs={"pk": board.id}))
+
+        call_command("run_cascades", batch_size=2)
+
+        assert not GoalCategory.objects.filter(board=board, is_deleted=False).exists()
+        assert not Goal.objects.filter(board=board).exclude(status=Goal.Status.archived).exists()
+        assert DeletionCascade.objects.get(board=board).finished is not None
+
+    def test_cascade_resumes(self, auth_client, board) -> None:
+        """ Прерванный каскад продолжается с сохранённого курсора """
+        auth_client.delete(reverse("goals:board_pk", kwargs={"pk": board.id}))
+        cascade = DeletionCascade.objects.get(board=board)
+        categories = list(GoalCategory.objects.filter(board=board).order_by("id"))
+
+        assert process_batch(cascade.id, batch_size=2)
+
+        cascade.refresh_from_db()
+        assert (cascade.stage, cascade.cursor) == (DeletionCascade.Stage.categories, categories[1].id)
+        assert [category.id for category in GoalCategory.objects.filter(board=board, is_deleted=True)] == [
+            category.id for category in categories[:2]]
+
+        call_command("run_cascades", batch_size=2)
+        assert GoalCategory.objects.filter(board=board, is_deleted=True).count() == 3
+
+    def test_category_delete(self, auth_client, user, board) -> None:
+        """ Цели удалённой категории скрыты сразу и переносятся в архив каскадом """
+        category = GoalCategory.objects.filter(board=board).first()
+
+        response = auth_client.delete(reverse("goals:category_pk", kwargs={"pk": category.id}))
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert len(auth_client.get(reverse("goals:goal_list")).json()) == 4
+
+        call_command("run_cascades")
+        assert set(Goal.objects.filter(category=category).values_list("status", flat=True)) == {
+            Goal.Status.archived}
+        assert Goal.objects.filter(board=board, status=Goal.Status.archived).count() == 2
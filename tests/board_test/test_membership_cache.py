@@ -0,0 +1,83 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from goals.checks import check_shared_cache
+from goals.membership import get_board_roles
+from goals.models import Board, BoardParticipant
+from tests.factories import BoardFactory, BoardParticipantFactory
+
+
+@pytest.mark.django_db
+class TestMembershipCache:
+    """ Тесты кэша ролей участников досок """
+
+    url: str = reverse("goals:category_create")
+
+    def test_roles_cached(self, user, django_assert_num_queries) -> None:
+        """ Повторное обращение к ролям не идёт в базу """
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+
+        with django_assert_num_queries(1):
+            assert get_board_roles(user) == {board.id: BoardParticipant.Role.owner}
+            assert get_board_roles(user) == {board.id: BoardParticipant.Role.owner}
+
+    def test_role_change_invalidates(self, auth_client, user) -> None:
+        """ Понижение участника до читателя сразу запрещает создание категорий """
+        board = BoardFactory()
+        participant = BoardParticipantFactory(board=board, user=user, role=BoardParticipant.Role.writer)
+
+        response = auth_client.post(self.url, {"board": board.id, "title": "Разрешено"})
+        assert response.status_code == status.HTTP_201_CREATED
+
+        participant.role = BoardParticipant.Role.reader
+        participant.save()
+        response = auth_client.post(self.url, {"board": board.id, "title": "Запрещено"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_board_delete_invalidates(self, auth_client, user) -> None:
+        """ После удаления доски она пропадает из ролей участника """
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        assert board.id in get_board_roles(user)
+
+        response = auth_client.delete(reverse("goals:board_pk", kwargs={"pk": board.id}))
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert board.id not in get_board_roles(user)
+
+    def test_board_restore_invalidates(self, user) -> None:
+        """ Восстановленная доска возвращается в роли участника, не дожидаясь истечения кэша """
+        board = BoardFactory(is_deleted=True)
+        BoardParticipantFactory(board=board, user=user)
+        assert board.id not in get_board_roles(user)
+
+        board = Board.objects.get(id=board.id)
+        board.is_deleted = False
+        board.save()
+
+        assert board.id in get_board_roles(user)
+
+    def test_board_update_keeps_cache(self, user, django_assert_num_queries) -> None:
+        """ Правка доски без смены флага удаления кэш не сбрасывает """
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        get_board_roles(user)
+
+        board.title = "Новое название"
+        with django_assert_num_queries(1):
+            board.save()
+
+
+@pytest.mark.parametrize("debug, backend, errors", [
+    (False, "django.core.cache.backends.locmem.LocMemCache", ["goals.E001"]),
+    (True, "django.core.cache.backends.locmem.LocMemCache", []),
+    (False, "django.core.cache.backends.dummy.DummyCache", []),
+])
+def test_shared_cache_check(settings, debug, backend, errors) -> None:
+    """ Вне режима отладки роли нельзя кэшировать в памяти процесса """
+    settings.DEBUG = debug
+    settings.CACHES = {"default": {"BACKEND": backend}}
+
+    assert [error.id for error in check_shared_cache(None)] == errors
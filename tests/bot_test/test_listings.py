@@ -0,0 +1,122 @@
+from unittest.mock import patch
+
+import pytest
+
+from bot.listings import MESSAGE_LIMIT, BoardListing, GoalListing, Listing, parse_callback
+from bot.management.commands.runbot import Command
+from bot.tg.client import TgClient
+from bot.tg.dc import GetUpdatesResponse
+from tests.factories import BoardFactory, BoardParticipantFactory, CategoryFactory, GoalFactory, TuserFactory
+
+
+def buttons(page) -> dict[str, str]:
+    """ Кнопки страницы: подпись -> callback_data """
+    if page.reply_markup is None:
+        return {}
+    return {button.text: button.callback_data for button in page.reply_markup.inline_keyboard[0]}
+
+
+def follow(page, label: str):
+    return parse_callback(buttons(page)[label])
+
+
+@pytest.mark.django_db
+class TestListings:
+    """ Тесты постраничных списков бота """
+
+    @pytest.fixture()
+    def tg_user(self, user):
+        return TuserFactory(user=user)
+
+    @pytest.fixture()
+    def goals(self, user):
+        category = CategoryFactory(user=user)
+        return GoalFactory.create_batch(25, category=category, user=user)
+
+    def test_pages(self, tg_user, goals, django_assert_num_queries) -> None:
+        """ Страницы по ключу: вперёд и назад, каждая одним запросом """
+        listing = GoalListing()
+        with django_assert_num_queries(1):
+            first = listing.page(tg_user)
+        assert first.text.count("Название:") == 20
+        assert list(buttons(first)) == ["Далее »"]
+
+        with django_assert_num_queries(1):
+            second = listing.page(tg_user, *follow(first, "Далее »")[1:])
+        assert second.text.count("Название:") == 5
+        assert list(buttons(second)) == ["« Назад"]
+
+        back = listing.page(tg_user, *follow(second, "« Назад")[1:])
+        assert back.text == first.text
+        assert list(buttons(back)) == ["Далее »"]
+
+    def test_message_limit(self, user, tg_user) -> None:
+        """ Страница умещается в одно сообщение; переход по страницам не теряет и не повторяет цели """
+        category = CategoryFactory(user=user)
+        titles = [f"{i:03} " + "х" * 250 for i in range(30)]
+        for title in titles:
+            GoalFactory(category=category, user=user, title=title)
+        listing = GoalListing()
+
+        page, seen = listing.page(tg_user), []
+        while True:
+            assert len(page.text) <= MESSAGE_LIMIT
+            seen += [title for title in titles if title in page.text]
+            if "Далее »" not in buttons(page):
+                break
+            page = listing.page(tg_user, *follow(page, "Далее »")[1:])
+
+        assert seen == titles
+
+    def test_boards(self, user, tg_user, django_assert_num_queries) -> None:
+        """ Доски одним запросом, удалённые не показываются """
+        BoardParticipantFactory(user=user, board=BoardFactory(title="Работа"))
+        BoardParticipantFactory(user=user, board=BoardFactory(title="Старое", is_deleted=True))
+
+        with django_assert_num_queries(1):
+            page = BoardListing().page(tg_user)
+
+        assert "Работа" in page.text and "Старое" not in page.text
+        assert page.reply_markup is None
+
+    def test_empty(self, tg_user) -> None:
+        assert GoalListing().page(tg_user).text == "Список целей пуст."
+
+    def test_callback(self, tg_user, goals) -> None:
+        """ Нажатие «Далее» заменяет сообщение со списком следующей страницей """
+        command = Command()
+        command.handle_update(GetUpdatesResponse.Schema().load({"ok": True, "result": [{
+            "update_id": 1,
+            "message": {"message_id": 1, "from": {"id": tg_user.user_ud, "first_name": "t", "username": "t"},
+                        "chat": {"id": tg_user.chat_id, "type": "private"}, "text": "/goals"},
+        }]}).result[0])
+        first = command.outbox.chats[tg_user.chat_id].head()
+        data = first.kwargs["reply_markup"].inline_keyboard[0][0].callback_data
+
+        with patch.object(TgClient, "answer_callback_query") as answer:
+            command.handle_update(GetUpdatesResponse.Schema().load({"ok": True, "result": [{
+                "update_id": 2,
+                "callback_query": {
+                    "id": "42", "data": data,
+                    "from": {"id": tg_user.user_ud, "first_name": "t", "username": "t"},
+                    "message": {"message_id": 7, "from": {"id": 1, "first_name": "bot", "username": "bot"},
+                                "chat": {"id": tg_user.chat_id, "type": "private"}},
+                },
+            }]}).result[0])
+
+        answer.assert_called_once_with("42")
+        edit = command.outbox.chats[tg_user.chat_id].queues[0][0]
+        assert (edit.method, edit.kwargs["message_id"]) == ("edit_message_text", 7)
+        assert edit.kwargs["text"].count("Название:") == 5
+
+
+def test_abstract_hooks() -> None:
+    """ Список без render не создаётся, а не падает посреди диалога """
+    class Incomplete(Listing):
+        name, title, empty = "incomplete", "Список", "Пусто"
+
+        def get_queryset(self, tg_user):
+            return GoalListing().get_queryset(tg_user)
+
+    with pytest.raises(TypeError):
+        Incomplete()
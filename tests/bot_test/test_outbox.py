@@ -0,0 +1,133 @@
+import threading
+import time
+from collections import deque
+
+from bot.outbox import RATE_WINDOW, Outbox, Priority
+from bot.tg.transport import TgError
+
+
+class FakeClient:
+    """ Клиент, который запоминает отправленные сообщения и момент отправки """
+
+    def __init__(self, fail: str | None = None, error: type[Exception] = TgError):
+        self.fail = fail
+        self.error = error
+        self.sent: list[tuple[float, int, str]] = []
+        self.lock = threading.Lock()
+
+    def send_message(self, chat_id: int, text: str) -> None:
+        if text == self.fail:
+            raise self.error("sendMessage: 400 Bad Request")
+        with self.lock:
+            self.sent.append((time.monotonic(), chat_id, text))
+
+    def texts(self, chat_id: int) -> list[str]:
+        return [text for _, chat, text in self.sent if chat == chat_id]
+
+
+class TestOutbox:
+    """ Тесты планировщика исходящих сообщений бота """
+
+    def test_chat_rate(self) -> None:
+        """ В один чат сообщения уходят по порядку и не чаще лимита чата, другие чаты не ждут """
+        client = FakeClient()
+        outbox = Outbox(client, chat_rate=20, global_rate=1000)
+        for text in "abc":
+            outbox.send_message(1, text)
+        outbox.send_message(2, "x")
+        outbox.start()
+
+        assert outbox.flush(timeout=5)
+        assert client.texts(1) == ["a", "b", "c"]
+        times = [at for at, chat, _ in client.sent if chat == 1]
+        assert all(later - earlier >= 0.04 for earlier, later in zip(times, times[1:]))
+        assert [at for at, chat, _ in client.sent if chat == 2][0] < times[1]
+
+    def test_global_rate(self) -> None:
+        """ Общий лимит действует на все чаты сразу """
+        client = FakeClient()
+        outbox = Outbox(client, chat_rate=1000, global_rate=20)
+        outbox.bucket.tokens = 1
+        for chat_id in range(4):
+            outbox.send_message(chat_id, "hi")
+        started = time.monotonic()
+        outbox.start()
+
+        assert outbox.flush(timeout=5)
+        assert time.monotonic() - started >= 0.14
+
+    def test_priority(self) -> None:
+        """ Ответ на команду обгоняет длинный список, в том числе в том же чате """
+        client = FakeClient()
+        outbox = Outbox(client, chat_rate=50, global_rate=1000, senders=1)
+        for i in range(3):
+            outbox.send_message(1, f"goal {i}", Priority.bulk)
+        outbox.send_message(1, "Операция отменена")
+        outbox.send_message(2, "Неизвестная команда")
+        outbox.start()
+
+        assert outbox.flush(timeout=5)
+        assert [text for _, _, text in client.sent] == [
+            "Операция отменена", "Неизвестная команда", "goal 0", "goal 1", "goal 2",
+        ]
+
+    def test_back_pressure(self) -> None:
+        """ Переполненная очередь чата задерживает отправителя, пока сообщения не уйдут """
+        client = FakeClient()
+        outbox = Outbox(client, chat_rate=1000, global_rate=1000, max_chat_queue=2)
+        outbox.send_message(1, "a")
+        outbox.send_message(1, "b")
+        blocked = threading.Thread(target=outbox.send_message, args=(1, "c"))
+        blocked.start()
+        blocked.join(timeout=0.1)
+        assert blocked.is_alive()
+
+        outbox.start()
+        blocked.join(timeout=5)
+
+        assert outbox.flush(timeout=5)
+        assert client.texts(1) == ["a", "b", "c"]
+
+    def test_stats(self) -> None:
+        """ Глубина очередей, скорость и ошибки отправки и время ожидания доступны через stats() """
+        client = FakeClient(fail="boom")
+        outbox = Outbox(client, chat_rate=1000, global_rate=1000)
+        outbox.send_message(1, "a", Priority.bulk)
+        outbox.send_message(1, "boom")
+        outbox.send_message(2, "b")
+        stats = outbox.stats()
+        assert (stats["depth"], stats["queued"], stats["chats"]) == ({"interactive": 2, "bulk": 1}, 3, 2)
+        assert (stats["sent"], stats["failed"], stats["rate"]) == (0, 0, 0)
+
+        outbox.start()
+        assert outbox.flush(timeout=5)
+
+        stats = outbox.stats()
+        assert (stats["depth"], stats["queued"], stats["chats"]) == ({"interactive": 0, "bulk": 0}, 0, 0)
+        assert (stats["sent"], stats["failed"]) == (2, 1)
+        assert stats["rate"] > 0
+        assert stats["wait_max"] >= stats["wait_avg"] >= 0
+
+    def test_stats_rate_window(self) -> None:
+        """ Скорость считается только по отправкам за последние RATE_WINDOW секунд """
+        outbox = Outbox(FakeClient())
+        outbox.started -= 2 * RATE_WINDOW
+        outbox.sent, outbox.sent_times = 3, deque([time.monotonic() - RATE_WINDOW - 1, time.monotonic()])
+
+        stats = outbox.stats()
+
+        assert stats["sent"] == 3
+        assert stats["rate"] == round(1 / RATE_WINDOW, 3)
+
+    def test_unexpected_error(self) -> None:
+        """ Неожиданная ошибка клиента не останавливает поток отправки и не блокирует чат """
+        client = FakeClient(fail="bad", error=ValueError)
+        outbox = Outbox(client, chat_rate=1000, global_rate=1000, senders=1)
+        outbox.send_message(1, "bad")
+        outbox.send_message(1, "ok")
+
+        outbox.start()
+
+        assert outbox.flush(timeout=5)
+        assert client.texts(1) == ["ok"]
+        assert outbox.stats()["failed"] == 1
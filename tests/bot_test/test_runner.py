@@ -0,0 +1,142 @@
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+from bot.runner import BotRunner, ChatDispatcher
+from bot.tg.client import TgClient
+from bot.tg.dc import GetUpdatesResponse, UpdateObj
+
+
+def updates(*messages: tuple[int, str], start: int = 1) -> GetUpdatesResponse:
+    """ Ответ getUpdates с сообщениями (chat_id, text) """
+    return GetUpdatesResponse.Schema().load({"ok": True, "result": [{
+        "update_id": start + i,
+        "message": {
+            "message_id": start + i,
+            "from": {"id": chat_id, "first_name": "test", "username": "test"},
+            "chat": {"id": chat_id, "type": "private"},
+            "text": text,
+        },
+    } for i, (chat_id, text) in enumerate(messages)]})
+
+
+class TestChatDispatcher:
+    """ Тесты параллельной обработки сообщений бота """
+
+    def test_order_within_chat(self) -> None:
+        """ Медленный чат не задерживает остальные, сообщения внутри чата обрабатываются по порядку """
+        handled: list[tuple[int, str]] = []
+
+        def handler(update: UpdateObj) -> None:
+            if update.chat_id == 1:
+                time.sleep(0.05)
+            handled.append((update.chat_id, update.message.text))
+
+        async def main() -> None:
+            dispatcher = ChatDispatcher(handler, workers=4)
+            for item in updates((1, "a"), (1, "b"), (2, "x"), (1, "c"), (2, "y")).result:
+                await dispatcher.submit(item)
+            await dispatcher.join()
+            dispatcher.close()
+
+        asyncio.run(main())
+
+        assert [text for chat_id, text in handled if chat_id == 1] == ["a", "b", "c"]
+        assert [text for chat_id, text in handled if chat_id == 2] == ["x", "y"]
+        assert handled.index((2, "y")) < handled.index((1, "a"))
+
+    def test_bounded_pool(self) -> None:
+        """ Одновременно обрабатывается не больше `workers` сообщений; ошибка обработчика не останавливает чат """
+        lock = threading.Lock()
+        active: list[int] = [0, 0]
+        handled: list[str] = []
+
+        def handler(update: UpdateObj) -> None:
+            with lock:
+                active[0] += 1
+                active[1] = max(active)
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+            if update.message.text == "fail":
+                raise ValueError(update.message.text)
+            handled.append(update.message.text)
+
+        async def main() -> None:
+            dispatcher = ChatDispatcher(handler, workers=2, max_pending=3)
+            for item in updates(*[(chat_id, "ok") for chat_id in range(6)], (0, "fail"), (0, "after")).result:
+                await dispatcher.submit(item)
+            await dispatcher.join()
+            dispatcher.close()
+
+        asyncio.run(main())
+
+        assert active[1] <= 2
+        assert sorted(handled) == ["after"] + ["ok"] * 6
+
+
+class TestBotRunner:
+    """ Тесты опроса Telegram """
+
+    def test_poll(self) -> None:
+        """ Опрос передаёт сообщения в обработчик и сдвигает смещение """
+        handled: list[str] = []
+
+        async def main(runner: BotRunner) -> None:
+            await runner.poll()
+            await runner.dispatcher.join()
+            runner.dispatcher.close()
+
+        runner = BotRunner(TgClient("token"), lambda update: handled.append(update.message.text))
+        response = updates((1, "/start"), (2, "/goals"), start=10)
+        with patch.object(TgClient, "get_updates", return_value=response) as mock:
+            asyncio.run(main(runner))
+
+        mock.assert_called_once_with(offset=0)
+        assert runner.offset == 12
+        assert sorted(handled) == ["/goals", "/start"]
+
+    def test_malformed_update(self) -> None:
+        """ Неразборчивое обновление пропускается, остальные обрабатываются, смещение сдвигается и за него """
+        handled: list[str] = []
+
+        async def main(runner: BotRunner) -> None:
+            await runner.poll()
+            await runner.dispatcher.join()
+            runner.dispatcher.close()
+
+        data = {"ok": True, "result": [
+            {"update_id": 10, "message": {"message_id": 1, "from": {"id": 1, "first_name": "no username"},
+                                          "chat": {"id": 1, "type": "private"}, "text": "/start"}},
+            {"update_id": 11, "message": {"message_id": 2, "from": {"id": 2, "first_name": "t", "username": "t"},
+                                          "chat": {"id": 2, "type": "private"}, "text": "/goals"}},
+            {"update_id": 12, "message": {"message_id": 3, "chat": "broken"}},
+        ]}
+        runner = BotRunner(TgClient("token"), lambda update: handled.append(update.message.text))
+        with patch.object(runner.client.transport, "call", return_value=data):
+            asyncio.run(main(runner))
+
+        assert handled == ["/goals"]
+        assert runner.offset == 13
+
+    def test_run_survives_errors(self) -> None:
+        """ Любая ошибка опроса записывается в лог, опрос продолжается """
+        polls: list[int] = []
+
+        async def poll() -> None:
+            polls.append(1)
+            if len(polls) == 1:
+                raise ValueError("unexpected")
+            raise asyncio.CancelledError
+
+        runner = BotRunner(TgClient("token"), lambda update: None)
+        with patch.object(runner, "poll", side_effect=poll), patch("bot.runner.POLL_ERROR_DELAY", 0), \
+                patch("bot.runner.logger") as logger:
+            try:
+                asyncio.run(runner.run())
+            except asyncio.CancelledError:
+                pass
+
+        assert len(polls) == 2
+        logger.exception.assert_called_once()
@@ -0,0 +1,134 @@
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+from django.urls import reverse
+from rest_framework import status
+
+from bot.tg.client import TgClient
+from bot.tg.transport import CircuitBreaker, CircuitOpenError, TgApiError, TgError, TgTransport
+
+MESSAGE: dict = {
+    "message_id": 1,
+    "from": {"id": 1, "first_name": "bot", "username": "bot"},
+    "chat": {"id": 42, "type": "private"},
+    "text": "hi",
+}
+
+
+def response(data: dict, status_code: int = 200) -> Mock:
+    return Mock(status_code=status_code, reason="", json=Mock(return_value=data))
+
+
+def error(code: int, **parameters) -> Mock:
+    return response({"ok": False, "error_code": code, "description": "error", "parameters": parameters}, code)
+
+
+@pytest.fixture()
+def sleep():
+    with patch("bot.tg.transport.time.sleep") as mock:
+        yield mock
+
+
+class TestTgTransport:
+    """ Тесты HTTP-транспорта Telegram """
+
+    def test_json_body(self) -> None:
+        """ Сообщение уходит POST-запросом с JSON в теле и таймаутами """
+        client = TgClient("token")
+        with patch.object(client.transport.session, "post", return_value=response({"ok": True, "result": MESSAGE})) \
+                as post:
+            result = client.send_message(42, "hi")
+
+        assert result.result.chat.id == 42
+        post.assert_called_once_with("https://api.telegram.org/bottoken/sendMessage",
+                                     json={"chat_id": 42, "text": "hi"}, timeout=(5, 15))
+
+    def test_retry_after(self, sleep) -> None:
+        """ На 429 выдерживается пауза из ответа, цепь не размыкается """
+        transport = TgTransport("token", breaker=CircuitBreaker(threshold=1))
+        with patch.object(transport.session, "post", side_effect=[error(429, retry_after=3), response({"ok": True})]):
+            assert transport.call("sendMessage", {}) == {"ok": True}
+
+        sleep.assert_called_once_with(3)
+
+    def test_backoff(self, sleep) -> None:
+        """ Сетевые ошибки и 5xx повторяются с растущей задержкой, затем поднимается TgError без токена в тексте """
+        transport = TgTransport("secret", retries=2)
+        failures = [requests.ConnectionError("https://api.telegram.org/botsecret/getMe"), error(502), error(500)]
+        with patch.object(transport.session, "post", side_effect=failures) as post, \
+                pytest.raises(TgError) as exc:
+            transport.call("getMe", {})
+
+        assert post.call_count == 3
+        delays = [call.args[0] for call in sleep.call_args_list]
+        assert len(delays) == 2 and delays[0] <= 0.5 and delays[1] <= 1
+        assert "secret" not in str(exc.value)
+
+    def test_client_error(self, sleep) -> None:
+        """ Ошибка в самом запросе не повторяется """
+        transport = TgTransport("token")
+        with patch.object(transport.session, "post", return_value=error(400)) as post, \
+                pytest.raises(TgApiError) as exc:
+            transport.call("sendMessage", {})
+
+        assert exc.value.error_code == 400
+        post.assert_called_once()
+        sleep.assert_not_called()
+
+    def test_request_exception(self, sleep) -> None:
+        """ Любая ошибка requests поднимается как TgError, а не выходит наружу как есть """
+        transport = TgTransport("secret", retries=1)
+        failures = [requests.exceptions.ChunkedEncodingError("broken"), requests.TooManyRedirects("secret")]
+        with patch.object(transport.session, "post", side_effect=failures), pytest.raises(TgError) as exc:
+            transport.call("getMe", {})
+
+        assert str(exc.value) == "getMe: TooManyRedirects"
+
+    @pytest.mark.parametrize("failure", [requests.ReadTimeout("read timed out"), error(502)])
+    def test_send_not_repeated(self, sleep, failure) -> None:
+        """ После таймаута чтения или 5xx сообщение могло уйти: sendMessage не отправляется повторно """
+        transport = TgTransport("token")
+        with patch.object(transport.session, "post", side_effect=[failure, response({"ok": True})]) as post, \
+                pytest.raises(TgError):
+            transport.call("sendMessage", {"chat_id": 42, "text": "hi"})
+
+        post.assert_called_once()
+        sleep.assert_not_called()
+
+    def test_send_connection_error(self, sleep) -> None:
+        """ Если соединение не установлено, сообщение не дошло до Telegram и отправляется повторно """
+        transport = TgTransport("token")
+        failures = [requests.ConnectTimeout("connect timed out"), requests.ConnectionError("refused"),
+                    response({"ok": True})]
+        with patch.object(transport.session, "post", side_effect=failures) as post:
+            assert transport.call("sendMessage", {}) == {"ok": True}
+
+        assert post.call_count == 3
+
+    def test_circuit_breaker(self, sleep) -> None:
+        """ После серии неудач запросы отклоняются без обращения к сети, после паузы проходит пробный запрос """
+        transport = TgTransport("token", retries=0, breaker=CircuitBreaker(threshold=2, reset_timeout=30))
+        with patch.object(transport.session, "post", return_value=error(502)) as post:
+            for _ in range(2):
+                with pytest.raises(TgApiError):
+                    transport.call("getMe", {})
+            with pytest.raises(CircuitOpenError):
+                transport.call("getMe", {})
+            assert post.call_count == 2
+
+            post.return_value = response({"ok": True})
+            with patch("bot.tg.transport.time.monotonic", return_value=transport.breaker.opened_at + 31):
+                assert transport.call("getMe", {}) == {"ok": True}
+            assert transport.breaker.opened_at is None
+
+
+@pytest.mark.django_db
+def test_verify_telegram_down(auth_client, tuser_factory) -> None:
+    """ Недоступность Telegram не мешает привязке аккаунта """
+    tuser_factory.create(verification_code='correct')
+
+    with patch.object(TgClient, "send_message", side_effect=TgError("sendMessage: ConnectionError")):
+        response_ = auth_client.patch(reverse('bot:verify'), data={'verification_code': 'correct'})
+
+    assert response_.status_code == status.HTTP_200_OK
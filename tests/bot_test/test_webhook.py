@@ -0,0 +1,150 @@
+import asyncio
+import io
+from unittest.mock import patch
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+
+from bot.checks import check_single_webhook_worker
+from bot.management.commands.runbot import Command
+from bot.models import WebhookUpdate
+from bot.tg.client import TgClient
+from bot.tg.dc import OkResponse, UpdateObj
+from bot.webhook import WebhookWorker
+from goals.models import Goal
+
+UPDATE: dict = {
+    "update_id": 10,
+    "message": {
+        "message_id": 1,
+        "from": {"id": 5, "first_name": "test", "username": "test"},
+        "chat": {"id": 5, "type": "private"},
+        "text": "/goals",
+    },
+}
+
+
+@pytest.fixture()
+def secret(settings):
+    settings.BOT_WEBHOOK_SECRET = "s3cret"
+    return settings.BOT_WEBHOOK_SECRET
+
+
+@pytest.mark.django_db
+class TestWebhookView:
+    """ Тесты приёма обновлений вебхуком """
+    url: str = reverse("bot:webhook")
+
+    def post(self, client, data: dict, token: str | None = None):
+        headers = {} if token is None else {"HTTP_X_TELEGRAM_BOT_API_SECRET_TOKEN": token}
+        return client.post(self.url, data, format="json", **headers)
+
+    def test_update(self, client, secret) -> None:
+        """ Обновление сохраняется до ответа и передаётся обработчикам без ожидания """
+        with patch("bot.views.get_worker") as get_worker:
+            response = self.post(client, UPDATE, secret)
+
+        assert response.status_code == status.HTTP_200_OK
+        update = get_worker.return_value.submit.call_args.args[0]
+        assert (update.update_id, update.chat_id, update.message.text) == (10, 5, "/goals")
+        assert WebhookUpdate.objects.get().payload == UPDATE
+
+    def test_repeated(self, client, secret) -> None:
+        """ Повторно присланное Telegram обновление не обрабатывается второй раз """
+        WebhookUpdate.objects.create(update_id=10, payload=UPDATE)
+        with patch("bot.views.get_worker") as get_worker:
+            response = self.post(client, UPDATE, secret)
+
+        assert response.status_code == status.HTTP_200_OK
+        get_worker.return_value.submit.assert_not_called()
+        assert WebhookUpdate.objects.count() == 1
+
+    @pytest.mark.parametrize("token", [None, "wrong"])
+    def test_secret(self, client, secret, token) -> None:
+        """ Без верного секрета обновление отклоняется """
+        with patch("bot.views.get_worker") as get_worker:
+            response = self.post(client, UPDATE, token)
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        get_worker.assert_not_called()
+
+    def test_not_configured(self, client, settings) -> None:
+        """ Пока секрет не задан, вебхук закрыт """
+        settings.BOT_WEBHOOK_SECRET = ""
+
+        assert self.post(client, UPDATE, "").status_code == status.HTTP_403_FORBIDDEN
+
+    def test_malformed(self, client, secret) -> None:
+        """ Неразборчивое обновление подтверждается, чтобы Telegram не повторял его """
+        with patch("bot.views.get_worker") as get_worker:
+            response = self.post(client, {"update_id": "x"}, secret)
+
+        assert response.status_code == status.HTTP_200_OK
+        get_worker.assert_not_called()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_worker() -> None:
+    """
+    Принятое обновление обрабатывается обработчиком runbot в фоновом цикле и удаляется. Обновление, не
+    обработанное до перезапуска процесса, обрабатывается при создании обработчика, раньше новых
+    """
+    WebhookUpdate.objects.create(update_id=9, payload={**UPDATE, "update_id": 9})
+    WebhookUpdate.objects.create(update_id=10, payload=UPDATE)
+    with patch.object(Command, "handle_update") as handle_update:
+        worker = WebhookWorker()
+        worker.submit(UpdateObj.Schema().load({**UPDATE, "update_id": 11}))
+        asyncio.run_coroutine_threadsafe(worker.dispatcher.join(), worker.loop).result(timeout=5)
+    worker.dispatcher.close()
+
+    assert [call.args[0].update_id for call in handle_update.call_args_list] == [9, 10, 11]
+    assert not WebhookUpdate.objects.filter(update_id__in=[9, 10]).exists()
+
+
+def test_single_process(settings) -> None:
+    """ Вебхук не запускается, когда веб-процессов несколько: порядок чата держится только в одном процессе """
+    settings.WEB_CONCURRENCY = 2
+
+    with pytest.raises(ImproperlyConfigured):
+        WebhookWorker()
+    assert check_single_webhook_worker(None) == []
+    settings.BOT_WEBHOOK_SECRET = "s3cret"
+    assert [error.id for error in check_single_webhook_worker(None)] == ["bot.E001"]
+
+
+@pytest.mark.django_db
+def test_dialog_across_processes(tuser_factory, category_factory) -> None:
+    """ Диалог /create продолжается, даже если каждое сообщение чата обработал другой процесс """
+    tg_user = tuser_factory.create()
+    category = category_factory.create(user=tg_user.user)
+
+    for text in ["/create", str(category.id), "Новая цель"]:
+        Command().handle_update(UpdateObj.Schema().load({**UPDATE, "message": {
+            **UPDATE["message"], "from": {"id": tg_user.user_ud, "first_name": "t", "username": "t"},
+            "chat": {"id": tg_user.chat_id, "type": "private"}, "text": text,
+        }}))
+
+    goal = Goal.objects.get()
+    assert (goal.title, goal.user, goal.category) == ("Новая цель", tg_user.user, category)
+    assert Command.get_state(tg_user.chat_id) == {}
+
+
+class TestSetWebhookCommand:
+    """ Тесты команды регистрации вебхука """
+
+    def test_set(self, secret) -> None:
+        out = io.StringIO()
+        with patch.object(TgClient, "set_webhook", return_value=OkResponse(True, True, "Webhook was set")) as mock:
+            call_command("set_webhook", "https://example.com/", stdout=out)
+
+        mock.assert_called_once_with("https://example.com/bot/webhook", "s3cret", None)
+        assert "Webhook was set" in out.getvalue()
+
+    def test_delete(self) -> None:
+        with patch.object(TgClient, "delete_webhook", return_value=OkResponse(True, True)) as mock:
+            call_command("set_webhook", "--delete", "--drop-pending", stdout=io.StringIO())
+
+        mock.assert_called_once_with(True)
@@ -1,5 +1,6 @@
 import datetime
 import pytest
+from django.core.cache import cache
 from rest_framework.test import APIClient
 
 pytest_plugins = 'tests.factories'
@@ -28,3 +29,11 @@ def due_date():
     """ Приспособление, которое создает дату с временной дельтой от текущей даты """
     due_date: datetime = datetime.date.today() + datetime.timedelta(days=7)
     return due_date.strftime("%Y-%m-%d")
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """ Кэш (роли участников досок) не переживает тест """
+    cache.clear()
+    yield
+    cache.clear()
@@ -12,7 +12,7 @@ USER_MODEL = get_user_model()
 
 @register
 class UserFactory(factory.django.DjangoModelFactory):
-    username = factory.Faker('user_name')
+    username = factory.Sequence(lambda n: f"user{n}")
     password = factory.Faker('password')
 
     class Meta:
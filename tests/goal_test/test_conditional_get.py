@@ -0,0 +1,93 @@
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from goals.models import Board
+from tests.factories import (BoardFactory, BoardParticipantFactory, CategoryFactory, GoalCommentFactory, GoalFactory,
+                             UserFactory)
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+    """ Тесты ETag и ответа 304 по версиям досок """
+
+    @pytest.fixture()
+    def goal(self, user):
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        return GoalFactory(category=CategoryFactory(board=board, user=user), user=user)
+
+    def test_not_modified_before_main_query(self, auth_client, goal, django_assert_num_queries) -> None:
+        """ Совпавший If-None-Match даёт 304 одним запросом версий (плюс сессия и пользователь) """
+        url = reverse("goals:goal_list")
+        etag = auth_client.get(url)["ETag"]
+
+        with django_assert_num_queries(3):
+            response = auth_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert etag.startswith('W/"')
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response["ETag"] == etag
+
+    @pytest.mark.parametrize("write", [
+        lambda goal: GoalFactory(category=goal.category, user=goal.user),
+        lambda goal: GoalCommentFactory(goal=goal, user=goal.user),
+        lambda goal: CategoryFactory(board=goal.board, user=goal.user),
+        lambda goal: BoardParticipantFactory(board=goal.board, user=UserFactory()),
+        lambda goal: Board.objects.filter(id=goal.board_id).update(title="Новое название"),
+    ], ids=["goal", "comment", "category", "participant", "board"])
+    def test_write_changes_etag(self, auth_client, goal, write) -> None:
+        """ Любая запись в содержимое доски меняет ETag списков """
+        urls = [reverse("goals:goal_list"), reverse("goals:category_list"), reverse("goals:board_list")]
+        etags = [auth_client.get(url)["ETag"] for url in urls]
+
+        write(goal)
+
+        for url, etag in zip(urls, etags):
+            assert auth_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_200_OK, url
+
+    @pytest.mark.parametrize("field, value, changed", [
+        ("first_name", "Новое имя", True),
+        ("email", "new@example.com", True),
+        ("last_login", timezone.now(), False),
+    ])
+    def test_profile_changes_etag(self, auth_client, goal, another_user, field, value, changed) -> None:
+        """ Ответы включают данные пользователей: смена профиля автора меняет ETag, вход в систему — нет """
+        GoalCommentFactory(goal=goal, user=another_user)
+        url = reverse("goals:comment-list")
+        etag = auth_client.get(url, {"goal": goal.id})["ETag"]
+
+        setattr(another_user, field, value)
+        another_user.save()
+
+        response = auth_client.get(url, {"goal": goal.id}, HTTP_IF_NONE_MATCH=etag)
+        expected = status.HTTP_200_OK if changed else status.HTTP_304_NOT_MODIFIED
+        assert response.status_code == expected
+
+    def test_detail(self, auth_client, goal) -> None:
+        """ Детальное представление зависит только от доски объекта """
+        url = reverse("goals:goal_pk", kwargs={"pk": goal.id})
+        etag = auth_client.get(url)["ETag"]
+        other_board = BoardFactory()
+        BoardParticipantFactory(board=other_board, user=goal.user)
+        CategoryFactory(board=other_board, user=goal.user)
+
+        assert auth_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_304_NOT_MODIFIED
+        auth_client.patch(url, {"title": "Новое"})
+        assert auth_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_200_OK
+
+    def test_query_params_in_etag(self, auth_client, goal) -> None:
+        """ Разные фильтры дают разные ETag """
+        url = reverse("goals:goal_list")
+
+        assert auth_client.get(url)["ETag"] != auth_client.get(url, {"status": 1})["ETag"]
+
+    def test_foreign_detail_not_cached(self, client, goal) -> None:
+        """ Чужой объект по-прежнему даёт 404, а не 304 """
+        client.force_login(UserFactory())
+        url = reverse("goals:goal_pk", kwargs={"pk": goal.id})
+
+        response = client.get(url, HTTP_IF_NONE_MATCH="*")
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,127 @@
+import io
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from goals.cascade import delete_board, delete_category, run_pending
+from goals.models import (ArchivedComment, ArchivedGoal, Board, BoardParticipant, ChangeTombstone, Goal, GoalCategory,
+                          GoalComment)
+from goals.retention import archive_goals, purge_boards, purge_categories
+from tests.factories import BoardFactory, BoardParticipantFactory, CategoryFactory, GoalCommentFactory, GoalFactory
+
+
+@pytest.mark.django_db
+class TestRetention:
+    """ Тесты переноса архивных целей в холодное хранилище и очистки удалённых досок и категорий """
+
+    @pytest.fixture()
+    def category(self, user):
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        return CategoryFactory(board=board, user=user)
+
+    @staticmethod
+    def age(queryset, days: int = 100) -> None:
+        queryset.update(updated=timezone.now() - timedelta(days=days))
+
+    def test_archive_goals(self, user, category) -> None:
+        """ Переносятся только давно архивированные цели, вместе с комментариями """
+        old = GoalFactory(category=category, user=user, status=Goal.Status.archived)
+        GoalCommentFactory.create_batch(2, goal=old, user=user)
+        fresh = GoalFactory(category=category, user=user, status=Goal.Status.archived)
+        active = GoalFactory(category=category, user=user)
+        self.age(Goal.objects.filter(id__in=[old.id, active.id]))
+
+        moved = archive_goals(timezone.now() - timedelta(days=90), batch_size=1)
+
+        assert moved == 1
+        assert set(Goal.objects.values_list("id", flat=True)) == {fresh.id, active.id}
+        assert not GoalComment.objects.exists()
+        archived = ArchivedGoal.objects.get()
+        assert (archived.id, archived.title, archived.board_id, archived.category_title) == \
+               (old.id, old.title, category.board_id, category.title)
+        assert ArchivedComment.objects.filter(goal=archived).count() == 2
+
+    def test_archive_tombstones(self, user, category) -> None:
+        """ Лента изменений получает перенос в архив как отдельный вид удаления """
+        old = GoalFactory(category=category, user=user, status=Goal.Status.archived)
+        GoalCommentFactory(goal=old, user=user)
+        deleted = GoalFactory(category=category, user=user)
+        deleted_id = deleted.id
+        self.age(Goal.objects.filter(id=old.id))
+
+        archive_goals(timezone.now() - timedelta(days=90))
+        deleted.delete()
+
+        assert set(ChangeTombstone.objects.values_list("kind", "object_id", "archived")) == {
+            ("goal", old.id, True), ("comment", ArchivedComment.objects.get().id, True), ("goal", deleted_id, False),
+        }
+
+    def test_archive_endpoints(self, auth_client, user, category) -> None:
+        """ Архив читается по запросу и только участниками доски """
+        goal = GoalFactory(category=category, user=user, status=Goal.Status.archived)
+        GoalCommentFactory(goal=goal, user=user, text="Итоги")
+        other = GoalFactory(status=Goal.Status.archived)
+        archive_goals(timezone.now() + timedelta(days=1))
+
+        page = auth_client.get(reverse("goals:goal_archive"), {"board": category.board_id, "limit": 10}).json()
+        detail = auth_client.get(reverse("goals:goal_archive_pk", kwargs={"pk": goal.id})).json()
+        foreign = auth_client.get(reverse("goals:goal_archive_pk", kwargs={"pk": other.id}))
+
+        assert [item["id"] for item in page["results"]] == [goal.id]
+        assert detail["category_title"] == category.title
+        assert [comment["text"] for comment in detail["comments"]] == ["Итоги"]
+        assert foreign.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_purge_boards(self, user, category) -> None:
+        """ Удалённые доски с завершённым каскадом удаляются целиком вместе с архивом, остальные ждут каскад """
+        goal = GoalFactory(category=category, user=user)
+        GoalCommentFactory(goal=goal, user=user)
+        GoalFactory(category=category, user=user, status=Goal.Status.archived)
+        archive_goals(timezone.now() + timedelta(days=1))
+        delete_board(category.board)
+        delete_board(BoardFactory())
+        run_pending()
+        pending = BoardFactory()
+        delete_board(pending)
+        self.age(Board.objects.all())
+
+        assert purge_boards(timezone.now() - timedelta(days=30), batch_size=1) == 2
+
+        assert list(Board.objects.all()) == [pending]
+        assert not GoalCategory.objects.exists() and not Goal.objects.exists()
+        assert not BoardParticipant.objects.exists() and not ArchivedGoal.objects.exists()
+
+    def test_purge_categories(self, user, category) -> None:
+        """ Удалённая категория очищается, когда её цели уже перенесены в архив """
+        GoalFactory(category=category, user=user)
+        delete_category(category)
+        run_pending()
+        self.age(GoalCategory.objects.all())
+        self.age(Goal.objects.all())
+        cutoff = timezone.now() - timedelta(days=30)
+
+        assert purge_categories(cutoff) == 0
+        archive_goals(cutoff)
+        assert purge_categories(cutoff) == 1
+        assert not GoalCategory.objects.exists()
+        assert ArchivedGoal.objects.get().category_title == category.title
+
+    def test_command(self, user, category) -> None:
+        """ Команда run_retention выполняет все шаги и печатает счётчики """
+        GoalFactory(category=category, user=user, status=Goal.Status.archived)
+        self.age(Goal.objects.all())
+        GoalFactory(category=category, user=user).delete()
+        ChangeTombstone.objects.update(created=timezone.now() - timedelta(days=40))
+        out = io.StringIO()
+
+        call_command("run_retention", stdout=out)
+
+        assert "archived_goals: 1" in out.getvalue()
+        assert "pruned_tombstones: 1" in out.getvalue()
+        assert ArchivedGoal.objects.count() == 1
+        assert ChangeTombstone.objects.get().archived
@@ -0,0 +1,54 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from tests.factories import BoardFactory, CategoryFactory, BoardParticipantFactory, GoalFactory, GoalCommentFactory
+
+
+@pytest.mark.django_db
+class TestGoalBoard:
+    """ Тесты денормализованной доски у целей и комментариев """
+
+    def test_board_follows_category(self, user) -> None:
+        """ Доска цели и её комментариев совпадает с доской категории, в том числе после переноса """
+        goal = GoalFactory(user=user, category=CategoryFactory(user=user))
+        comment = GoalCommentFactory(goal=goal, user=user)
+        assert goal.board_id == goal.category.board_id
+        assert comment.board_id == goal.board_id
+
+        goal.category = CategoryFactory(user=user)
+        goal.save()
+        comment.refresh_from_db()
+
+        assert goal.board_id == goal.category.board_id
+        assert comment.board_id == goal.board_id
+
+    def test_goal_access_by_board(self, auth_client, user) -> None:
+        """ Доступ к цели и комментариям определяется участием в доске """
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        goal = GoalFactory(user=user, category=CategoryFactory(board=board, user=user))
+        comment = GoalCommentFactory(goal=goal, user=user)
+        foreign = GoalFactory(user=user, category=CategoryFactory(user=user))
+
+        assert auth_client.get(reverse("goals:goal_pk", kwargs={"pk": goal.id})).status_code == status.HTTP_200_OK
+        assert auth_client.get(reverse("goals:goal_pk", kwargs={"pk": foreign.id})).status_code == \
+               status.HTTP_404_NOT_FOUND
+        response = auth_client.get(reverse("goals:comment-list"))
+        assert [item["id"] for item in response.json()] == [comment.id]
+
+    def test_goal_move_category_same_board(self, auth_client, user) -> None:
+        """ Цель можно перенести только в категорию своей доски """
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        goal = GoalFactory(user=user, category=CategoryFactory(board=board, user=user))
+        url = reverse("goals:goal_pk", kwargs={"pk": goal.id})
+
+        other_board = CategoryFactory(user=user)
+        response = auth_client.patch(url, {"category": other_board.id})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        same_board = CategoryFactory(board=board, user=user)
+        response = auth_client.patch(url, {"category": same_board.id})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["board"] == board.id
@@ -0,0 +1,67 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from goals.models import Goal, BoardParticipant
+from tests.factories import BoardFactory, BoardParticipantFactory, CategoryFactory
+
+
+@pytest.mark.django_db
+class TestGoalBulkCreateView:
+    """ Тесты массового создания целей """
+
+    url: str = reverse("goals:goal_bulk_create")
+
+    @pytest.fixture()
+    def category(self, user):
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        return CategoryFactory(board=board, user=user)
+
+    def test_bulk_create(self, auth_client, user, category, due_date) -> None:
+        """ Все цели создаются одним запросом с доской категории """
+        payload = [{"category": category.id, "title": f"Цель {index}", "due_date": due_date} for index in range(30)]
+
+        response = auth_client.post(self.url, payload, format="json")
+
+        assert response.status_code == status.HTTP_201_CREATED, "Цели не создались"
+        assert len(response.json()["created"]) == 30
+        assert response.json()["errors"] == []
+        assert Goal.objects.filter(user=user, board=category.board).count() == 30
+
+    def test_bulk_create_partial(self, auth_client, user, category) -> None:
+        """ Ошибочные элементы возвращаются с индексом, корректные создаются """
+        reader_board = BoardFactory()
+        BoardParticipantFactory(board=reader_board, user=user, role=BoardParticipant.Role.reader)
+        reader_category = CategoryFactory(board=reader_board, user=user)
+        deleted_category = CategoryFactory(board=category.board, user=user, is_deleted=True)
+        payload = [
+            {"category": category.id, "title": "Хорошая"},
+            {"category": reader_category.id, "title": "Чужая"},
+            {"category": deleted_category.id, "title": "Удалённая"},
+            {"category": category.id},
+        ]
+
+        response = auth_client.post(self.url, payload, format="json")
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert [goal["title"] for goal in response.json()["created"]] == ["Хорошая"]
+        assert response.json()["errors"] == [
+            {"index": 1, "errors": {"category": ["Вы не создавали эту категорию"]}},
+            {"index": 2, "errors": {"category": ["Не разрешено в удаленной категории"]}},
+            {"index": 3, "errors": {"title": ["This field is required."]}},
+        ]
+
+    def test_bulk_create_atomic(self, auth_client, user, category) -> None:
+        """ С `?atomic=true` одна ошибка отменяет создание всех целей """
+        payload = [{"category": category.id, "title": "Хорошая"}, {"category": 0, "title": "Без категории"}]
+
+        response = auth_client.post(f"{self.url}?atomic=true", payload, format="json")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()["errors"] == [{"index": 1, "errors": {"category": ["Категория не найдена"]}}]
+        assert not Goal.objects.exists()
+
+    def test_bulk_create_deny(self, client) -> None:
+        """ Не аутентифицированные пользователи не имеют доступа """
+        assert client.post(self.url, [], format="json").status_code == status.HTTP_403_FORBIDDEN
@@ -0,0 +1,99 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from goals.models import Goal, BoardParticipant
+from tests.factories import BoardFactory, BoardParticipantFactory, CategoryFactory, GoalFactory
+
+
+@pytest.mark.django_db
+class TestGoalBulkUpdateView:
+    """ Тесты массового изменения целей """
+
+    url: str = reverse("goals:goal_bulk_update")
+
+    @pytest.fixture()
+    def category(self, user):
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        return CategoryFactory(board=board, user=user)
+
+    def test_bulk_archive_by_filter(self, auth_client, user, category) -> None:
+        """ Цели, выбранные фильтрами списка, переносятся в архив одним запросом """
+        goals = GoalFactory.create_batch(size=5, category=category, user=user, priority=Goal.Priority.high)
+        other = GoalFactory(category=category, user=user, priority=Goal.Priority.low)
+
+        response = auth_client.patch(f"{self.url}?priority={Goal.Priority.high}",
+                                     {"patch": {"status": Goal.Status.archived}}, format="json")
+
+        assert response.status_code == status.HTTP_200_OK, "Запрос не прошел"
+        assert response.json() == {"updated": 5}
+        assert set(Goal.objects.filter(status=Goal.Status.archived).values_list("id", flat=True)) == {
+            goal.id for goal in goals}
+        other.refresh_from_db()
+        assert other.status == Goal.Status.to_do
+
+    def test_bulk_update_by_ids(self, auth_client, user, category) -> None:
+        """ Изменяются только перечисленные и доступные пользователю цели """
+        goals = GoalFactory.create_batch(size=3, category=category, user=user)
+        foreign = GoalFactory(category=CategoryFactory(board=BoardFactory(), user=user), user=user)
+        new_category = CategoryFactory(board=category.board, user=user)
+
+        response = auth_client.patch(self.url, {
+            "ids": [goals[0].id, goals[1].id, foreign.id],
+            "patch": {"priority": Goal.Priority.critical, "category": new_category.id},
+        }, format="json")
+
+        assert response.status_code == status.HTTP_200_OK, "Запрос не прошел"
+        assert response.json() == {"updated": 2}
+        assert Goal.objects.filter(category=new_category, priority=Goal.Priority.critical).count() == 2
+        foreign.refresh_from_db()
+        assert foreign.category_id != new_category.id
+
+    def test_bulk_update_reader_forbidden(self, auth_client, user, category) -> None:
+        """ Если хотя бы одна доска доступна только на чтение, ничего не меняется """
+        reader_board = BoardFactory()
+        BoardParticipantFactory(board=reader_board, user=user, role=BoardParticipant.Role.reader)
+        GoalFactory(category=category, user=user)
+        GoalFactory(category=CategoryFactory(board=reader_board, user=user), user=user)
+
+        response = auth_client.patch(f"{self.url}?status={Goal.Status.to_do}",
+                                     {"patch": {"status": Goal.Status.done}}, format="json")
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        assert not Goal.objects.filter(status=Goal.Status.done).exists()
+
+    def test_bulk_update_category_from_other_board(self, auth_client, user, category) -> None:
+        """ Нельзя перенести цели в категорию другой доски """
+        goal = GoalFactory(category=category, user=user)
+        other_board = BoardFactory()
+        BoardParticipantFactory(board=other_board, user=user)
+        other_category = CategoryFactory(board=other_board, user=user)
+
+        response = auth_client.patch(self.url, {"ids": [goal.id], "patch": {"category": other_category.id}},
+                                     format="json")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        goal.refresh_from_db()
+        assert goal.category_id == category.id
+
+    def test_bulk_update_requires_selection(self, auth_client, user, category) -> None:
+        """ Без ids и фильтров запрос отклоняется, чтобы случайно не изменить все цели """
+        GoalFactory(category=category, user=user)
+
+        response = auth_client.patch(self.url, {"patch": {"status": Goal.Status.archived}}, format="json")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert not Goal.objects.filter(status=Goal.Status.archived).exists()
+
+    def test_bulk_update_queries(self, auth_client, user, category, django_assert_num_queries) -> None:
+        """ Число запросов не зависит от количества целей """
+        GoalFactory.create_batch(size=20, category=category, user=user)
+
+        # Внутри тестовой транзакции atomic() добавляет SAVEPOINT и RELEASE SAVEPOINT
+        with django_assert_num_queries(8) as context:
+            response = auth_client.patch(f"{self.url}?category={category.id}",
+                                         {"patch": {"status": Goal.Status.archived}}, format="json")
+
+        assert response.json() == {"updated": 20}
+        assert any("FOR UPDATE" in query["sql"] for query in context.captured_queries)
@@ -0,0 +1,126 @@
+import datetime
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from goals.changes import prune_tombstones
+from goals.models import BoardParticipant, ChangeTombstone, Goal, GoalComment
+from goals.retention import archive_goals
+from tests.factories import BoardFactory, BoardParticipantFactory, CategoryFactory, GoalCommentFactory, GoalFactory
+
+
+# Лента отдаёт только закоммиченные транзакции, поэтому тесты работают без общей транзакции
+@pytest.mark.django_db(transaction=True)
+class TestChangesView:
+    """ Тесты ленты изменений """
+
+    url: str = reverse("goals:changes")
+
+    @pytest.fixture()
+    def board(self, user):
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        category = CategoryFactory(board=board, user=user)
+        goals = GoalFactory.create_batch(2, category=category, user=user)
+        GoalCommentFactory(goal=goals[0], user=user)
+        return board
+
+    def read(self, auth_client, since: str = "", **params) -> dict:
+        response = auth_client.get(self.url, {"since": since, **params})
+        assert response.status_code == status.HTTP_200_OK, "Запрос не прошел"
+        return response.json()
+
+    @staticmethod
+    def keys(changes: list[dict]) -> set[tuple]:
+        return {(change["type"], change["id"], change["deleted"]) for change in changes}
+
+    def test_initial_load(self, auth_client, user, board) -> None:
+        """ Пустой курсор отдаёт всё содержимое досок пользователя, но не чужих """
+        BoardFactory()
+        CategoryFactory(user=user)
+
+        page = self.read(auth_client)
+
+        goals = board.goals.all()
+        assert self.keys(page["changes"]) == {
+            ("board", board.id, False),
+            ("category", board.categories.get().id, False),
+            *(("goal", goal.id, False) for goal in goals),
+            ("comment", GoalComment.objects.get().id, False),
+        }
+        assert page["has_more"] is False
+        assert self.read(auth_client, page["since"])["changes"] == []
+
+    def test_delta(self, auth_client, user, board) -> None:
+        """ После курсора приходят только изменения и удаления """
+        since = self.read(auth_client)["since"]
+        goal = board.goals.first()
+        goal.title = "Новое название"
+        goal.save()
+        comment_id = GoalComment.objects.get().id
+        GoalComment.objects.filter(id=comment_id).delete()
+
+        changes = self.read(auth_client, since)["changes"]
+
+        assert self.keys(changes) == {("goal", goal.id, False), ("comment", comment_id, True)}
+        assert next(change for change in changes if change["type"] == "goal")["data"]["title"] == "Новое название"
+
+    def test_pages(self, auth_client, board) -> None:
+        """ Страницы по курсору отдают каждое изменение ровно один раз """
+        seen, since, has_more = [], "", True
+        while has_more:
+            page = self.read(auth_client, since, limit=2)
+            assert len(page["changes"]) <= 2
+            seen += [(change["type"], change["id"]) for change in page["changes"]]
+            since, has_more = page["since"], page["has_more"]
+
+        assert len(seen) == len(set(seen)) == 5
+
+    def test_participant_removed(self, auth_client, user, board) -> None:
+        """ Исключённый участник получает удаление доски """
+        since = self.read(auth_client)["since"]
+
+        BoardParticipant.objects.filter(board=board, user=user).delete()
+
+        assert self.keys(self.read(auth_client, since)["changes"]) == {("board", board.id, True)}
+
+    def test_invalid_cursor(self, auth_client) -> None:
+        """ Повреждённый курсор даёт 400 """
+        response = auth_client.get(self.url, {"since": "broken"})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_other_boards_deletions(self, auth_client, user, board) -> None:
+        """ Удаления на чужих досках в ленту не попадают """
+        since = self.read(auth_client)["since"]
+        other = GoalFactory(category=CategoryFactory(board=BoardFactory()))
+        other.delete()
+
+        assert self.read(auth_client, since)["changes"] == []
+
+    def test_expired_cursor(self, auth_client, user, board) -> None:
+        """ Курсор старше горизонта очистки удалений даёт 410, новый курсор продолжает работать """
+        old_since = self.read(auth_client)["since"]
+        GoalComment.objects.all().delete()
+        ChangeTombstone.objects.update(created=timezone.now() - datetime.timedelta(days=31))
+        fresh_since = self.read(auth_client)["since"]
+
+        assert prune_tombstones(timezone.now() - datetime.timedelta(days=30)) == 1
+
+        assert auth_client.get(self.url, {"since": old_since}).status_code == status.HTTP_410_GONE
+        assert self.read(auth_client, fresh_since)["changes"] == []
+        assert self.read(auth_client)["has_more"] is False
+
+    def test_archived(self, auth_client, board) -> None:
+        """ Перенос цели в архивные таблицы приходит удалением с пометкой archived """
+        since = self.read(auth_client)["since"]
+        goal = board.goals.first()
+        Goal.objects.filter(id=goal.id).update(status=Goal.Status.archived,
+                                               updated=timezone.now() - datetime.timedelta(days=100))
+
+        archive_goals(timezone.now() - datetime.timedelta(days=90))
+
+        changes = {(change["type"], change["id"]): change for change in self.read(auth_client, since)["changes"]}
+        assert (changes[("goal", goal.id)]["deleted"], changes[("goal", goal.id)]["archived"]) == (True, True)
@@ -0,0 +1,91 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from goals.models import Goal
+from goals.pagination import EstimatedCountPagination
+from goals.retention import archive_goals
+from tests.factories import BoardFactory, BoardParticipantFactory, CategoryFactory, GoalCommentFactory, GoalFactory
+
+
+@pytest.mark.django_db
+class TestEstimatedCountPagination:
+    """ Тесты оценочного и кэшированного числа записей в пагинации списков """
+
+    @pytest.fixture()
+    def category(self, user):
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        category = CategoryFactory(board=board, user=user)
+        GoalFactory.create_batch(5, category=category, user=user)
+        return category
+
+    def test_exact_count_below_threshold(self, auth_client, category) -> None:
+        """ На небольших выборках count точный """
+        response = auth_client.get(reverse("goals:goal_list"), {"limit": 2})
+
+        assert response.status_code == status.HTTP_200_OK, "Запрос не прошел"
+        assert response.data["count"] == 5
+        assert response.data["count_estimated"] is False
+
+    def test_bounded_count_single_query(self, category, monkeypatch, django_assert_num_queries) -> None:
+        """ Ниже порога число считается одним COUNT с LIMIT, без EXPLAIN """
+        monkeypatch.setattr(EstimatedCountPagination, "count_cache_timeout", 0)
+        with django_assert_num_queries(1) as context:
+            assert EstimatedCountPagination().get_count(Goal.objects.all()) == 5
+
+        assert "LIMIT 1001" in context.captured_queries[0]["sql"]
+        assert "EXPLAIN" not in context.captured_queries[0]["sql"]
+
+    def test_planner_estimate_plain_scan(self, category, monkeypatch) -> None:
+        """ Без кэша выше порога простое сканирование одной таблицы получает оценку планировщика """
+        monkeypatch.setattr(EstimatedCountPagination, "exact_count_threshold", 2)
+        monkeypatch.setattr(EstimatedCountPagination, "count_cache_timeout", 0)
+        pagination = EstimatedCountPagination()
+
+        count = pagination.get_count(Goal.objects.all())
+
+        assert pagination.count_estimated is True
+        assert count >= 3
+
+    @pytest.mark.parametrize("url", ["goals:category_list", "goals:comment-list", "goals:board_list",
+                                     "goals:goal_archive"])
+    def test_cached_count_for_acl_lists(self, auth_client, category, monkeypatch, url) -> None:
+        """
+        Выше порога списки, ограниченные досками пользователя, считают точный COUNT(*) один раз:
+        следующие страницы берут число из кэша и не выполняют ни одного COUNT
+        """
+        monkeypatch.setattr(EstimatedCountPagination, "exact_count_threshold", 0)
+        GoalCommentFactory(goal=Goal.objects.filter(category=category).first(), user=category.user)
+        GoalFactory(category=category, user=category.user, status=Goal.Status.archived)
+        archive_goals(timezone.now() + timedelta(days=1))
+
+        with CaptureQueriesContext(connection) as first:
+            first_page = auth_client.get(reverse(url), {"limit": 1})
+        with CaptureQueriesContext(connection) as second:
+            second_page = auth_client.get(reverse(url), {"limit": 1, "offset": 1})
+
+        assert first_page.status_code == second_page.status_code == status.HTTP_200_OK
+        assert first_page.data["count"] == second_page.data["count"] == 1
+        counts = [query["sql"] for query in first.captured_queries if "COUNT(" in query["sql"]]
+        assert len([sql for sql in counts if "LIMIT" not in sql]) == 1, "Полный COUNT(*) выполняется один раз"
+        assert not [query for query in second.captured_queries if "COUNT(" in query["sql"]]
+
+    def test_cached_count_above_threshold(self, auth_client, user, category, monkeypatch) -> None:
+        """ Для целей выше порога точный count кэшируется по пользователю и набору фильтров """
+        monkeypatch.setattr(EstimatedCountPagination, "exact_count_threshold", 0)
+        url = reverse("goals:goal_list")
+
+        first = auth_client.get(url, {"limit": 2})
+        GoalFactory.create_batch(3, category=category, user=user)
+        second = auth_client.get(url, {"limit": 2, "offset": 2})
+        filtered = auth_client.get(url, {"limit": 2, "category": category.id})
+
+        assert (first.data["count"], first.data["count_estimated"]) == (5, True)
+        assert second.data["count"] == 5, "Смена страницы должна брать count из кэша"
+        assert filtered.data["count"] == 8, "Другой набор фильтров считается отдельно"
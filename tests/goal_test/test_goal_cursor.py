@@ -0,0 +1,83 @@
+import datetime
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from goals.models import Goal
+from tests.factories import BoardFactory, CategoryFactory, BoardParticipantFactory, GoalFactory
+
+
+@pytest.mark.django_db
+class TestGoalCursorPagination:
+    """ Тесты курсорной пагинации списка целей """
+
+    url: str = reverse("goals:goal_list")
+
+    @pytest.fixture()
+    def goals(self, user) -> list[Goal]:
+        board = BoardFactory()
+        category = CategoryFactory(board=board, user=user)
+        BoardParticipantFactory(board=board, user=user)
+        today = datetime.date.today()
+        return [
+            GoalFactory(
+                category=category,
+                user=user,
+                priority=index % 4 + 1,
+                due_date=None if index % 3 == 0 else today + datetime.timedelta(days=index % 5),
+            )
+            for index in range(23)
+        ]
+
+    @staticmethod
+    def expected_ids(goals: list[Goal], ordering: str) -> list[int]:
+        """ Ожидаемый порядок: NULL больше любого значения, `id` в направлении последнего поля """
+        keys = [key for key in ordering.split(",")]
+        names = [key.lstrip("-") for key in keys]
+        for name in ["due_date", "priority"]:
+            if name not in names:
+                keys.append(("-" if keys[-1].startswith("-") else "") + name)
+        keys.append(("-" if keys[-1].startswith("-") else "") + "id")
+
+        result = list(goals)
+        for key in reversed(keys):
+            name = key.lstrip("-")
+            result.sort(key=lambda goal: (getattr(goal, name) is None, getattr(goal, name) or 0),
+                        reverse=key.startswith("-"))
+        return [goal.id for goal in result]
+
+    def walk(self, auth_client, ordering: str) -> list[int]:
+        ids, url = [], f"{self.url}?pagination=cursor&limit=5&ordering={ordering}"
+        while url:
+            response = auth_client.get(url)
+            assert response.status_code == status.HTTP_200_OK, "Запрос не прошел"
+            assert "count" not in response.data, "Курсорная пагинация не должна считать записи"
+            ids += [item["id"] for item in response.data["results"]]
+            url = response.data["next"]
+        return ids
+
+    @pytest.mark.parametrize("ordering", [
+        "priority", "-priority", "due_date", "-due_date",
+        "priority,due_date", "priority,-due_date", "-priority,due_date", "-priority,-due_date",
+        "due_date,priority", "-due_date,priority", "due_date,-priority", "-due_date,-priority",
+    ])
+    def test_cursor_walk_all_orderings(self, auth_client, goals, ordering) -> None:
+        """ Проход по всем страницам даёт каждую цель ровно один раз и в правильном порядке """
+        assert self.walk(auth_client, ordering) == self.expected_ids(goals, ordering)
+
+    def test_cursor_previous(self, auth_client, goals) -> None:
+        """ Ссылка previous возвращает предыдущую страницу """
+        first = auth_client.get(f"{self.url}?pagination=cursor&limit=5").data
+        second = auth_client.get(first["next"]).data
+        assert first["previous"] is None
+
+        back = auth_client.get(second["previous"]).data
+        assert [item["id"] for item in back["results"]] == [item["id"] for item in first["results"]]
+        assert back["previous"] is None
+
+    def test_invalid_cursor(self, auth_client, goals) -> None:
+        """ Повреждённый курсор даёт 404, а не 500 """
+        response = auth_client.get(f"{self.url}?cursor=broken")
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
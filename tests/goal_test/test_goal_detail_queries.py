@@ -0,0 +1,61 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from goals.models import BoardParticipant
+from tests.factories import BoardFactory, CategoryFactory, BoardParticipantFactory, GoalFactory, GoalCommentFactory
+
+# Каждый запрос тестового клиента дополнительно читает сессию и пользователя
+AUTH_QUERIES: int = 2
+# Версия доски для ETag (BoardVersionETagMixin) читается до основного запроса
+ETAG_QUERIES: int = 1
+
+
+@pytest.mark.django_db
+class TestDetailQueries:
+    """ Детальные представления загружают объект и роль пользователя одним запросом """
+
+    @pytest.fixture()
+    def board(self, user):
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        return board
+
+    def test_goal_retrieve_update(self, auth_client, user, board, django_assert_num_queries) -> None:
+        goal = GoalFactory(user=user, category=CategoryFactory(board=board, user=user))
+        url = reverse("goals:goal_pk", kwargs={"pk": goal.id})
+
+        with django_assert_num_queries(AUTH_QUERIES + ETAG_QUERIES + 1):
+            assert auth_client.get(url).status_code == status.HTTP_200_OK
+        with django_assert_num_queries(AUTH_QUERIES + 2):
+            assert auth_client.patch(url, {"title": "Новое"}).status_code == status.HTTP_200_OK
+
+    def test_category_retrieve(self, auth_client, user, board, django_assert_num_queries) -> None:
+        url = reverse("goals:category_pk", kwargs={"pk": CategoryFactory(board=board, user=user).id})
+
+        with django_assert_num_queries(AUTH_QUERIES + ETAG_QUERIES + 1):
+            assert auth_client.get(url).status_code == status.HTTP_200_OK
+
+    def test_comment_retrieve(self, auth_client, user, board, django_assert_num_queries) -> None:
+        goal = GoalFactory(user=user, category=CategoryFactory(board=board, user=user))
+        url = reverse("goals:comment-detail", kwargs={"pk": GoalCommentFactory(goal=goal, user=user).id})
+
+        with django_assert_num_queries(AUTH_QUERIES + ETAG_QUERIES + 1):
+            assert auth_client.get(url).status_code == status.HTTP_200_OK
+
+    def test_board_retrieve(self, auth_client, board, django_assert_num_queries) -> None:
+        url = reverse("goals:board_pk", kwargs={"pk": board.id})
+
+        # Доска с ролью и участники вместе с пользователями
+        with django_assert_num_queries(AUTH_QUERIES + ETAG_QUERIES + 2):
+            assert auth_client.get(url).status_code == status.HTTP_200_OK
+
+    def test_reader_cannot_update(self, auth_client, user) -> None:
+        """ Роль из аннотации по-прежнему ограничивает запись """
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user, role=BoardParticipant.Role.reader)
+        goal = GoalFactory(user=user, category=CategoryFactory(board=board, user=user))
+        url = reverse("goals:goal_pk", kwargs={"pk": goal.id})
+
+        assert auth_client.get(url).status_code == status.HTTP_200_OK
+        assert auth_client.patch(url, {"title": "Новое"}).status_code == status.HTTP_403_FORBIDDEN
@@ -0,0 +1,121 @@
+from urllib.parse import parse_qsl, urlsplit
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from goals.models import CommentLexeme, Goal, GoalComment
+from tests.factories import BoardFactory, CategoryFactory, BoardParticipantFactory, GoalFactory, GoalCommentFactory
+
+
+@pytest.mark.django_db
+class TestGoalSearch:
+    """ Тесты полнотекстового поиска по целям """
+
+    url: str = reverse("goals:goal_list")
+
+    @pytest.fixture()
+    def category(self, user):
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        return CategoryFactory(board=board, user=user)
+
+    def test_search_prefix_and_rank(self, auth_client, user, category) -> None:
+        """ Поиск по префиксу слова, совпадение в заголовке выше совпадения в описании """
+        in_description = GoalFactory(category=category, user=user, title="Сходить в магазин",
+                                     description="Купить хлеб и молоко", priority=1)
+        in_title = GoalFactory(category=category, user=user, title="Молоко для кофе",
+                               description="Обезжиренное", priority=4)
+        GoalFactory(category=category, user=user, title="Пробежка", description="Пять километров")
+
+        response = auth_client.get(self.url, {"search": "молок"})
+
+        assert response.status_code == status.HTTP_200_OK, "Запрос не прошел"
+        assert [goal["id"] for goal in response.json()] == [in_title.id, in_description.id]
+        assert "<b>Молоко</b>" in response.json()[0]["search_headline"]
+
+    def test_search_comment_text(self, auth_client, user, category) -> None:
+        """ Цель находится по тексту её комментария, в том числе после его изменения """
+        goal = GoalFactory(category=category, user=user, title="Отчёт", description=None)
+        comment = GoalCommentFactory(goal=goal, user=user, text="согласовать с бухгалтерией")
+
+        assert [item["id"] for item in auth_client.get(self.url, {"search": "бухгалтер"}).json()] == [goal.id]
+
+        comment.text = "отправить директору"
+        comment.save()
+        assert auth_client.get(self.url, {"search": "бухгалтер"}).json() == []
+        assert [item["id"] for item in auth_client.get(self.url, {"search": "директор"}).json()] == [goal.id]
+
+    def test_comment_lexeme_counts(self, auth_client, user, category) -> None:
+        """
+        Триггеры комментариев меняют счётчики лексем на разницу: лексема уходит из вектора цели,
+        только когда её не осталось ни в одном комментарии
+        """
+        goal = GoalFactory(category=category, user=user, title="Отчёт", description=None)
+        first, second = GoalComment.objects.bulk_create([
+            GoalComment(goal=goal, board_id=goal.board_id, user=user, text="позвонить бухгалтеру"),
+            GoalComment(goal=goal, board_id=goal.board_id, user=user, text="бухгалтерия ждёт o'reilly \\путь"),
+        ])
+        counts = dict(CommentLexeme.objects.filter(goal_id=goal.id).values_list("lexeme", "count"))
+        assert counts["бухгалтер"] == 2 and counts["позвон"] == 1
+
+        first.delete()
+        assert [item["id"] for item in auth_client.get(self.url, {"search": "бухгалтер"}).json()] == [goal.id]
+        assert auth_client.get(self.url, {"search": "позвонить"}).json() == []
+        assert not CommentLexeme.objects.filter(count__lte=0).exists()
+
+        second.delete()
+        assert auth_client.get(self.url, {"search": "бухгалтер"}).json() == []
+        assert not CommentLexeme.objects.filter(goal_id=goal.id).exists()
+
+    def test_stale_goal_save_keeps_comments(self, auth_client, user, category) -> None:
+        """ Сохранение цели, прочитанной до нового комментария, не стирает его лексемы из поиска """
+        goal = Goal.objects.get(id=GoalFactory(category=category, user=user, title="Отчёт").id)
+        GoalCommentFactory(goal=goal, user=user, text="согласовать с бухгалтерией")
+
+        goal.title = "Годовой отчёт"
+        goal.save()
+
+        assert [item["id"] for item in auth_client.get(self.url, {"search": "бухгалтер"}).json()] == [goal.id]
+        assert [item["id"] for item in auth_client.get(self.url, {"search": "годов"}).json()] == [goal.id]
+
+    def test_search_without_term(self, auth_client, user, category) -> None:
+        """ Без поискового запроса подсветки нет """
+        GoalFactory(category=category, user=user)
+
+        response = auth_client.get(self.url)
+
+        assert "search_headline" not in response.json()[0]
+
+    def test_search_headline_escaped(self, auth_client, user, category) -> None:
+        """ HTML из текста цели экранируется, разметка в подсветке — только <b> """
+        GoalFactory(category=category, user=user, title="<img src=x onerror=alert(1)> молоко",
+                    description="<script>alert(2)</script>")
+
+        headline = auth_client.get(self.url, {"search": "молоко"}).json()[0]["search_headline"]
+
+        assert "<img" not in headline and "<script" not in headline
+        assert "&gt;" in headline and "<b>молоко</b>" in headline
+
+    def test_search_stopwords(self, auth_client, user, category) -> None:
+        """ Запрос только из стоп-слов игнорируется, как пустой """
+        goal = GoalFactory(category=category, user=user, title="Пробежка")
+
+        response = auth_client.get(self.url, {"search": "и на"})
+
+        assert [item["id"] for item in response.json()] == [goal.id]
+        assert "search_headline" not in response.json()[0]
+
+    def test_search_cursor_pagination(self, auth_client, user, category) -> None:
+        """ Курсорная пагинация по релевантности не теряет цели с одинаковым рангом """
+        goals = [GoalFactory(category=category, user=user, title="молоко " * (index % 3 + 1))
+                 for index in range(12)]
+
+        ids, params = [], {"search": "молоко", "pagination": "cursor", "limit": 5}
+        while params:
+            response = auth_client.get(self.url, params)
+            assert response.status_code == status.HTTP_200_OK, "Запрос не прошел"
+            ids += [item["id"] for item in response.data["results"]]
+            params = response.data["next"] and dict(parse_qsl(urlsplit(response.data["next"]).query))
+
+        assert sorted(ids) == sorted(goal.id for goal in goals)
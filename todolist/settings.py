@@ -22,6 +22,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',  # Управление сессиями
     'django.contrib.messages',  # Система сообщений
     'django.contrib.staticfiles',  # Статические файлы
+    'django.contrib.postgres',  # Возможности PostgreSQL (полнотекстовый поиск)
     'rest_framework',  # Фреймворк для создания API
     'social_django',  # Интеграция социальной авторизации
     'django_filters',  # Фильтрация данных
@@ -94,6 +95,12 @@ TIME_ZONE = 'UTC'  # Часовой пояс
 USE_I18N = True  # Использование международных настроек
 USE_TZ = True  # Использование часового пояса
 
+# Кэш (роли участников досок). Кэш в памяти процесса допустим только с DEBUG: без общего бэкенда,
+# например CACHE_URL=redis://redis:6379/1, приложение не запустится (проверка goals.E001)
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+}
+
 STATIC_URL = '/static/'  # URL для статических файлов
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'  # Тип поля для автоинкрементного первичного ключа
 
@@ -110,3 +117,8 @@ AUTHENTICATION_BACKENDS = (
 )
 
 BOT_TOKEN = env("BOT_TOKEN")  # Токен для бота
+# Секрет вебхука бота: Telegram присылает его в заголовке X-Telegram-Bot-Api-Secret-Token.
+# Без него вебхук отклоняет все запросы и бот работает только через long polling (runbot)
+BOT_WEBHOOK_SECRET = env("BOT_WEBHOOK_SECRET", default="")
+# Число веб-процессов (его же читает gunicorn). Вебхук бота работает только в одном процессе (проверка bot.E001)
+WEB_CONCURRENCY = env.int("WEB_CONCURRENCY", default=1)